@@ -0,0 +1,56 @@
+"""
+Requests/sec of FreqSignalsClient against the local stub server, with a fresh connection per
+request (keep_alive=False, how the client behaved before pooling) and with the pooled transport.
+
+    python benchmarks/bench_http_pool.py --requests 2000 --threads 1 4
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "strategies"))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from freqsignals import FreqSignalsClient  # noqa: E402
+from stub_server import serve  # noqa: E402
+
+
+def run(host, keep_alive, requests_count, threads):
+    client = FreqSignalsClient(
+        client_id="bench", client_secret="bench", host=host, https=False,
+        keep_alive=keep_alive, pool_maxsize=max(threads, 1),
+    )
+    client.get_token()
+    start = time.perf_counter()
+    if threads <= 1:
+        for _ in range(requests_count):
+            client.get_signals()
+    else:
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            list(executor.map(lambda _: client.get_signals(), range(requests_count)))
+    elapsed = time.perf_counter() - start
+    client.close()
+    return requests_count / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 4])
+    args = parser.parse_args()
+
+    server = serve()
+    host = "{}:{}".format(*server.server_address)
+    try:
+        for threads in args.threads:
+            before = run(host, False, args.requests, threads)
+            after = run(host, True, args.requests, threads)
+            print(f"threads={threads} new_connection={before:.0f} req/s pooled={after:.0f} req/s speedup={after / before:.2f}x")
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Time to encode typical signal payloads (single signals like FreqSignalsAiDataProvider posts and
+publisher batches of them): the previous json.loads(json.dumps(data, cls=NpEncoder)) round trip
+followed by the encoding requests does for json=, against freqsignals_dumps with and without orjson.
+
+    python benchmarks/bench_json_encoding.py --iterations 20000
+"""
+import argparse
+import json
+import os
+import sys
+import timeit
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "strategies"))
+
+import freqsignals  # noqa: E402
+from freqsignals import NpEncoder, freqsignals_dumps  # noqa: E402
+
+
+def ai_signal(i):
+    close = np.float64(20000 + i)
+    return {
+        "symbol": f"PAIR{i}/USDT",
+        "value": 1 if i % 3 == 0 else -1 if i % 3 == 1 else 0,
+        "ttl_minutes": 60,
+        "data_set_id": "e7041595-8851-4c80-aba5-944468ee7820",
+        "s_close": np.round(np.float64(0.0123456 * i), 4),
+        "s_close_mean": np.round(np.float64(0.0011), 4),
+        "do_predict": np.round(np.float64(1), 4),
+        "DI_values": np.round(np.float64(0.87), 4),
+        "price": np.round(close, 4),
+        "last_move": np.round(close - np.float64(19990.5), 4),
+    }
+
+
+def round_trip(data):
+    return json.dumps(json.loads(json.dumps(data, cls=NpEncoder)), allow_nan=False).encode()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=20000)
+    args = parser.parse_args()
+
+    orjson_module = freqsignals.orjson
+    payloads = {"signal": ai_signal(1), "batch_50": [ai_signal(i) for i in range(50)]}
+    for name, payload in payloads.items():
+        iterations = args.iterations if name == "signal" else max(1, args.iterations // 50)
+        results = {"round_trip": timeit.timeit(lambda: round_trip(payload), number=iterations)}
+        freqsignals.orjson = None
+        results["dumps_stdlib"] = timeit.timeit(lambda: freqsignals_dumps(payload), number=iterations)
+        freqsignals.orjson = orjson_module
+        if orjson_module is not None:
+            results["dumps_orjson"] = timeit.timeit(lambda: freqsignals_dumps(payload), number=iterations)
+        print(name, " ".join(f"{k}={v / iterations * 1e6:.1f}us" for k, v in results.items()))
+
+
+if __name__ == "__main__":
+    main()
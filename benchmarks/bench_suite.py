@@ -0,0 +1,227 @@
+"""
+Load-test suite against the local mock API (stub_server.serve_mock), writing machine-readable
+results so runs can be compared:
+
+- poll: get_signals requests/sec, plain and revalidated with ETags
+- history: seconds to load one pair's signal history with freqsignals_load_signal_history
+- join: freqsignals_add_pair_signals milliseconds per call for candle x signal counts, full and
+  incremental (one new candle, as in a live bot)
+- publisher: signals/sec through the background publisher
+
+    python benchmarks/bench_suite.py --output results.json
+    python benchmarks/bench_suite.py --compare results.json --tolerance 0.2
+
+With --compare the run exits with status 1 when a result is worse than the baseline by more
+than the tolerance.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+from pandas import DataFrame, Timedelta, Timestamp, date_range
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "strategies"))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from freqsignals import FreqSignalsCircuitBreaker, FreqSignalsClient, FreqSignalsError, FreqSignalsMixin, FreqSignalsRetryPolicy  # noqa: E402
+from stub_server import serve_mock  # noqa: E402
+
+
+class BenchStrategy(FreqSignalsMixin):
+    timeframe = "5m"
+    freqsignals_warm_up_history = False
+    live = False
+
+    def __init__(self, client):
+        self.config = {}
+        self.freqsignals_init()
+        self.freqsignals_client = client
+
+    def freqsignals_is_live(self):
+        return self.live
+
+
+def result(name, value, unit, higher_is_better, **params):
+    return {"name": name, "value": value, "unit": unit, "higher_is_better": higher_is_better, "params": params}
+
+
+def client_for(server):
+    # injected errors are retried quickly and never open the circuit, so they show up as slower
+    # results rather than aborted runs
+    return FreqSignalsClient(
+        client_id="bench", client_secret="bench", host="{}:{}".format(*server.server_address), https=False,
+        retry_policy=FreqSignalsRetryPolicy(max_attempts=5, backoff=0.01, retry_non_idempotent=True),
+        circuit_breaker=FreqSignalsCircuitBreaker(failure_threshold=0),
+    )
+
+
+def bench_poll(server, requests_count):
+    client = client_for(server)
+    filters = {"data_set_id__in": ",".join(server.api.data_sets)}
+    results = []
+    for conditional in (False, True):
+        client.get_signals(filters, conditional=conditional)
+        failed = 0
+        start = time.perf_counter()
+        for _ in range(requests_count):
+            try:
+                client.get_signals(filters, conditional=conditional)
+            except FreqSignalsError:
+                failed += 1
+        elapsed = time.perf_counter() - start
+        name = "poll.conditional" if conditional else "poll.plain"
+        entry = result(name, requests_count / elapsed, "req/s", True, requests=requests_count)
+        entry["failed"] = failed
+        results.append(entry)
+    client.close()
+    return results
+
+
+def bench_history(server, pairs):
+    client = client_for(server)
+    client.get_token()
+    strategy = BenchStrategy(client)
+    data_set_id = server.api.data_sets[0]
+    timings = []
+    for pair in server.api.pairs[:pairs]:
+        start = time.perf_counter()
+        strategy.freqsignals_load_signal_history(pair, data_set_id)
+        timings.append(time.perf_counter() - start)
+    client.close()
+    return [result(
+        "history.load_per_pair", statistics.median(timings), "s", False,
+        pairs=len(timings), history_size=server.api.history_size, latency=server.api.latency,
+    )]
+
+
+def bench_join(candle_counts, signal_counts, repeat):
+    results = []
+    end = Timestamp("2024-01-01")
+    for signals in signal_counts:
+        # one signal every 5 minutes up to the last candle
+        start_ns = end.value - Timedelta(minutes=5).value * np.arange(signals, dtype=np.int64)[::-1]
+        rng = np.random.default_rng(0)
+        for candles in candle_counts:
+            for incremental in (False, True):
+                strategy = BenchStrategy(None)
+                strategy.live = incremental
+                strategy.freqsignals_store.extend(
+                    "PAIR/USDT", "ds", start_ns, rng.choice([15, 60, 240], signals), rng.random(signals),
+                    contexts=[{"rsi": 50.0}] * signals,
+                )
+                dates = date_range(end=end + Timedelta(minutes=repeat), periods=candles + repeat, freq="1min", tz="UTC")
+                timings = []
+                for i in range(repeat + 1):
+                    dataframe = DataFrame({"date": dates[i:i + candles]})
+                    start = time.perf_counter()
+                    strategy.freqsignals_add_pair_signals(dataframe, "PAIR/USDT", include_context=True)
+                    if i:
+                        # the first call of the incremental run joins everything
+                        timings.append(time.perf_counter() - start)
+                name = "join.incremental" if incremental else "join.full"
+                results.append(result(
+                    name, statistics.median(timings) * 1000, "ms", False, candles=candles, signals=signals,
+                ))
+    return results
+
+
+def bench_publisher(server, signals_count):
+    client = client_for(server)
+    client.get_token()
+    publisher = client.start_publisher()
+    start = time.perf_counter()
+    for i in range(signals_count):
+        publisher.publish({"symbol": f"PAIR{i}/USDT", "data_set_id": "ds", "value": i, "ttl_minutes": 60})
+    publisher.flush(timeout=120)
+    elapsed = time.perf_counter() - start
+    client.stop_publisher()
+    client.close()
+    return [result("publisher.throughput", signals_count / elapsed, "signals/s", True, signals=signals_count)]
+
+
+def compare(results, baseline, tolerance):
+    """
+    Returns:
+        list - descriptions of results worse than the baseline by more than tolerance
+    """
+    key = lambda entry: (entry["name"], json.dumps(entry["params"], sort_keys=True))  # noqa: E731
+    previous = {key(entry): entry for entry in baseline["results"]}
+    regressions = []
+    for entry in results:
+        before = previous.get(key(entry))
+        if not before or not before["value"]:
+            continue
+        change = entry["value"] / before["value"] - 1
+        if (change < -tolerance) if entry["higher_is_better"] else (change > tolerance):
+            regressions.append(
+                f"{entry['name']} {entry['params']}: {before['value']:.4g} -> {entry['value']:.4g} {entry['unit']} ({change:+.0%})"
+            )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--only", nargs="+", choices=["poll", "history", "join", "publisher"])
+    parser.add_argument("--latency", type=float, default=0.005, help="seconds the mock API adds per request")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--poll-requests", type=int, default=500)
+    parser.add_argument("--pairs", type=int, default=20)
+    parser.add_argument("--history-size", type=int, default=5000)
+    parser.add_argument("--candles", type=int, nargs="+", default=[500, 2000, 10000])
+    parser.add_argument("--signals", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--publish", type=int, default=5000)
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--compare", help="baseline JSON file from an earlier run")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args()
+    selected = set(args.only or ["poll", "history", "join", "publisher"])
+
+    server = serve_mock(
+        pairs=args.pairs, history_size=args.history_size, latency=args.latency, error_rate=args.error_rate,
+    )
+    results = []
+    try:
+        if "poll" in selected:
+            results += bench_poll(server, args.poll_requests)
+        if "history" in selected:
+            results += bench_history(server, args.pairs)
+        if "join" in selected:
+            results += bench_join(args.candles, args.signals, args.repeat)
+        if "publisher" in selected:
+            results += bench_publisher(server, args.publish)
+    finally:
+        server.shutdown()
+
+    report = {
+        "meta": {
+            "created": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "mock_api": {"latency": args.latency, "error_rate": args.error_rate, "requests": server.api.counters},
+        },
+        "results": results,
+    }
+    for entry in results:
+        params = " ".join(f"{k}={v}" for k, v in entry["params"].items())
+        print(f"{entry['name']:<24} {entry['value']:>12.4g} {entry['unit']:<10} {params}")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,430 @@
+"""
+Local stand-ins for the FreqSignals API, used by the benchmarks so they never hit
+api.freqsignals.com. Speak HTTP/1.1 so clients can keep connections alive.
+
+StubHandler answers every request instantly with an empty result. MockApiHandler (started with
+serve_mock) implements the endpoints the client uses over generated data, with configurable
+latency, error rate and data set sizes, plus a server-sent events stream of the signals posted
+to it (or generated every --emit-interval seconds):
+
+    python benchmarks/stub_server.py --port 8765 --pairs 50 --history-size 5000 --latency 0.02
+    python benchmarks/stub_server.py --emit-interval 2
+
+and point a bot at it with FREQSIGNALS_HOST=127.0.0.1:8765 FREQSIGNALS_HTTPS=0.
+"""
+import argparse
+import hashlib
+import json
+import random
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+def parse_date(value):
+    """
+    Dates are compared parsed: as strings "12:00:00.5Z" sorts before "12:00:00Z"
+    """
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # buffer each response into a single write; unbuffered header/body writes stall on delayed ACKs
+    wbufsize = -1
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def send_json(self, data, status=200, headers=None):
+        body = json.dumps(data).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        if self.close_connection:
+            self.send_header("Connection", "close")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def read_body(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        return self.rfile.read(length) if length else b""
+
+    def do_GET(self):
+        self.send_json({"count": 0, "results": []})
+
+    def do_POST(self):
+        self.read_body()
+        if self.path.startswith("/oa2/token/"):
+            self.send_json({
+                "access_token": "stub-token",
+                "expires_in": 3600,
+                "scope": "read write",
+                "token_type": "Bearer",
+            })
+        else:
+            self.send_json({"status": "ok"})
+
+
+class MockApi:
+    """
+    Generated FreqSignals data and request counters shared by the MockApiHandler threads.
+    Every (pair, data set) has history_size signals, one every interval_minutes up to now,
+    the same for a given seed. Posted signals are added to it and streamed; with emit_interval
+    a random signal is posted every emit_interval seconds. Streams send a heartbeat every
+    stream_heartbeat seconds and, with stream_drop_after, end after that many events.
+    """
+
+    def __init__(
+        self,
+        pairs=20,
+        data_sets=1,
+        history_size=1000,
+        interval_minutes=5,
+        ttl_minutes=15,
+        latency=0.0,
+        error_rate=0.0,
+        token_expires_in=3600,
+        seed=0,
+        stream_heartbeat=15,
+        stream_drop_after=0,
+        emit_interval=0,
+    ):
+        self.pairs = [f"PAIR{i}/USDT" for i in range(pairs)]
+        self.data_sets = [f"00000000-0000-0000-0000-{i:012d}" for i in range(data_sets)]
+        self.history_size = history_size
+        self.interval = timedelta(minutes=interval_minutes)
+        self.ttl_minutes = ttl_minutes
+        self.latency = latency
+        self.error_rate = error_rate
+        self.token_expires_in = token_expires_in
+        self.seed = seed
+        self.end = datetime.now(timezone.utc).replace(tzinfo=None, second=0, microsecond=0)
+        self._random = random.Random(seed)
+        self._history = {}
+        self.stream_heartbeat = stream_heartbeat
+        self.stream_drop_after = stream_drop_after
+        self._lock = threading.Lock()
+        # every posted signal in order, streams follow it by position
+        self.published = []
+        self.published_changed = threading.Condition()
+        # the Last-Event-ID (None for a fresh stream) of every stream opened
+        self.stream_last_event_ids = []
+        self.counters = {
+            "requests": 0, "errors": 0, "tokens": 0, "unauthorized": 0, "not_modified": 0, "signals_received": 0, "streams": 0,
+        }
+        # access tokens handed out and not revoked, requests with any other token get a 401
+        self.tokens = set()
+        if emit_interval:
+            threading.Thread(target=self._emit, args=(emit_interval,), daemon=True).start()
+
+    def count(self, name, amount=1):
+        with self._lock:
+            self.counters[name] += amount
+
+    def should_fail(self):
+        if not self.error_rate:
+            return False
+        with self._lock:
+            return self._random.random() < self.error_rate
+
+    def history(self, pair, data_set_id):
+        """
+        Returns:
+            list - history items ({"t", "l", "v", "c"}), oldest first
+        """
+        key = (pair, data_set_id)
+        if key not in self._history:
+            rng = random.Random(f"{self.seed}:{pair}:{data_set_id}")
+            start = self.end - self.interval * (self.history_size - 1)
+            self._history[key] = [
+                {
+                    "t": (start + self.interval * i).isoformat() + "Z",
+                    "l": self.ttl_minutes,
+                    "v": round(rng.uniform(-1, 1), 4),
+                    "c": {"rsi": round(rng.uniform(0, 100), 2)},
+                }
+                for i in range(self.history_size)
+            ]
+        return self._history[key]
+
+    def publish(self, signals):
+        """
+        Adds posted signals to the history and the stream, dated now unless they have an updated_date
+        """
+        now = datetime.now(timezone.utc).replace(tzinfo=None).isoformat() + "Z"
+        published = []
+        for signal in signals:
+            signal = {"ttl_minutes": self.ttl_minutes, "context": None, "updated_date": now, **signal}
+            key = (signal["symbol"], signal["data_set_id"])
+            if key in self._history or (key[0] in self.pairs and key[1] in self.data_sets):
+                items = self.history(*key)
+            else:
+                # posted for a pair that isn't generated (the publisher benchmark): no history to make up
+                items = self._history.setdefault(key, [])
+            items.append({"t": signal["updated_date"], "l": signal["ttl_minutes"], "v": signal["value"], "c": signal["context"]})
+            published.append(signal)
+        with self.published_changed:
+            self.published.extend(published)
+            self.published_changed.notify_all()
+
+    def updated_since(self, updated_since, data_set_ids=None):
+        """
+        Returns:
+            list - every generated or posted signal updated at or after updated_since, oldest first
+        """
+        updated_since = parse_date(updated_since)
+        results = []
+        for (pair, data_set_id), items in list(self._history.items()):
+            if data_set_ids and data_set_id not in data_set_ids:
+                continue
+            for item in reversed(items):
+                if parse_date(item["t"]) < updated_since:
+                    break
+                results.append({
+                    "symbol": pair,
+                    "data_set_id": data_set_id,
+                    "updated_date": item["t"],
+                    "ttl_minutes": item["l"],
+                    "value": item["v"],
+                    "context": item["c"],
+                })
+        return sorted(results, key=lambda signal: parse_date(signal["updated_date"]))
+
+    def _emit(self, interval):
+        rng = random.Random(f"{self.seed}:emit")
+        while True:
+            time.sleep(interval)
+            self.publish([{
+                "symbol": rng.choice(self.pairs),
+                "data_set_id": rng.choice(self.data_sets),
+                "value": round(rng.uniform(-1, 1), 4),
+                "context": {"rsi": round(rng.uniform(0, 100), 2)},
+            }])
+
+    def latest(self, data_set_ids=None, updated_since=None):
+        """
+        Returns:
+            list - the latest signal of every pair and data set, as the signals endpoint returns them
+        """
+        updated_since = updated_since and parse_date(updated_since)
+        results = []
+        for data_set_id in data_set_ids or self.data_sets:
+            for pair in self.pairs:
+                item = self.history(pair, data_set_id)[-1]
+                if updated_since and parse_date(item["t"]) < updated_since:
+                    continue
+                results.append({
+                    "symbol": pair,
+                    "data_set_id": data_set_id,
+                    "updated_date": item["t"],
+                    "ttl_minutes": item["l"],
+                    "value": item["v"],
+                    "context": item["c"],
+                })
+        return results
+
+
+class MockApiHandler(StubHandler):
+    """
+    Serves /oa2/token/, /api/crud/signals/ (with ETag revalidation), /api/crud/signal_history/
+    (limit / offset pages, updated_date__gte / __lt), /api/async/signals/ and the
+    /api/stream/signals/ event stream (resuming from Last-Event-ID or updated_date__gte) from
+    the MockApi at server.api. Requests other than for a token need one it handed out.
+    """
+
+    def begin(self):
+        """
+        Counts the request, applies the configured latency and error rate and checks the token
+        Returns:
+            bool - False if the request was answered with an injected error or a 401
+        """
+        api = self.server.api
+        api.count("requests")
+        if api.latency:
+            time.sleep(api.latency)
+        if api.should_fail():
+            api.count("errors")
+            self.read_body()
+            self.send_json({"detail": "injected error"}, status=503)
+            return False
+        authorization = self.headers.get("Authorization", "")
+        if not self.path.startswith("/oa2/token/") and authorization[len("Bearer "):] not in api.tokens:
+            api.count("unauthorized")
+            self.read_body()
+            self.send_json({"detail": "invalid token"}, status=401)
+            return False
+        return True
+
+    def do_GET(self):
+        if not self.begin():
+            return
+        api = self.server.api
+        url = urlparse(self.path)
+        query = {k: v[0] for k, v in parse_qs(url.query).items()}
+        if url.path == "/api/crud/signals/":
+            data_set_ids = query["data_set_id__in"].split(",") if query.get("data_set_id__in") else None
+            results = api.latest(data_set_ids, query.get("updated_date__gte"))
+            body = {"count": len(results), "results": results}
+            etag = '"{}"'.format(hashlib.sha1(json.dumps(body, sort_keys=True).encode()).hexdigest())
+            if self.headers.get("If-None-Match") == etag:
+                api.count("not_modified")
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            self.send_json(body, headers={"ETag": etag})
+        elif url.path == "/api/crud/signal_history/":
+            items = api.history(query.get("symbol"), query.get("data_set_id"))
+            if query.get("updated_date__gte"):
+                items = [item for item in items if parse_date(item["t"]) >= parse_date(query["updated_date__gte"])]
+            if query.get("updated_date__lt"):
+                items = [item for item in items if parse_date(item["t"]) < parse_date(query["updated_date__lt"])]
+            offset = int(query.get("offset", 0))
+            limit = int(query.get("limit", 1000))
+            self.send_json({"count": len(items), "results": items[offset:offset + limit]})
+        elif url.path == "/api/stream/signals/":
+            self.stream_signals(query)
+        else:
+            self.send_json({"detail": "not found"}, status=404)
+
+    def write_chunk(self, data):
+        self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+        self.wfile.flush()
+
+    def send_event(self, signals):
+        data = json.dumps(signals)
+        self.write_chunk(f"id: {signals[-1]['updated_date']}\nevent: signals\ndata: {data}\n\n".encode())
+
+    def stream_signals(self, query):
+        api = self.server.api
+        data_set_ids = set(query["data_set_id__in"].split(",")) if query.get("data_set_id__in") else None
+        since = self.headers.get("Last-Event-ID") or query.get("updated_date__gte")
+        api.count("streams")
+        api.stream_last_event_ids.append(self.headers.get("Last-Event-ID"))
+        self.close_connection = True
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        # the handler's output is buffered, clients only count as connected once they get the headers
+        self.wfile.flush()
+        with api.published_changed:
+            position = len(api.published)
+        # signals published meanwhile are sent twice rather than not at all
+        backlog = api.updated_since(since, data_set_ids) if since else []
+        events = 0
+        try:
+            if backlog:
+                self.send_event(backlog)
+                events += 1
+            while not api.stream_drop_after or events < api.stream_drop_after:
+                with api.published_changed:
+                    api.published_changed.wait_for(lambda: len(api.published) > position, api.stream_heartbeat)
+                    batch = api.published[position:]
+                position += len(batch)
+                batch = [signal for signal in batch if not data_set_ids or signal["data_set_id"] in data_set_ids]
+                if batch:
+                    self.send_event(batch)
+                    events += 1
+                else:
+                    self.write_chunk(b": heartbeat\n\n")
+            self.write_chunk(b"")
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def do_POST(self):
+        if not self.begin():
+            return
+        api = self.server.api
+        body = self.read_body()
+        path = urlparse(self.path).path
+        if path == "/oa2/token/":
+            api.count("tokens")
+            token = f"mock-token-{api.counters['tokens']}"
+            api.tokens.add(token)
+            self.send_json({
+                "access_token": token,
+                "expires_in": api.token_expires_in,
+                "scope": "read write",
+                "token_type": "Bearer",
+            })
+        elif path == "/api/async/signals/":
+            signals = json.loads(body or b"null")
+            signals = signals if isinstance(signals, list) else [signals]
+            api.count("signals_received", len(signals))
+            api.publish(signals)
+            self.send_json({"status": "ok"})
+        else:
+            self.send_json({"detail": "not found"}, status=404)
+
+
+def serve_mock(host="127.0.0.1", port=0, **options):
+    """
+    Starts the mock API on a daemon thread
+    Args:
+        host: str - interface to bind
+        port: int - port to bind, 0 picks a free one
+        options: dict - MockApi options
+
+    Returns:
+        ThreadingHTTPServer - its api attribute is the MockApi, call shutdown() when done
+    """
+    server = ThreadingHTTPServer((host, port), MockApiHandler)
+    server.daemon_threads = True
+    server.api = MockApi(**options)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def serve(host="127.0.0.1", port=0, handler=StubHandler):
+    """
+    Starts the stub server on a daemon thread
+    Args:
+        host: str - interface to bind
+        port: int - port to bind, 0 picks a free one
+        handler: class - request handler
+
+    Returns:
+        ThreadingHTTPServer - call shutdown() when done; server_address has the bound port
+    """
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Runs the mock FreqSignals API in the foreground")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--pairs", type=int, default=20)
+    parser.add_argument("--data-sets", type=int, default=1)
+    parser.add_argument("--history-size", type=int, default=1000)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every request")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of requests answered with 503")
+    parser.add_argument("--emit-interval", type=float, default=0.0, help="seconds between generated signals")
+    parser.add_argument("--stream-heartbeat", type=float, default=15.0)
+    args = parser.parse_args()
+    server = serve_mock(
+        args.host, args.port, pairs=args.pairs, data_sets=args.data_sets, history_size=args.history_size,
+        latency=args.latency, error_rate=args.error_rate, emit_interval=args.emit_interval,
+        stream_heartbeat=args.stream_heartbeat,
+    )
+    print(f"mock FreqSignals API on {args.host}:{server.server_address[1]}, data sets: {', '.join(server.api.data_sets)}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
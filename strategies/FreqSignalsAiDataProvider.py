@@ -9,7 +9,7 @@ from pandas import DataFrame
 from technical import qtpylib
 
 from freqtrade.strategy import CategoricalParameter, IStrategy, merge_informative_pair
-from freqsignals import FreqSignalsStrategy, FreqSignalsMixin
+from freqsignals import FreqSignalsStrategy, FreqSignalsMixin, FreqSignalsFeatureCache
 DATA_SET_ID = os.environ.get("FREQSIGNALS_AI_DATA_SET_ID")
 
 
@@ -45,6 +45,14 @@ class FreqSignalsAiDataProvider(IStrategy, FreqSignalsMixin):
     # this is the maximum period fed to talib (timeframe independent)
     startup_candle_count: int = 40
     can_short = False
+    # post signals from a background thread so a slow upload doesn't hold up other pairs
+    freqsignals_async_publish = True
+    # don't post a signal that repeats the previous one while that is still valid, the price
+    # context moves every candle so it doesn't count as a change
+    freqsignals_deduplicate = True
+    freqsignals_deduplicate_options = {"ignore_keys": ("price", "last_move")}
+    # keep features as float32, halving the memory of the feature frames
+    features_float32 = False
 
     std_dev_multiplier_buy = CategoricalParameter(
         [0.75, 1, 1.25, 1.5, 1.75], default=1.25, space="buy", optimize=True)
@@ -55,6 +63,7 @@ class FreqSignalsAiDataProvider(IStrategy, FreqSignalsMixin):
         super().__init__(*args, **kwargs)
         self.freqsignals_init()
         self.signal_update_time_by_pair: Dict[str, str] = {}
+        self.feature_cache = FreqSignalsFeatureCache(float32=self.features_float32)
 
     def populate_any_indicators(
         self, pair, df, tf, informative=None, set_generalized_indicators=False
@@ -75,49 +84,16 @@ class FreqSignalsAiDataProvider(IStrategy, FreqSignalsMixin):
         if informative is None:
             informative = self.dp.get_pair_dataframe(pair, tf)
 
-        # first loop is automatically duplicating indicators for time periods
-        for t in self.freqai_info["feature_parameters"]["indicator_periods_candles"]:
-
-            t = int(t)
-            informative[f"%-{pair}rsi-period_{t}"] = ta.RSI(informative, timeperiod=t)
-            # informative[f"%-{pair}mfi-period_{t}"] = ta.MFI(informative, timeperiod=t)
-            informative[f"%-{pair}adx-period_{t}"] = ta.ADX(informative, timeperiod=t)
-            informative[f"%-{pair}sma-period_{t}"] = ta.SMA(informative, timeperiod=t)
-            informative[f"%-{pair}ema-period_{t}"] = ta.EMA(informative, timeperiod=t)
-
-            # bollinger = qtpylib.bollinger_bands(
-            #     qtpylib.typical_price(informative), window=t, stds=2.2
-            # )
-            # informative[f"{pair}bb_lowerband-period_{t}"] = bollinger["lower"]
-            # informative[f"{pair}bb_middleband-period_{t}"] = bollinger["mid"]
-            # informative[f"{pair}bb_upperband-period_{t}"] = bollinger["upper"]
-
-            # informative[f"%-{pair}bb_width-period_{t}"] = (
-            #     informative[f"{pair}bb_upperband-period_{t}"]
-            #     - informative[f"{pair}bb_lowerband-period_{t}"]
-            # ) / informative[f"{pair}bb_middleband-period_{t}"]
-            # informative[f"%-{pair}close-bb_lower-period_{t}"] = (
-            #     informative["close"] / informative[f"{pair}bb_lowerband-period_{t}"]
-            # )
-
-            # informative[f"%-{pair}roc-period_{t}"] = ta.ROC(informative, timeperiod=t)
-
-            informative[f"%-{pair}relative_volume-period_{t}"] = (
-                informative["volume"] / informative["volume"].rolling(t).mean()
-            )
-
-        informative[f"%-{pair}pct-change"] = informative["close"].pct_change()
-        informative[f"%-{pair}raw_volume"] = informative["volume"]
-        informative[f"%-{pair}raw_price"] = informative["close"]
-
-        indicators = [col for col in informative if col.startswith("%")]
-        # This loop duplicates and shifts all indicators to add a sense of recency to data
-        for n in range(self.freqai_info["feature_parameters"]["include_shifted_candles"] + 1):
-            if n == 0:
-                continue
-            informative_shift = informative[indicators].shift(n)
-            informative_shift = informative_shift.add_suffix("_shift-" + str(n))
-            informative = pd.concat((informative, informative_shift), axis=1)
+        periods = [int(t) for t in self.freqai_info["feature_parameters"]["indicator_periods_candles"]]
+        # features are only computed for new candles, over enough earlier candles for the
+        # smoothed indicators (RSI, ADX, EMA) to settle
+        informative = self.feature_cache.populate(
+            (pair, tf),
+            informative,
+            lambda candles: self.compute_features(pair, candles, periods),
+            shifted_candles=self.freqai_info["feature_parameters"]["include_shifted_candles"],
+            warmup=20 * max(periods),
+        )
 
         df = merge_informative_pair(df, informative, self.config["timeframe"], tf, ffill=True)
         skip_columns = [
@@ -172,6 +148,49 @@ class FreqSignalsAiDataProvider(IStrategy, FreqSignalsMixin):
 
         return df
 
+    def compute_features(self, pair, informative, periods):
+        """
+        The indicators of populate_any_indicators, names starting with % are passed to the model
+        :param pair: pair the candles belong to
+        :param informative: candles to compute the indicators over
+        :param periods: indicator_periods_candles
+        :return: dict of column name -> values aligned with informative
+        """
+        features = {}
+        # first loop is automatically duplicating indicators for time periods
+        for t in periods:
+            features[f"%-{pair}rsi-period_{t}"] = ta.RSI(informative, timeperiod=t)
+            # features[f"%-{pair}mfi-period_{t}"] = ta.MFI(informative, timeperiod=t)
+            features[f"%-{pair}adx-period_{t}"] = ta.ADX(informative, timeperiod=t)
+            features[f"%-{pair}sma-period_{t}"] = ta.SMA(informative, timeperiod=t)
+            features[f"%-{pair}ema-period_{t}"] = ta.EMA(informative, timeperiod=t)
+
+            # bollinger = qtpylib.bollinger_bands(
+            #     qtpylib.typical_price(informative), window=t, stds=2.2
+            # )
+            # features[f"{pair}bb_lowerband-period_{t}"] = bollinger["lower"]
+            # features[f"{pair}bb_middleband-period_{t}"] = bollinger["mid"]
+            # features[f"{pair}bb_upperband-period_{t}"] = bollinger["upper"]
+
+            # features[f"%-{pair}bb_width-period_{t}"] = (
+            #     features[f"{pair}bb_upperband-period_{t}"]
+            #     - features[f"{pair}bb_lowerband-period_{t}"]
+            # ) / features[f"{pair}bb_middleband-period_{t}"]
+            # features[f"%-{pair}close-bb_lower-period_{t}"] = (
+            #     informative["close"] / features[f"{pair}bb_lowerband-period_{t}"]
+            # )
+
+            # features[f"%-{pair}roc-period_{t}"] = ta.ROC(informative, timeperiod=t)
+
+            features[f"%-{pair}relative_volume-period_{t}"] = (
+                informative["volume"] / informative["volume"].rolling(t).mean()
+            )
+
+        features[f"%-{pair}pct-change"] = informative["close"].pct_change()
+        features[f"%-{pair}raw_volume"] = informative["volume"]
+        features[f"%-{pair}raw_price"] = informative["close"]
+        return features
+
     def populate_indicators(self, dataframe: DataFrame, metadata: dict) -> DataFrame:
 
         # All indicators must be populated by populate_any_indicators() for live functionality
@@ -194,6 +213,22 @@ class FreqSignalsAiDataProvider(IStrategy, FreqSignalsMixin):
 
         # Begin FreqSignals. Above here is from the FreqaiExampleStrategy
         # https://github.com/freqtrade/freqtrade/blob/develop/freqtrade/templates/FreqaiExampleStrategy.py
+        if self.freqsignals_is_backfilling():
+            # seed the data set: the signal below, for every candle of the backtest
+            up_down_values = dataframe["&-s_close"]
+            self.freqsignals_backfill_frame(metadata['pair'], DATA_SET_ID, DataFrame({
+                "date": dataframe["date"],
+                "value": np.where(up_down_values == 'up', 1, np.where(up_down_values == 'down', -1, 0)),
+                "ttl_minutes": 60,
+                "s_close": dataframe["&-s_close"].round(4),
+                "s_close_mean": dataframe["&-s_close_mean"].round(4),
+                "do_predict": dataframe["do_predict"].round(4),
+                "DI_values": dataframe["do_predict"].round(4),
+                "price": dataframe["close"].round(4),
+                "last_move": (dataframe["close"] - dataframe["close"].shift()).round(4),
+            }))
+            return dataframe
+
         last_update_time = self.signal_update_time_by_pair.get(metadata['pair'])
         current_candle_time = dataframe.iloc[-1].date
 
@@ -8,6 +8,8 @@ import json
 from technical import qtpylib
 
 from freqtrade.strategy import CategoricalParameter, IStrategy, merge_informative_pair
+from freqtrade.exchange import timeframe_to_minutes
+from freqsignals import FreqSignalsDeduplicator, FreqSignalsFeatureCache
 
 
 logger = logging.getLogger(__name__)
@@ -41,12 +43,23 @@ class FreqSignalsAiWebhookDataProvider(IStrategy):
     # this is the maximum period fed to talib (timeframe independent)
     startup_candle_count: int = 40
     can_short = False
+    # keep features as float32, halving the memory of the feature frames
+    features_float32 = False
 
     std_dev_multiplier_buy = CategoricalParameter(
         [0.75, 1, 1.25, 1.5, 1.75], default=1.25, space="buy", optimize=True)
     std_dev_multiplier_sell = CategoricalParameter(
         [0.75, 1, 1.25, 1.5, 1.75], space="sell", default=1.25, optimize=True)
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.feature_cache = FreqSignalsFeatureCache(float32=self.features_float32)
+        # don't send a signal that repeats the previous one while that is still valid, the price
+        # context moves every candle so it doesn't count as a change
+        self.signal_deduplicator = FreqSignalsDeduplicator(
+            heartbeat_minutes=2 * timeframe_to_minutes(self.config["timeframe"]), ignore_keys=("price", "last_move")
+        )
+
     def populate_any_indicators(
         self, pair, df, tf, informative=None, set_generalized_indicators=False
     ):
@@ -66,49 +79,16 @@ class FreqSignalsAiWebhookDataProvider(IStrategy):
         if informative is None:
             informative = self.dp.get_pair_dataframe(pair, tf)
 
-        # first loop is automatically duplicating indicators for time periods
-        for t in self.freqai_info["feature_parameters"]["indicator_periods_candles"]:
-
-            t = int(t)
-            informative[f"%-{pair}rsi-period_{t}"] = ta.RSI(informative, timeperiod=t)
-            # informative[f"%-{pair}mfi-period_{t}"] = ta.MFI(informative, timeperiod=t)
-            informative[f"%-{pair}adx-period_{t}"] = ta.ADX(informative, timeperiod=t)
-            informative[f"%-{pair}sma-period_{t}"] = ta.SMA(informative, timeperiod=t)
-            informative[f"%-{pair}ema-period_{t}"] = ta.EMA(informative, timeperiod=t)
-
-            bollinger = qtpylib.bollinger_bands(
-                qtpylib.typical_price(informative), window=t, stds=2.2
-            )
-            informative[f"{pair}bb_lowerband-period_{t}"] = bollinger["lower"]
-            informative[f"{pair}bb_middleband-period_{t}"] = bollinger["mid"]
-            informative[f"{pair}bb_upperband-period_{t}"] = bollinger["upper"]
-
-            informative[f"%-{pair}bb_width-period_{t}"] = (
-                informative[f"{pair}bb_upperband-period_{t}"]
-                - informative[f"{pair}bb_lowerband-period_{t}"]
-            ) / informative[f"{pair}bb_middleband-period_{t}"]
-            informative[f"%-{pair}close-bb_lower-period_{t}"] = (
-                informative["close"] / informative[f"{pair}bb_lowerband-period_{t}"]
-            )
-
-            informative[f"%-{pair}roc-period_{t}"] = ta.ROC(informative, timeperiod=t)
-
-            informative[f"%-{pair}relative_volume-period_{t}"] = (
-                informative["volume"] / informative["volume"].rolling(t).mean()
-            )
-
-        informative[f"%-{pair}pct-change"] = informative["close"].pct_change()
-        informative[f"%-{pair}raw_volume"] = informative["volume"]
-        informative[f"%-{pair}raw_price"] = informative["close"]
-
-        indicators = [col for col in informative if col.startswith("%")]
-        # This loop duplicates and shifts all indicators to add a sense of recency to data
-        for n in range(self.freqai_info["feature_parameters"]["include_shifted_candles"] + 1):
-            if n == 0:
-                continue
-            informative_shift = informative[indicators].shift(n)
-            informative_shift = informative_shift.add_suffix("_shift-" + str(n))
-            informative = pd.concat((informative, informative_shift), axis=1)
+        periods = [int(t) for t in self.freqai_info["feature_parameters"]["indicator_periods_candles"]]
+        # features are only computed for new candles, over enough earlier candles for the
+        # smoothed indicators (RSI, ADX, EMA) to settle
+        informative = self.feature_cache.populate(
+            (pair, tf),
+            informative,
+            lambda candles: self.compute_features(pair, candles, periods),
+            shifted_candles=self.freqai_info["feature_parameters"]["include_shifted_candles"],
+            warmup=20 * max(periods),
+        )
 
         df = merge_informative_pair(df, informative, self.config["timeframe"], tf, ffill=True)
         skip_columns = [
@@ -135,6 +115,49 @@ class FreqSignalsAiWebhookDataProvider(IStrategy):
 
         return df
 
+    def compute_features(self, pair, informative, periods):
+        """
+        The indicators of populate_any_indicators, names starting with % are passed to the model
+        :param pair: pair the candles belong to
+        :param informative: candles to compute the indicators over
+        :param periods: indicator_periods_candles
+        :return: dict of column name -> values aligned with informative
+        """
+        features = {}
+        # first loop is automatically duplicating indicators for time periods
+        for t in periods:
+            features[f"%-{pair}rsi-period_{t}"] = ta.RSI(informative, timeperiod=t)
+            # features[f"%-{pair}mfi-period_{t}"] = ta.MFI(informative, timeperiod=t)
+            features[f"%-{pair}adx-period_{t}"] = ta.ADX(informative, timeperiod=t)
+            features[f"%-{pair}sma-period_{t}"] = ta.SMA(informative, timeperiod=t)
+            features[f"%-{pair}ema-period_{t}"] = ta.EMA(informative, timeperiod=t)
+
+            bollinger = qtpylib.bollinger_bands(
+                qtpylib.typical_price(informative), window=t, stds=2.2
+            )
+            features[f"{pair}bb_lowerband-period_{t}"] = bollinger["lower"]
+            features[f"{pair}bb_middleband-period_{t}"] = bollinger["mid"]
+            features[f"{pair}bb_upperband-period_{t}"] = bollinger["upper"]
+
+            features[f"%-{pair}bb_width-period_{t}"] = (
+                features[f"{pair}bb_upperband-period_{t}"]
+                - features[f"{pair}bb_lowerband-period_{t}"]
+            ) / features[f"{pair}bb_middleband-period_{t}"]
+            features[f"%-{pair}close-bb_lower-period_{t}"] = (
+                informative["close"] / features[f"{pair}bb_lowerband-period_{t}"]
+            )
+
+            features[f"%-{pair}roc-period_{t}"] = ta.ROC(informative, timeperiod=t)
+
+            features[f"%-{pair}relative_volume-period_{t}"] = (
+                informative["volume"] / informative["volume"].rolling(t).mean()
+            )
+
+        features[f"%-{pair}pct-change"] = informative["close"].pct_change()
+        features[f"%-{pair}raw_volume"] = informative["volume"]
+        features[f"%-{pair}raw_price"] = informative["close"]
+        return features
+
     def populate_indicators(self, dataframe: DataFrame, metadata: dict) -> DataFrame:
 
         # All indicators must be populated by populate_any_indicators() for live functionality
@@ -156,7 +179,7 @@ class FreqSignalsAiWebhookDataProvider(IStrategy):
                 )
 
         # Send to FreqSignals
-        msg = json.dumps({
+        signal_data = {
             # required fields
             "symbol": metadata['pair'],
             "value": round(dataframe.iloc[-1]["&-s_close"], 4),
@@ -170,9 +193,10 @@ class FreqSignalsAiWebhookDataProvider(IStrategy):
             "DI_values": round(dataframe.iloc[-1]["do_predict"], 4),
             "price": round(dataframe.iloc[-1]["close"], 4),
             "last_move": round(dataframe.iloc[-1]["close"] - dataframe.iloc[-2]["close"], 4),
-        })
+        }
 
-        self.dp.send_msg(msg)
+        if self.signal_deduplicator.should_send(signal_data):
+            self.dp.send_msg(json.dumps(signal_data))
     
         return dataframe
 
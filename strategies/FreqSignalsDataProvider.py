@@ -19,6 +19,12 @@ class FreqSignalsDataProvider(IStrategy, FreqSignalsMixin):
     }
 
     stoploss = -0.03
+    # post signals from a background thread so a slow upload doesn't hold up other pairs
+    freqsignals_async_publish = True
+    # don't post a signal that repeats the previous one while that is still valid, the price
+    # context moves every candle so it doesn't count as a change
+    freqsignals_deduplicate = True
+    freqsignals_deduplicate_options = {"ignore_keys": ("price", "last_move")}
     timeframe = '5m'
 
 
@@ -55,6 +61,20 @@ class FreqSignalsDataProvider(IStrategy, FreqSignalsMixin):
         ),
         'oversold'] = 1
 
+        if self.freqsignals_is_backfilling():
+            # seed the data set: the signal below, for every candle of the backtest
+            self.freqsignals_backfill_frame(metadata['pair'], DATA_SET_ID, DataFrame({
+                "date": df["date"],
+                "value": (df["close"] - df["close"].shift()).round(4),
+                "ttl_minutes": 60,
+                "rsi": df["rsi"].round(2),
+                "overbought": df["overbought"].astype(int),
+                "oversold": df["oversold"].astype(int),
+                "price": df["close"].round(4),
+                "last_move": (df["close"] - df["close"].shift()).round(4),
+            }))
+            return df
+
         last_update_time = self.signal_update_time_by_pair.get(metadata['pair'])
         current_candle_time = df.iloc[-1].date
 
@@ -6,6 +6,8 @@ DATA_SET_ID = os.environ.get("FREQSIGNALS_DATA_SET_ID")
 
 class FreqSignalsFollower(FreqSignalsStrategy):
 
+    freqsignals_data_set_ids = [DATA_SET_ID]
+    freqsignals_warm_up_history = True
     freqsignals_data_set_names = {
         # Mapping of a data set id to the name of the feature / column
         DATA_SET_ID: "fs_signal"
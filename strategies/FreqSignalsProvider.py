@@ -19,6 +19,10 @@ class FreqSignalsProvider(IStrategy, FreqSignalsMixin):
     }
 
     stoploss = -0.03
+    # post signals from a background thread so a slow upload doesn't hold up other pairs
+    freqsignals_async_publish = True
+    # don't post a signal that repeats the previous one while that is still valid
+    freqsignals_deduplicate = True
     timeframe = '1m'
 
 
@@ -56,6 +60,16 @@ class FreqSignalsProvider(IStrategy, FreqSignalsMixin):
         ),
         'signal'] = -0.05
 
+        if self.freqsignals_is_backfilling():
+            # seed the data set: the signal below, for every candle with a move
+            self.freqsignals_backfill_frame(metadata['pair'], DATA_SET_ID, DataFrame({
+                "date": df["date"],
+                "value": df["signal"].where(df["signal"] != 0),
+                "ttl_minutes": 60,
+                "rsi": df["rsi"],
+            }))
+            return df
+
         signal = df.iloc[-1]['signal']
         last_update_time = self.signal_update_time_by_pair.get(metadata['pair'])
         current_candle_time = df.iloc[-1].date
@@ -4,6 +4,8 @@ import json
 from typing import Dict
 from pandas import DataFrame
 from freqtrade.strategy.interface import IStrategy
+from freqtrade.exchange import timeframe_to_minutes
+from freqsignals import FreqSignalsDeduplicator
 
 import talib.abstract as ta
 
@@ -29,11 +31,19 @@ class FreqSignalsWebhookDataProvider(IStrategy):
         }
     }
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # don't send a signal that repeats the previous one while that is still valid, the price
+        # context moves every candle so it doesn't count as a change
+        self.signal_deduplicator = FreqSignalsDeduplicator(
+            heartbeat_minutes=2 * timeframe_to_minutes(self.timeframe), ignore_keys=("price", "last_move")
+        )
+
     def populate_indicators(self, df: DataFrame, metadata: dict) -> DataFrame:
         # Some logic to establish a signal. For simplicity, using RSI.
         df['rsi'] = ta.RSI(df, timeperiod=14)
 
-        msg = json.dumps({
+        signal_data = {
             # required fields
             "symbol": metadata['pair'],
             "value": round(df.iloc[-1]["rsi"], 4),
@@ -43,9 +53,10 @@ class FreqSignalsWebhookDataProvider(IStrategy):
             "rsi": round(df.iloc[-1]["rsi"], 4),
             "price": round(df.iloc[-1]["close"], 4),
             "last_move": round(df.iloc[-1]["close"] - df.iloc[-2]["close"], 4),
-        })
+        }
 
-        self.dp.send_msg(msg)
+        if self.signal_deduplicator.should_send(signal_data):
+            self.dp.send_msg(json.dumps(signal_data))
 
         return df
 
@@ -1,27 +1,89 @@
 import os
+import re
 import logging
 import json
 import requests
 import numpy as np
 from urllib.parse import urlencode
+from freqtrade.exchange import timeframe_to_minutes
 from freqtrade.strategy.interface import IStrategy
 from typing import Dict, Tuple
-from pandas import DataFrame
-from datetime import datetime, timedelta
+from pandas import DataFrame, Series, concat, read_feather, to_datetime, to_numeric
+from datetime import datetime, timedelta, timezone
 
 
 import time
-from requests.exceptions import ConnectTimeout, RequestException
+import asyncio
+import hashlib
+import inspect
+import atexit
+import bisect
+import heapq
+import random
+import socket
+import sqlite3
+import threading
+import zipfile
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+from concurrent.futures import TimeoutError as FuturesTimeoutError
+from functools import partial
+from email.utils import parsedate_to_datetime
+from requests.adapters import HTTPAdapter
+from requests.exceptions import ConnectTimeout, RequestException, Timeout
+
+try:
+    import orjson
+except ImportError:  # optional, speeds up encoding request bodies
+    orjson = None
+
+try:
+    import aiohttp
+except ImportError:  # optional, only FreqSignalsAsyncClient needs it (freqtrade installs it for ccxt)
+    aiohttp = None
+
+
+logger = logging.getLogger(__name__)
 
 
 class FreqSignalsError(Exception):
-    pass
+    def __init__(self, *args, status_code=None):
+        """
+        Args:
+            status_code: int - optional - status of the response that caused it
+        """
+        super().__init__(*args)
+        self.status_code = status_code
 
 
 class FreqSignalsTimeoutError(Exception):
     pass
 
 
+class FreqSignalsCircuitOpenError(FreqSignalsError):
+    """
+    Raised without making a request while the circuit breaker considers the API down
+    """
+    pass
+
+
+class FreqSignalsTokenError(FreqSignalsError):
+    """
+    Raised when the token endpoint refuses or returns something that isn't a token
+    """
+
+    def __init__(self, message, status_code=None, retry_after=None):
+        """
+        Args:
+            message: str - what went wrong
+            status_code: int - optional - the token endpoint's status, None for a malformed response
+            retry_after: str - optional - Retry-After header of the response
+        """
+        super().__init__(message, status_code=status_code)
+        self.retry_after = retry_after
+
+
 
 DEFAULT_HOST = os.environ.get("FREQSIGNALS_HOST", "api.freqsignals.com")
 DEFAULT_HTTPS = str(os.environ.get("FREQSIGNALS_HTTPS", "1")) != "0"
@@ -30,17 +92,702 @@ DEFAULT_CLIENT_SECRET = os.environ.get("FREQSIGNALS_CLIENT_SECRET")
 DEFAULT_REQUEST_TIMEOUT = 20
 DEFAULT_REQUEST_MAX_ATTEMPTS = 2
 DEFAULT_REQUEST_WAIT_INTERVAL = 1
+# Retries, see FreqSignalsRetryPolicy - the wait interval is the first backoff, doubling up to the max
+DEFAULT_REQUEST_BACKOFF_MAX = 10
+DEFAULT_REQUEST_RETRY_STATUSES = (429, 500, 502, 503, 504)
+# Circuit breaker, see FreqSignalsCircuitBreaker
+DEFAULT_CIRCUIT_FAILURE_THRESHOLD = int(os.environ.get("FREQSIGNALS_CIRCUIT_FAILURE_THRESHOLD", "5"))
+DEFAULT_CIRCUIT_RESET_TIMEOUT = float(os.environ.get("FREQSIGNALS_CIRCUIT_RESET_TIMEOUT", "30"))
+# Connection pooling - pool_connections is the number of hosts kept, pool_maxsize the connections per host
+DEFAULT_POOL_CONNECTIONS = int(os.environ.get("FREQSIGNALS_POOL_CONNECTIONS", "2"))
+DEFAULT_POOL_MAXSIZE = int(os.environ.get("FREQSIGNALS_POOL_MAXSIZE", "10"))
+DEFAULT_POOL_BLOCK = str(os.environ.get("FREQSIGNALS_POOL_BLOCK", "0")) != "0"
+DEFAULT_KEEP_ALIVE = str(os.environ.get("FREQSIGNALS_KEEP_ALIVE", "1")) != "0"
+DEFAULT_HISTORY_PAGE_SIZE = 1000
+# OAuth token handling, see FreqSignalsTokenManager
+DEFAULT_TOKEN_FILE = os.environ.get("FREQSIGNALS_TOKEN_FILE")
+DEFAULT_TOKEN_REFRESH_MARGIN = 60
+DEFAULT_TOKEN_BACKGROUND_REFRESH = str(os.environ.get("FREQSIGNALS_TOKEN_BACKGROUND_REFRESH", "1")) != "0"
+DEFAULT_ASYNC_MAX_CONCURRENCY = int(os.environ.get("FREQSIGNALS_ASYNC_MAX_CONCURRENCY", "20"))
+# On-disk signal history, see FreqSignalsHistoryCache
+DEFAULT_HISTORY_CACHE_DIR = os.environ.get("FREQSIGNALS_HISTORY_CACHE_DIR")
+DEFAULT_HISTORY_OFFLINE = str(os.environ.get("FREQSIGNALS_HISTORY_OFFLINE", "0")) != "0"
+# how far before the cached end the tail is re-requested, for signals that land late
+DEFAULT_HISTORY_CACHE_OVERLAP = timedelta(hours=1)
+# Directory the loaded history is exported to for backtest / hyperopt worker processes to share
+DEFAULT_SHARED_STORE_PATH = os.environ.get("FREQSIGNALS_SHARED_STORE")
+# SQLite database the bots on a host share signals through, see FreqSignalsSharedCache, and
+# seconds a leader that stopped polling keeps its lease
+DEFAULT_SHARED_CACHE_PATH = os.environ.get("FREQSIGNALS_SHARED_CACHE")
+DEFAULT_SHARED_CACHE_LEASE = float(os.environ.get("FREQSIGNALS_SHARED_CACHE_LEASE", "30"))
+# Warm restarts: file the live signal state is saved to every interval seconds and at exit,
+# see FreqSignalsMixin.freqsignals_save_snapshot
+DEFAULT_SNAPSHOT_PATH = os.environ.get("FREQSIGNALS_SNAPSHOT")
+DEFAULT_SNAPSHOT_INTERVAL = float(os.environ.get("FREQSIGNALS_SNAPSHOT_INTERVAL", "600"))
+# Background publishing of post_signal
+DEFAULT_PUBLISHER_MAX_QUEUE_SIZE = 10000
+# more than 1 posts signals as a JSON array, only for an API that accepts arrays
+DEFAULT_PUBLISHER_MAX_BATCH_SIZE = int(os.environ.get("FREQSIGNALS_PUBLISHER_MAX_BATCH_SIZE", "1"))
+DEFAULT_PUBLISHER_LINGER = 0.5
+# uploads that failed are queued again after a backoff, up to max attempts per signal
+DEFAULT_PUBLISHER_MAX_ATTEMPTS = int(os.environ.get("FREQSIGNALS_PUBLISHER_MAX_ATTEMPTS", "5"))
+DEFAULT_PUBLISHER_BACKOFF = 1
+DEFAULT_PUBLISHER_BACKOFF_MAX = 30
+DEFAULT_PUBLISHER_CLOSE_TIMEOUT = 10
+# Suppressing unchanged signals, see FreqSignalsDeduplicator - an unchanged signal is sent
+# again this many minutes before the previous one expires
+DEFAULT_DEDUP_HEARTBEAT_MINUTES = 10
+# Seconds between background polls of the latest signals, see FreqSignalsPoller
+DEFAULT_POLL_INTERVAL = float(os.environ.get("FREQSIGNALS_POLL_INTERVAL", "5"))
+# Seeding a data set's history from a backtest, see FreqSignalsBackfill
+DEFAULT_BACKFILL = str(os.environ.get("FREQSIGNALS_BACKFILL", "0")) != "0"
+DEFAULT_BACKFILL_STATE = os.environ.get("FREQSIGNALS_BACKFILL_STATE", "freqsignals_backfill.done")
+# as with the publisher, more than 1 posts JSON arrays; 1 (a request per candle) because the
+# signals endpoint is only known to accept a single signal
+DEFAULT_BACKFILL_CHUNK_SIZE = int(os.environ.get("FREQSIGNALS_BACKFILL_CHUNK_SIZE", "1"))
+DEFAULT_BACKFILL_WORKERS = int(os.environ.get("FREQSIGNALS_BACKFILL_WORKERS", "4"))
+# Receiving new signals over a server-sent events stream, see FreqSignalsStream. A stream
+# without a heartbeat or event for read timeout seconds is reconnected.
+DEFAULT_STREAM = str(os.environ.get("FREQSIGNALS_STREAM", "0")) != "0"
+DEFAULT_STREAM_PATH = os.environ.get("FREQSIGNALS_STREAM_PATH", "/api/stream/signals/")
+DEFAULT_STREAM_READ_TIMEOUT = 60
+# How old signals are when polled and when joined onto a candle, see FreqSignalsLatencyTracker
+DEFAULT_LATENCY_TRACKING = str(os.environ.get("FREQSIGNALS_LATENCY_TRACKING", "1")) != "0"
+DEFAULT_LATENCY_WINDOW = 1000
+DEFAULT_LATENCY_ALERT_TTL_FRACTION = 0.5
+DEFAULT_LATENCY_ALERT_INTERVAL = 300
+# Timings and counters of the integration, see FreqSignalsMetrics - off unless enabled, then
+# exported every flush interval to a Prometheus text file and / or a StatsD host:port
+DEFAULT_METRICS = str(os.environ.get("FREQSIGNALS_METRICS", "0")) != "0"
+DEFAULT_METRICS_PROMETHEUS_FILE = os.environ.get("FREQSIGNALS_METRICS_PROMETHEUS_FILE")
+DEFAULT_METRICS_STATSD = os.environ.get("FREQSIGNALS_METRICS_STATSD")
+DEFAULT_METRICS_FLUSH_INTERVAL = float(os.environ.get("FREQSIGNALS_METRICS_FLUSH_INTERVAL", "15"))
+# histogram bucket upper bounds, seconds
+DEFAULT_METRICS_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+
+def freqsignals_json_default(obj):
+    """
+    Converts the NumPy / pandas values signals are built from into JSON types
+    """
+    if isinstance(obj, np.integer):
+        return int(obj)
+    if isinstance(obj, np.floating):
+        return float(obj)
+    if isinstance(obj, np.bool_):
+        return bool(obj)
+    if isinstance(obj, np.ndarray):
+        if obj.dtype.kind == "M":
+            # tolist() gives ints for ns and dates for days, datetimes need at most us
+            return obj.astype("datetime64[us]").tolist()
+        return obj.tolist()
+    if isinstance(obj, datetime):
+        # pandas Timestamps included
+        return obj.isoformat()
+    if isinstance(obj, np.datetime64):
+        # like orjson: any unit as a naive datetime truncated to microseconds, NaT as null
+        value = obj.astype("datetime64[us]").item()
+        return None if value is None else value.isoformat()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
 
 
 class NpEncoder(json.JSONEncoder):
     def default(self, obj):
-        if isinstance(obj, np.integer):
-            return int(obj)
-        if isinstance(obj, np.floating):
-            return float(obj)
-        if isinstance(obj, np.ndarray):
-            return obj.tolist()
-        return super(NpEncoder, self).default(obj)
+        try:
+            return freqsignals_json_default(obj)
+        except TypeError:
+            return super(NpEncoder, self).default(obj)
+
+
+def freqsignals_json_nan_to_none(obj):
+    if isinstance(obj, (float, np.floating)) and obj != obj:
+        return None
+    if isinstance(obj, dict):
+        return {k: freqsignals_json_nan_to_none(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [freqsignals_json_nan_to_none(v) for v in obj]
+    if isinstance(obj, np.ndarray) and obj.dtype.kind == "f":
+        return [None if v != v else v for v in obj.tolist()]
+    return obj
+
+
+def freqsignals_dumps(data):
+    """
+    Encodes a request body in one pass, with orjson when it's installed
+    Args:
+        data: dict | list - the body, may hold NumPy scalars / arrays and pandas Timestamps
+
+    Returns:
+        bytes - compact JSON, NaN written as null
+    """
+    if orjson is not None:
+        return orjson.dumps(data, default=freqsignals_json_default, option=orjson.OPT_SERIALIZE_NUMPY)
+    try:
+        return json.dumps(data, cls=NpEncoder, separators=(",", ":"), allow_nan=False).encode()
+    except ValueError:
+        # NaN isn't valid JSON; only walk the body when it actually holds one
+        return json.dumps(freqsignals_json_nan_to_none(data), cls=NpEncoder, separators=(",", ":")).encode()
+
+
+def freqsignals_token_response(status_code, text, retry_after=None):
+    """
+    Checks a token endpoint response, for the sync and the async client alike
+    Args:
+        status_code: int - the response status
+        text: str - the response body
+        retry_after: str - optional - Retry-After header of the response
+
+    Returns:
+        dict - the token response (access_token, expires_in, scope, token_type) or raises FreqSignalsTokenError
+    """
+    if status_code != 200:
+        raise FreqSignalsTokenError(f"token request failed: {status_code} - {text}", status_code, retry_after)
+    try:
+        res_data = json.loads(text)
+    except ValueError:
+        res_data = None
+    if not isinstance(res_data, dict) or any(
+        key not in res_data for key in ("access_token", "expires_in", "scope", "token_type")
+    ):
+        raise FreqSignalsTokenError(f"bad token response: {text}")
+    return res_data
+
+
+class FreqSignalsTokenManager:
+    """
+    Holds the OAuth token for a client. Only one thread fetches a token at a time, the others
+    wait for its result. With background_refresh the token is renewed on a timer before it
+    expires, so requests never wait on the token endpoint. With a token_file the token is
+    kept on disk (readable only by the owner) so a restarted bot can skip authenticating.
+    """
+
+    def __init__(
+        self,
+        fetch,
+        key=None,
+        token_file=DEFAULT_TOKEN_FILE,
+        refresh_margin=DEFAULT_TOKEN_REFRESH_MARGIN,
+        background_refresh=DEFAULT_TOKEN_BACKGROUND_REFRESH,
+        log=None,
+    ):
+        """
+        Args:
+            fetch: callable - requests a new token, returns the token endpoint's response dict
+            key: str - identifies the credentials, a token file written for another key is ignored
+            token_file: str - optional - where to keep the token between restarts
+            refresh_margin: int - seconds before expiry a token is no longer handed out
+            background_refresh: bool - renew the token on a timer before it expires
+            log: callable - optional - the client's log hook
+        """
+        self._fetch = fetch
+        self._key = key
+        self._token_file = token_file
+        self._refresh_margin = refresh_margin
+        self._background_refresh = background_refresh
+        self._log = log or self._log_nothing
+        self._lock = threading.Lock()
+        self._token = None
+        self._expires_at = 0
+        self._timer = None
+        self.counters = {"fetches": 0, "background_refreshes": 0, "invalidations": 0, "loaded_from_file": 0}
+        if token_file:
+            self._load()
+
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        del state["_lock"]
+        state["_timer"] = None
+        return state
+
+    def __setstate__(self, state):
+        # the copy renews its token on demand, the timer stays with the original
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _log_nothing(level, msg, **kwargs):
+        pass
+
+    def _is_valid(self):
+        return self._token is not None and time.time() < self._expires_at - self._refresh_margin
+
+    def current(self):
+        """
+        Returns:
+            str - the token if it's still valid, None when get_token would have to fetch one
+        """
+        token, expires_at = self._token, self._expires_at
+        if token is not None and time.time() < expires_at - self._refresh_margin:
+            return token
+        return None
+
+    def get_token(self):
+        if self._is_valid():
+            return self._token
+        with self._lock:
+            if not self._is_valid():
+                self._refresh()
+            return self._token
+
+    def invalidate(self, token=None):
+        """
+        Drops the token (only if it's still the given one, so a fresher token isn't thrown away)
+        """
+        with self._lock:
+            if token is None or token == self._token:
+                self._token = None
+                self._expires_at = 0
+                self.counters["invalidations"] += 1
+
+    def close(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+    def _refresh(self):
+        res_data = self._fetch()
+        self._token = res_data["access_token"]
+        self._expires_at = time.time() + res_data["expires_in"]
+        self.counters["fetches"] += 1
+        self._save()
+        self._schedule(self._expires_at - 2 * self._refresh_margin - time.time())
+
+    def _schedule(self, delay):
+        if not self._background_refresh:
+            return
+        if self._timer is not None:
+            self._timer.cancel()
+        self._timer = threading.Timer(max(1, delay), self._refresh_in_background)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _refresh_in_background(self):
+        try:
+            with self._lock:
+                self._refresh()
+            self.counters["background_refreshes"] += 1
+        except Exception as e:
+            self._log("error", "token.background_refresh_failed", error=str(e))
+            if self._is_valid():
+                # try again while the current token lasts, after that requests fetch it themselves
+                self._schedule(min(30, self._refresh_margin / 2))
+
+    def _load(self):
+        try:
+            with open(self._token_file) as f:
+                saved = json.load(f)
+        except (OSError, ValueError):
+            return
+        if saved.get("key") == self._key:
+            self._token = saved.get("access_token")
+            self._expires_at = saved.get("expires_at", 0)
+            if self._is_valid():
+                self.counters["loaded_from_file"] += 1
+                self._schedule(self._expires_at - 2 * self._refresh_margin - time.time())
+
+    def _save(self):
+        if not self._token_file:
+            return
+        try:
+            temp_file = f"{self._token_file}.{os.getpid()}.tmp"
+            descriptor = os.open(temp_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(descriptor, "w") as f:
+                json.dump({"key": self._key, "access_token": self._token, "expires_at": self._expires_at}, f)
+            os.replace(temp_file, self._token_file)
+        except OSError as e:
+            self._log("error", "token.save_failed", error=str(e))
+
+
+class FreqSignalsRetryPolicy:
+    """
+    Decides whether a failed request is tried again and how long to wait first. Waits grow
+    exponentially with full jitter, and a Retry-After from the server is honoured (a request
+    isn't retried when the server asks for a longer wait than backoff_max). Requests that
+    aren't idempotent (posts) are only retried when the server can't have processed them:
+    the connection couldn't be made, or the server answered 429.
+    """
+
+    def __init__(
+        self,
+        max_attempts=DEFAULT_REQUEST_MAX_ATTEMPTS,
+        backoff=DEFAULT_REQUEST_WAIT_INTERVAL,
+        backoff_max=DEFAULT_REQUEST_BACKOFF_MAX,
+        retry_statuses=DEFAULT_REQUEST_RETRY_STATUSES,
+        retry_non_idempotent=False,
+    ):
+        """
+        Args:
+            max_attempts: int - requests made at most, including the first
+            backoff: float - seconds to wait before the first retry
+            backoff_max: float - longest wait between attempts
+            retry_statuses: tuple - status codes worth trying again
+            retry_non_idempotent: bool - retry posts on any retryable failure
+        """
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.backoff_max = backoff_max
+        self.retry_statuses = frozenset(retry_statuses)
+        self.retry_non_idempotent = retry_non_idempotent
+
+    def should_retry(self, method, status=None, exception=None):
+        """
+        Args:
+            method: str - get | post
+            status: int - optional - status code of the response
+            exception: Exception - optional - raised instead of a response
+
+        Returns:
+            bool
+        """
+        idempotent = method == "get" or self.retry_non_idempotent
+        if exception is not None:
+            return idempotent or isinstance(exception, ConnectTimeout)
+        if status not in self.retry_statuses:
+            return False
+        return idempotent or status == 429
+
+    def delay(self, attempt, retry_after=None):
+        """
+        Args:
+            attempt: int - number of attempts made so far
+            retry_after: str - optional - Retry-After header of the response
+
+        Returns:
+            float - seconds to wait, or None to give up
+        """
+        delay = random.uniform(0, min(self.backoff_max, self.backoff * 2 ** (attempt - 1)))
+        wait = freqsignals_parse_retry_after(retry_after)
+        if wait is not None:
+            if wait > self.backoff_max:
+                return None
+            delay = max(delay, wait)
+        return delay
+
+
+def freqsignals_parse_retry_after(value):
+    """
+    Returns:
+        float - seconds a Retry-After header (seconds or an HTTP date) asks to wait, or None
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+
+class FreqSignalsCircuitBreaker:
+    """
+    Stops requests to an API that looks down. After failure_threshold consecutive failures
+    (connection errors, timeouts, 5xx and 429, from the API or its token endpoint) the circuit
+    opens and requests fail right away with FreqSignalsCircuitOpenError. After reset_timeout
+    one trial request is let through: success closes the circuit, failure opens it again.
+    """
+
+    def __init__(self, failure_threshold=DEFAULT_CIRCUIT_FAILURE_THRESHOLD, reset_timeout=DEFAULT_CIRCUIT_RESET_TIMEOUT):
+        """
+        Args:
+            failure_threshold: int - consecutive failures that open the circuit, 0 disables it
+            reset_timeout: float - seconds the circuit stays open before a trial request
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = None
+        self._retry_at = 0
+        self._lock = threading.Lock()
+        self.counters = {"opened": 0, "rejected": 0}
+
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def allow(self):
+        """
+        Returns:
+            bool - whether a request may be made now
+        """
+        if self.state == "closed":
+            return True
+        with self._lock:
+            now = time.monotonic()
+            if now < self._retry_at:
+                self.counters["rejected"] += 1
+                return False
+            # let one trial through; if it never reports back another is allowed after reset_timeout
+            self.state = "half_open"
+            self._retry_at = now + self.reset_timeout
+            return True
+
+    def is_open(self):
+        return self.state != "closed"
+
+    def record_success(self):
+        if self.failures or self.state != "closed":
+            with self._lock:
+                self.failures = 0
+                self.state = "closed"
+                self.opened_at = None
+
+    def record_failure(self, retry_after=None):
+        """
+        Args:
+            retry_after: float - optional - seconds the server asked to wait, keeps the circuit open at least that long
+        """
+        if not self.failure_threshold:
+            return
+        with self._lock:
+            self.failures += 1
+            if self.state == "half_open" or self.failures >= self.failure_threshold:
+                if self.state == "closed":
+                    self.counters["opened"] += 1
+                    self.opened_at = datetime.now(timezone.utc)
+                self.state = "open"
+                self._retry_at = time.monotonic() + max(self.reset_timeout, retry_after or 0)
+
+
+class FreqSignalsMetrics:
+    """
+    Counters, gauges and timing histograms, each keyed by name and labels. Recording takes a
+    lock and a dict lookup; instrumented code checks for a metrics object first, so without
+    one (the default) the only cost is that check. Every flush_interval seconds a background
+    thread hands snapshot() to each sink.
+    """
+
+    def __init__(self, sinks=(), flush_interval=DEFAULT_METRICS_FLUSH_INTERVAL, buckets=DEFAULT_METRICS_BUCKETS):
+        """
+        Args:
+            sinks: list - objects with an export(snapshot) method, e.g. FreqSignalsPrometheusSink
+            flush_interval: float - seconds between exports, 0 to only export on flush()
+            buckets: tuple - ascending histogram bucket upper bounds, in seconds
+        """
+        self.sinks = list(sinks)
+        self._buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._gauges = {}
+        self._timers = {}
+        self._closing = threading.Event()
+        self._thread = None
+        if self.sinks and flush_interval:
+            self._flush_interval = flush_interval
+            self._thread = threading.Thread(target=self._run, name="freqsignals-metrics", daemon=True)
+            self._thread.start()
+        if self.sinks:
+            atexit.register(self.close)
+
+    def __getstate__(self):
+        # copies (hyperopt workers) keep recording but don't export, the sinks belong to the original
+        state = dict(self.__dict__)
+        for name in ("_lock", "_closing", "_thread"):
+            del state[name]
+        state["sinks"] = []
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+        self._closing = threading.Event()
+        self._thread = None
+
+    @staticmethod
+    def _key(name, labels):
+        return (name, tuple(sorted(labels.items()))) if labels else (name, ())
+
+    def increment(self, name, value=1, **labels):
+        key = self._key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def gauge(self, name, value, **labels):
+        key = self._key(name, labels)
+        with self._lock:
+            self._gauges[key] = value
+
+    def observe(self, name, seconds, **labels):
+        """
+        Records a duration in the name histogram
+        """
+        key = self._key(name, labels)
+        index = bisect.bisect_left(self._buckets, seconds)
+        with self._lock:
+            timer = self._timers.get(key)
+            if timer is None:
+                # count, sum, max, then one count per bucket plus the one past the last bound
+                timer = self._timers[key] = [0, 0.0, 0.0] + [0] * (len(self._buckets) + 1)
+            timer[0] += 1
+            timer[1] += seconds
+            if seconds > timer[2]:
+                timer[2] = seconds
+            timer[3 + index] += 1
+
+    def snapshot(self):
+        """
+        Returns:
+            dict - counters, gauges and timers, each a list of {name, labels, ...} entries.
+                Timers have count, sum, max and buckets: [(upper bound, cumulative count)].
+        """
+        with self._lock:
+            counters = list(self._counters.items())
+            gauges = list(self._gauges.items())
+            timers = [(key, list(timer)) for key, timer in self._timers.items()]
+        bounds = self._buckets + (float("inf"),)
+        return {
+            "counters": [{"name": name, "labels": dict(labels), "value": value} for (name, labels), value in counters],
+            "gauges": [{"name": name, "labels": dict(labels), "value": value} for (name, labels), value in gauges],
+            "timers": [
+                {
+                    "name": name,
+                    "labels": dict(labels),
+                    "count": timer[0],
+                    "sum": timer[1],
+                    "max": timer[2],
+                    "buckets": list(zip(bounds, np.cumsum(timer[3:]).tolist())),
+                }
+                for (name, labels), timer in timers
+            ],
+        }
+
+    def flush(self):
+        """
+        Exports a snapshot to every sink now
+        """
+        snapshot = self.snapshot()
+        for sink in self.sinks:
+            try:
+                sink.export(snapshot)
+            except Exception as e:
+                logger.warning(f"FreqSignals metrics export to {type(sink).__name__} failed: {e}")
+
+    def close(self):
+        """
+        Stops the export thread after a last export
+        """
+        atexit.unregister(self.close)
+        self._closing.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        elif self.sinks:
+            self.flush()
+
+    def _run(self):
+        while not self._closing.wait(self._flush_interval):
+            self.flush()
+        self.flush()
+
+
+def freqsignals_metric_labels(labels, extra=None):
+    """
+    Returns:
+        str - Prometheus label set, e.g. {endpoint="/api/crud/signals/",method="get"}
+    """
+    items = list(labels.items()) + list((extra or {}).items())
+    if not items:
+        return ""
+    escaped = (
+        (key, str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")) for key, value in items
+    )
+    return "{" + ",".join(f'{key}="{value}"' for key, value in escaped) + "}"
+
+
+class FreqSignalsPrometheusSink:
+    """
+    Writes the metrics in the Prometheus text format to path, for node_exporter's textfile
+    collector. The file is replaced atomically so a scrape never reads half of it.
+    """
+
+    def __init__(self, path, prefix="freqsignals_"):
+        self.path = path
+        self.prefix = prefix
+
+    def export(self, snapshot):
+        lines = []
+        for kind, entries in (("counter", snapshot["counters"]), ("gauge", snapshot["gauges"])):
+            for name in sorted({entry["name"] for entry in entries}):
+                lines.append(f"# TYPE {self.prefix}{name} {kind}")
+                for entry in entries:
+                    if entry["name"] == name:
+                        lines.append(f"{self.prefix}{name}{freqsignals_metric_labels(entry['labels'])} {entry['value']}")
+        for name in sorted({entry["name"] for entry in snapshot["timers"]}):
+            lines.append(f"# TYPE {self.prefix}{name} histogram")
+            for entry in snapshot["timers"]:
+                if entry["name"] != name:
+                    continue
+                for bound, count in entry["buckets"]:
+                    le = "+Inf" if bound == float("inf") else repr(float(bound))
+                    lines.append(f"{self.prefix}{name}_bucket{freqsignals_metric_labels(entry['labels'], {'le': le})} {count}")
+                lines.append(f"{self.prefix}{name}_sum{freqsignals_metric_labels(entry['labels'])} {entry['sum']}")
+                lines.append(f"{self.prefix}{name}_count{freqsignals_metric_labels(entry['labels'])} {entry['count']}")
+        temp_file = f"{self.path}.{os.getpid()}.tmp"
+        with open(temp_file, "w") as f:
+            f.write("\n".join(lines) + "\n")
+        os.replace(temp_file, self.path)
+
+
+class FreqSignalsStatsdSink:
+    """
+    Sends the metrics to a StatsD compatible daemon over UDP: what counters and timer counts
+    grew by since the previous export as counters, the mean duration over that interval as a
+    timing (in ms), and gauges as gauges. Label values are appended to the metric name.
+    """
+
+    def __init__(self, host="127.0.0.1", port=8125, prefix="freqsignals."):
+        self.address = (host, int(port))
+        self.prefix = prefix
+        self._socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self._previous = {}
+
+    @classmethod
+    def from_address(cls, address, **kwargs):
+        """
+        Args:
+            address: str - host:port
+        """
+        host, _, port = address.rpartition(":")
+        return cls(host or "127.0.0.1", port or 8125, **kwargs)
+
+    def _name(self, entry, suffix=""):
+        parts = [entry["name"]] + [str(value) for _, value in sorted(entry["labels"].items())]
+        return self.prefix + ".".join(re.sub(r"[^A-Za-z0-9_-]+", "_", part).strip("_") or "_" for part in parts) + suffix
+
+    def export(self, snapshot):
+        lines = []
+        for entry in snapshot["counters"]:
+            name = self._name(entry)
+            delta = entry["value"] - self._previous.get(name, 0)
+            self._previous[name] = entry["value"]
+            if delta:
+                lines.append(f"{name}:{delta}|c")
+        for entry in snapshot["gauges"]:
+            lines.append(f"{self._name(entry)}:{entry['value']}|g")
+        for entry in snapshot["timers"]:
+            name = self._name(entry)
+            count, total = self._previous.get(name, (0, 0.0))
+            self._previous[name] = (entry["count"], entry["sum"])
+            if entry["count"] > count:
+                lines.append(f"{name}.count:{entry['count'] - count}|c")
+                lines.append(f"{name}:{(entry['sum'] - total) / (entry['count'] - count) * 1000:.3f}|ms")
+        # stay under a typical MTU, one datagram per batch of lines
+        packet = []
+        for line in lines:
+            if packet and sum(len(part) + 1 for part in packet) + len(line) > 1400:
+                self._socket.sendto("\n".join(packet).encode(), self.address)
+                packet = []
+            packet.append(line)
+        if packet:
+            self._socket.sendto("\n".join(packet).encode(), self.address)
 
 
 class FreqSignalsClient:
@@ -53,6 +800,14 @@ class FreqSignalsClient:
         request_timeout=DEFAULT_REQUEST_TIMEOUT,
         request_max_attempts=DEFAULT_REQUEST_MAX_ATTEMPTS,
         request_wait_interval=DEFAULT_REQUEST_WAIT_INTERVAL,
+        pool_connections=DEFAULT_POOL_CONNECTIONS,
+        pool_maxsize=DEFAULT_POOL_MAXSIZE,
+        pool_block=DEFAULT_POOL_BLOCK,
+        keep_alive=DEFAULT_KEEP_ALIVE,
+        token_file=DEFAULT_TOKEN_FILE,
+        background_token_refresh=DEFAULT_TOKEN_BACKGROUND_REFRESH,
+        retry_policy=None,
+        circuit_breaker=None,
     ):
         self._client_id = client_id
         self._client_secret = client_secret
@@ -61,31 +816,88 @@ class FreqSignalsClient:
         self._request_timeout = request_timeout
         self._request_max_attempts = request_max_attempts
         self._request_wait_interval = request_wait_interval
-        self._has_attempted_token_refresh = False
-        self._refresh_at = None
-        self._token = None
+        self.retry_policy = retry_policy or FreqSignalsRetryPolicy(
+            max_attempts=request_max_attempts, backoff=request_wait_interval
+        )
+        self.circuit_breaker = circuit_breaker or FreqSignalsCircuitBreaker()
+        self._token_manager = FreqSignalsTokenManager(
+            self.fetch_token,
+            key=f"{client_id}@{host}",
+            token_file=token_file,
+            background_refresh=background_token_refresh,
+            log=self.log,
+        )
+        self._keep_alive = keep_alive
+        # one pool shared by every thread; sessions are per thread since requests.Session isn't thread safe
+        self._adapter = HTTPAdapter(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            pool_block=pool_block,
+        )
+        self._local = threading.local()
+        self._publisher = None
+        self.deduplicator = None
+        self.metrics = None
+        self._validators = {}
 
-    def get_token(self):
-        if self._token is None:
-            post_data = {
-                "grant_type": "client_credentials",
-                "client_id": self._client_id,
-                "client_secret": self._client_secret,
-            }
-            protocol_string = "https" if self._https else "http"
-            url = f"{protocol_string}://{self._host}/oa2/token/"
+    def __getstate__(self):
+        # pickled into hyperopt workers: per thread sessions and the publisher thread stay behind
+        state = dict(self.__dict__)
+        del state["_local"]
+        state["_publisher"] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._local = threading.local()
+
+    @property
+    def session(self):
+        """
+        The calling thread's requests.Session, backed by the client's shared connection pool
+        """
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = requests.Session()
+            session.mount("https://", self._adapter)
+            session.mount("http://", self._adapter)
+            if not self._keep_alive:
+                session.headers["Connection"] = "close"
+            self._local.session = session
+        return session
+
+    def close(self):
+        """
+        Closes every pooled connection and stops the background token refresh. The client can
+        still be used afterwards, it will reconnect.
+        """
+        self._adapter.close()
+        self._token_manager.close()
+
+    def fetch_token(self):
+        """
+        Requests a new token from the token endpoint
+        Returns:
+            dict - the token response (access_token, expires_in, scope, token_type)
+        """
+        post_data = {
+            "grant_type": "client_credentials",
+            "client_id": self._client_id,
+            "client_secret": self._client_secret,
+        }
+        protocol_string = "https" if self._https else "http"
+        url = f"{protocol_string}://{self._host}/oa2/token/"
 
-            response = requests.post(url, json=post_data, verify=self._https)
+        started = time.perf_counter()
+        response = self.session.post(url, json=post_data, verify=self._https, timeout=self._request_timeout)
+        if self.metrics is not None:
+            self.metrics.increment("token_refreshes_total", status=response.status_code)
+            self.metrics.observe("token_refresh_seconds", time.perf_counter() - started)
 
-            assert response.status_code == 200, response.json()
-            res_data = response.json()
-            assert "access_token" in res_data, res_data
-            assert "expires_in" in res_data, res_data
-            assert "scope" in res_data, res_data
-            assert "token_type" in res_data, res_data
-            self._refresh_at = datetime.now() + timedelta(seconds=res_data["expires_in"] - 60)
-            self._token = res_data["access_token"]
-        return self._token
+        return freqsignals_token_response(response.status_code, response.text, response.headers.get("Retry-After"))
+
+    def get_token(self):
+        return self._token_manager.get_token()
 
     def get_headers(self):
         return {"Authorization": f"Bearer {self.get_token()}"}
@@ -94,95 +906,201 @@ class FreqSignalsClient:
         protocol_string = "https" if self._https else "http"
         return f"{protocol_string}://{self._host}{url}"
 
-    def make_request(self, url, method="get", data=None, headers=None, remaining_attempts=1):
+    def make_request(self, url, method="get", data=None, headers=None, remaining_attempts=None, conditional=False):
         """
-        Issues the request to FreqSignals
+        Issues the request to FreqSignals, retrying failures as the client's retry_policy allows
         Args:
             url: str - path to request
             method: str - get | post
             data: dict - optional - body of the post
             headers: dict - optional - headers to include
-            remaining_attempts: how many more requests to make
+            remaining_attempts: how many more requests to make, defaults to the retry policy's max_attempts
+            conditional: bool - send the ETag / Last-Modified of the previous response for this url,
+                returning None if the server answers 304 Not Modified
 
         Returns:
-            list - results or raises FreqSignalsError
+            list - results or raises FreqSignalsError (FreqSignalsCircuitOpenError while the API is down)
         """
-        data_response = None
-        if self._refresh_at and datetime.now() > self._refresh_at:
-            self._token = None
-            self._refresh_at = None
-        if headers == None:
-            headers = self.get_headers()
-        while data_response is None and remaining_attempts > 0:
+        if method not in ("get", "post"):
+            raise FreqSignalsError(f"bad method: {method}")
+        if not self.circuit_breaker.allow():
+            raise FreqSignalsCircuitOpenError(f"FreqSignals API unavailable, not requesting {url}")
+        if remaining_attempts is None:
+            remaining_attempts = self.retry_policy.max_attempts
+        # only add a token (and retry a 401 with a fresh one) when the token is ours to replace
+        own_token = headers is None
+        retry_unauthorized = own_token
+        extra_headers = headers or {}
+        path = url.split("?", 1)[0]
+        if conditional:
+            validated_url, validators = self._validators.get(path, (None, None))
+            if validated_url == url:
+                extra_headers = {**extra_headers, **validators}
+        metrics = self.metrics
+        body = freqsignals_dumps(data) if method == "post" else None
+        attempt = 0
+        while remaining_attempts > 0:
+            remaining_attempts -= 1
+            attempt += 1
+            if metrics is not None and attempt > 1:
+                metrics.increment("http_retries_total", method=method, endpoint=path)
+            headers = extra_headers
+            if own_token:
+                # fetched per attempt, so a token endpoint that's down fails the attempt like the API would
+                try:
+                    headers = {**self.get_headers(), **extra_headers}
+                except (RequestException, FreqSignalsTokenError) as e:
+                    if self._token_failed(e, url, method, attempt, remaining_attempts):
+                        continue
+                    if isinstance(e, ConnectTimeout):
+                        raise FreqSignalsTimeoutError() from e
+                    raise
+            if metrics is not None:
+                started = time.perf_counter()
             try:
-
-                remaining_attempts -= 1
                 if method == "get":
-                    response = requests.get(
+                    response = self.session.get(
                         self.get_full_url(url), timeout=self._request_timeout, headers=headers, verify=self._https
                     )
-                elif method == "post":
-                    response = requests.post(
+                else:
+                    response = self.session.post(
                         self.get_full_url(url),
                         timeout=self._request_timeout,
-                        json=json.loads(json.dumps(data, cls=NpEncoder)),
+                        data=body,
                         headers={
                             'Content-Type': 'application/json',
                             **headers
                         },
                         verify=self._https,
                     )
-                else:
-                    raise FreqSignalsError(f"bad method: {method}")
-
-
-                if response.status_code < 200 or response.status_code >= 300:
-                    self.log(
-                        "error",
-                        "make_load_request.error_status_code",
-                        remaining_attempts=remaining_attempts,
-                        data=data,
-                        status_code=response.status_code,
-                        response=response.text,
-                    )
-                    if response.text:
-                        raise FreqSignalsError(
-                            "bad return status code: {} - {}".format(response.status_code, response.text)
-                        )
-                    else:
-                        raise FreqSignalsError("bad return status code: {}".format(response.status_code))
-
-                json_res = response.json()
+            except RequestException as e:
+                if metrics is not None:
+                    metrics.observe("http_request_seconds", time.perf_counter() - started, method=method, endpoint=path)
+                    metrics.increment("http_requests_total", method=method, endpoint=path, status="timeout" if isinstance(e, Timeout) else "error")
+                self.circuit_breaker.record_failure()
                 self.log(
-                    "info",
-                    "request.success",
+                    "error",
+                    "request.timeout" if isinstance(e, Timeout) else "request.exception",
                     remaining_attempts=remaining_attempts,
                     method=method,
                     url=url,
-                    data=data,
-                    status_code=response.status_code,
-                    response=json_res,
+                    sent_bytes=len(body or b""),
+                    error=str(e),
                 )
-                return json_res
+                if remaining_attempts and self.retry_policy.should_retry(method, exception=e):
+                    if self._wait_to_retry(attempt):
+                        continue
+                if isinstance(e, ConnectTimeout):
+                    raise FreqSignalsTimeoutError() from e
+                raise
+
+            if metrics is not None:
+                metrics.observe("http_request_seconds", time.perf_counter() - started, method=method, endpoint=path)
+                metrics.increment("http_requests_total", method=method, endpoint=path, status=response.status_code)
+                if body is not None:
+                    metrics.increment("http_sent_bytes_total", len(body), method=method, endpoint=path)
+                metrics.increment("http_received_bytes_total", len(response.content), method=method, endpoint=path)
+
+            if conditional and response.status_code == 304:
+                self.circuit_breaker.record_success()
+                self.log("info", "request.not_modified", method=method, url=url)
+                return None
+
+            if response.status_code == 401 and retry_unauthorized:
+                # revoked or expired early: get a new token and try once more, without using up an attempt
+                self.log("info", "request.unauthorized", method=method, url=url)
+                retry_unauthorized = False
+                self._token_manager.invalidate(headers["Authorization"][len("Bearer "):])
+                remaining_attempts += 1
+                attempt -= 1
+                continue
 
-            except ConnectTimeout:
+            if response.status_code < 200 or response.status_code >= 300:
+                retry_after = response.headers.get("Retry-After")
+                if response.status_code >= 500 or response.status_code == 429:
+                    self.circuit_breaker.record_failure(freqsignals_parse_retry_after(retry_after))
+                else:
+                    # the API is up, the request itself is at fault
+                    self.circuit_breaker.record_success()
                 self.log(
                     "error",
-                    "request.timeout",
+                    "make_load_request.error_status_code",
                     remaining_attempts=remaining_attempts,
                     method=method,
                     url=url,
-                    data=data,
+                    sent_bytes=len(body or b""),
+                    status_code=response.status_code,
+                    received_bytes=len(response.content),
                 )
-                if remaining_attempts:
-                    time.sleep(self._request_wait_interval)
-                if not remaining_attempts:
-                    raise FreqSignalsTimeoutError
+                if remaining_attempts and self.retry_policy.should_retry(method, status=response.status_code):
+                    if self._wait_to_retry(attempt, retry_after):
+                        continue
+                if response.text:
+                    raise FreqSignalsError(
+                        "bad return status code: {} - {}".format(response.status_code, response.text),
+                        status_code=response.status_code,
+                    )
+                else:
+                    raise FreqSignalsError(
+                        "bad return status code: {}".format(response.status_code), status_code=response.status_code
+                    )
 
-            except RequestException:
-                raise
+            self.circuit_breaker.record_success()
+            json_res = response.json()
+            if conditional:
+                validators = {}
+                if response.headers.get("ETag"):
+                    validators["If-None-Match"] = response.headers["ETag"]
+                if response.headers.get("Last-Modified"):
+                    validators["If-Modified-Since"] = response.headers["Last-Modified"]
+                # only the latest url per path is kept - an older query won't be asked again
+                self._validators[path] = (url, validators)
+            self.log(
+                "info",
+                "request.success",
+                remaining_attempts=remaining_attempts,
+                method=method,
+                url=url,
+                sent_bytes=len(body or b""),
+                status_code=response.status_code,
+                received_bytes=len(response.content),
+            )
+            return json_res
         raise FreqSignalsTimeoutError()
 
+    def _token_failed(self, error, url, method, attempt, remaining_attempts):
+        """
+        Records a failure to get a token for a request: an unreachable token endpoint, a 5xx or a
+        429 count towards the circuit breaker, refused credentials don't
+        Returns:
+            bool - whether to try the request again
+        """
+        status = getattr(error, "status_code", None)
+        if isinstance(error, RequestException) or status is None or status >= 500 or status == 429:
+            self.circuit_breaker.record_failure(freqsignals_parse_retry_after(getattr(error, "retry_after", None)))
+        else:
+            self.circuit_breaker.record_success()
+        self.log("error", "request.token_failed", remaining_attempts=remaining_attempts, method=method, url=url, error=str(error))
+        # the request itself wasn't sent, so it's as safe to retry as a get
+        if isinstance(error, RequestException):
+            retry = self.retry_policy.should_retry("get", exception=error)
+        else:
+            retry = self.retry_policy.should_retry("get", status=status)
+        return bool(remaining_attempts) and retry and self._wait_to_retry(attempt, getattr(error, "retry_after", None))
+
+    def _wait_to_retry(self, attempt, retry_after=None):
+        """
+        Sleeps before the next attempt
+        Returns:
+            bool - False if the request shouldn't be retried after all
+        """
+        delay = self.retry_policy.delay(attempt, retry_after)
+        if delay is None or not self.circuit_breaker.allow():
+            return False
+        self.log("info", "request.retry", attempt=attempt, delay=delay)
+        time.sleep(delay)
+        return True
+
     def get(self, url):
         return self.make_request(url=url, method="get")
 
@@ -190,40 +1108,238 @@ class FreqSignalsClient:
         return self.make_request(url=url, method="post", data=data)
 
     def post_signal(self, data):
-        return self.post("/api/async/signals/", data)
+        """
+        Uploads a signal. With a publisher started the signal is queued and None is returned right away.
+        With deduplication started, a signal that doesn't need sending is skipped and None returned.
+        """
+        if self.deduplicator is not None and not self.deduplicator.should_send(data):
+            return None
+        if self._publisher is not None:
+            self._publisher.publish(data)
+            return None
+        try:
+            return self.post("/api/async/signals/", data)
+        except Exception:
+            if self.deduplicator is not None:
+                # not sent after all, the next signal mustn't be suppressed because of it
+                self.deduplicator.forget(data.get("symbol"), data.get("data_set_id"))
+            raise
+
+    def post_signals(self, signals):
+        """
+        Uploads several signals in one request, as a JSON array (a single signal is posted on
+        its own, as by post_signal). Only use it with more than one signal for an API that
+        accepts arrays.
+        Args:
+            signals: list - signal dicts, as for post_signal
+
+        Returns:
+            the response of the request
+        """
+        if len(signals) == 1:
+            return self.post("/api/async/signals/", signals[0])
+        return self.post("/api/async/signals/", signals)
+
+    def start_publisher(self, **kwargs):
+        """
+        Switches post_signal to queue signals for a background FreqSignalsPublisher
+        Args:
+            kwargs: dict - FreqSignalsPublisher options
+
+        Returns:
+            FreqSignalsPublisher
+        """
+        if self._publisher is None:
+            self._publisher = FreqSignalsPublisher(self, **kwargs)
+        return self._publisher
+
+    def start_deduplication(self, **kwargs):
+        """
+        Makes post_signal skip signals that repeat the previous one, see FreqSignalsDeduplicator
+        Args:
+            kwargs: dict - FreqSignalsDeduplicator options
+
+        Returns:
+            FreqSignalsDeduplicator
+        """
+        if self.deduplicator is None:
+            self.deduplicator = FreqSignalsDeduplicator(**kwargs)
+        return self.deduplicator
+
+    def start_metrics(
+        self,
+        prometheus_file=DEFAULT_METRICS_PROMETHEUS_FILE,
+        statsd=DEFAULT_METRICS_STATSD,
+        sinks=(),
+        **kwargs,
+    ):
+        """
+        Starts recording request timings, retries, token refreshes and bytes sent / received,
+        see FreqSignalsMetrics. Metrics started on the strategy's client also time its hooks.
+        Args:
+            prometheus_file: str - optional - path to keep a Prometheus text file at
+            statsd: str - optional - host:port of a StatsD daemon
+            sinks: list - optional - further sinks
+            kwargs: dict - FreqSignalsMetrics options
+
+        Returns:
+            FreqSignalsMetrics - its snapshot() gives the current values in process
+        """
+        if self.metrics is None:
+            sinks = list(sinks)
+            if prometheus_file:
+                sinks.append(FreqSignalsPrometheusSink(prometheus_file))
+            if statsd:
+                sinks.append(FreqSignalsStatsdSink.from_address(statsd))
+            self.metrics = FreqSignalsMetrics(sinks, **kwargs)
+        return self.metrics
+
+    def stop_publisher(self, timeout=DEFAULT_PUBLISHER_CLOSE_TIMEOUT):
+        """
+        Flushes queued signals and goes back to posting synchronously
+        """
+        publisher, self._publisher = self._publisher, None
+        if publisher is not None:
+            publisher.close(timeout)
+
+    def get_signals(self, filters=None, conditional=False):
+        """
+        Args:
+            filters: dict - optional - query filters, e.g. data_set_id__in or updated_date__gte
+            conditional: bool - revalidate against the previous identical query; an unchanged feed
+                returns no results and "not_modified": True
 
-    def get_signals(self, filters=None):
+        Returns:
+            dict - count and results
+        """
         if filters is None:
             filters = {}
         query_params = urlencode({**filters})
-        return self.get(f"/api/crud/signals/?{query_params}")
+        url = f"/api/crud/signals/?{query_params}"
+        if not conditional:
+            return self.get(url)
+        response = self.make_request(url=url, method="get", conditional=True)
+        if response is None:
+            return {"count": 0, "results": [], "not_modified": True}
+        return response
+
+    def open_signal_stream(self, filters=None, last_event_id=None, path=DEFAULT_STREAM_PATH, read_timeout=DEFAULT_STREAM_READ_TIMEOUT):
+        """
+        Connects to the server-sent events stream of new signals, see FreqSignalsStream
+        Args:
+            filters: dict - optional - query filters, e.g. data_set_id__in or updated_date__gte
+            last_event_id: str - optional - id of the last event received, to resume after it
+            path: str - the stream endpoint
+            read_timeout: float - seconds without any data before the read fails
+
+        Returns:
+            requests.Response - streaming, read it with freqsignals_iter_sse(response.iter_content(None))
+        """
+        url = self.get_full_url(f"{path}?{urlencode(filters or {})}")
+        for retry_unauthorized in (True, False):
+            headers = {**self.get_headers(), "Accept": "text/event-stream", "Cache-Control": "no-cache"}
+            if last_event_id:
+                headers["Last-Event-ID"] = last_event_id
+            response = self.session.get(
+                url, headers=headers, stream=True, timeout=(self._request_timeout, read_timeout), verify=self._https
+            )
+            if response.status_code == 401 and retry_unauthorized:
+                response.close()
+                self._token_manager.invalidate(headers["Authorization"][len("Bearer "):])
+                continue
+            return response
 
     def get_signal_history(self, symbol, data_set_id, filters=None, multiple_pages=False):
         if filters is None:
             filters = {}
-        query_params = urlencode({**filters})
         if multiple_pages:
-            filters["limit"] = 1000
-            filters["offset"] = 0
             historical_signals = []
-            more_pages = True
-            while more_pages:
-                historical_signals_res = self.get(f"/api/crud/signal_history/?symbol={symbol}&data_set_id={data_set_id}&{query_params}")
-                if historical_signals_res["results"]:
-                    historical_signals += historical_signals_res["results"]
-                    filters["offset"] = filters["offset"] + filters["limit"]
-                    if (len(historical_signals_res["results"]) < filters["limit"]):
-                        more_pages = False
-                else:
-                    more_pages = False
+            for page in self.iter_signal_history(symbol, data_set_id, filters=filters):
+                historical_signals += page
             return {
                 "count": len(historical_signals),
                 "results": historical_signals
             }
 
         else:
+            query_params = urlencode({**filters})
             return self.get(f"/api/crud/signal_history/?symbol={symbol}&data_set_id={data_set_id}&{query_params}")
 
+    def iter_signal_history(
+        self,
+        symbol,
+        data_set_id,
+        filters=None,
+        page_size=DEFAULT_HISTORY_PAGE_SIZE,
+        prefetch=0,
+        since=None,
+        until=None,
+        window=None,
+    ):
+        """
+        Streams a symbol's signal history page by page, oldest pages first as ordered by the API
+        Args:
+            symbol: str - the pair
+            data_set_id: str - the data set
+            filters: dict - optional - extra query filters
+            page_size: int - signals per request
+            prefetch: int - pages to request concurrently ahead of the one being consumed
+            since: datetime | str - optional - only signals updated at or after this time
+            until: datetime | str - optional - only signals updated before this time
+            window: timedelta - optional - with since and until, walk the range in windows of this
+                length so deep offsets are never requested
+
+        Returns:
+            generator - lists of history items ({"t", "l", "v", "c"})
+        """
+        filters = dict(filters or {})
+        if window and since is not None and until is not None:
+            since = freqsignals_to_datetime(since)
+            until = freqsignals_to_datetime(until)
+            while since < until:
+                window_end = min(since + window, until)
+                yield from self.iter_signal_history(
+                    symbol, data_set_id, filters, page_size=page_size, prefetch=prefetch, since=since, until=window_end
+                )
+                since = window_end
+            return
+        if since is not None:
+            filters["updated_date__gte"] = freqsignals_isoformat(since)
+        if until is not None:
+            filters["updated_date__lt"] = freqsignals_isoformat(until)
+
+        def fetch(offset):
+            query_params = urlencode({"symbol": symbol, "data_set_id": data_set_id, **filters, "limit": page_size, "offset": offset})
+            return self.get(f"/api/crud/signal_history/?{query_params}")
+
+        executor = ThreadPoolExecutor(max_workers=prefetch) if prefetch > 0 else None
+        pending = deque()
+        next_offset = 0
+        total = None
+        try:
+            while True:
+                # the first page comes alone, its count tells how far it is safe to prefetch
+                in_flight = 1 if next_offset == 0 else 1 + prefetch
+                while len(pending) < in_flight and (total is None or next_offset < total):
+                    if executor is None:
+                        pending.append(partial(fetch, next_offset))
+                    else:
+                        pending.append(executor.submit(fetch, next_offset).result)
+                    next_offset += page_size
+                if not pending:
+                    return
+                response = pending.popleft()()
+                if total is None:
+                    total = response.get("count")
+                results = response.get("results") or []
+                if results:
+                    yield results
+                if len(results) < page_size:
+                    return
+        finally:
+            if executor is not None:
+                executor.shutdown(wait=False, cancel_futures=True)
+
     def log(self, level, msg, **kwargs):
         """
         Logging function hook that should be overridden if you want logging
@@ -240,90 +1356,3207 @@ class FreqSignalsClient:
 
 
 
-class FreqSignalsMixin:
-    freqsignals_data_set_ids = None
+class FreqSignalsAsyncClient:
+    """
+    asyncio counterpart of FreqSignalsClient built on aiohttp. At most max_concurrency requests
+    are in flight at once, so get_signal_histories can fan out over many symbols safely. From
+    synchronous code (strategies) use it through FreqSignalsAsyncRunner.
+    """
+
+    def __init__(
+        self,
+        client_id=DEFAULT_CLIENT_ID,
+        client_secret=DEFAULT_CLIENT_SECRET,
+        host=DEFAULT_HOST,
+        https=DEFAULT_HTTPS,
+        request_timeout=DEFAULT_REQUEST_TIMEOUT,
+        request_max_attempts=DEFAULT_REQUEST_MAX_ATTEMPTS,
+        request_wait_interval=DEFAULT_REQUEST_WAIT_INTERVAL,
+        max_concurrency=DEFAULT_ASYNC_MAX_CONCURRENCY,
+        keep_alive=DEFAULT_KEEP_ALIVE,
+        token_file=DEFAULT_TOKEN_FILE,
+        background_token_refresh=DEFAULT_TOKEN_BACKGROUND_REFRESH,
+        retry_policy=None,
+        circuit_breaker=None,
+        token_manager=None,
+    ):
+        if aiohttp is None:
+            raise FreqSignalsError("FreqSignalsAsyncClient requires aiohttp")
+        self._client_id = client_id
+        self._client_secret = client_secret
+        self._host = host
+        self._https = https
+        self._request_timeout = request_timeout
+        self._request_max_attempts = request_max_attempts
+        self._request_wait_interval = request_wait_interval
+        self.retry_policy = retry_policy or FreqSignalsRetryPolicy(
+            max_attempts=request_max_attempts, backoff=request_wait_interval
+        )
+        self.circuit_breaker = circuit_breaker or FreqSignalsCircuitBreaker()
+        # pass a FreqSignalsClient's _token_manager to share its token instead of fetching another
+        self._token_manager = token_manager or FreqSignalsTokenManager(
+            self.fetch_token,
+            key=f"{client_id}@{host}",
+            token_file=token_file,
+            background_refresh=background_token_refresh,
+            log=self.log,
+        )
+        self._max_concurrency = max_concurrency
+        self._keep_alive = keep_alive
+        # created on first use so they bind to the loop the client runs on
+        self._session = None
+        self._semaphore = None
+
+    async def _ensure_session(self):
+        if self._session is None:
+            self._semaphore = asyncio.Semaphore(self._max_concurrency)
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self._max_concurrency, force_close=not self._keep_alive),
+                timeout=aiohttp.ClientTimeout(total=self._request_timeout),
+            )
+        return self._session
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+        self._token_manager.close()
+
+    def get_full_url(self, url):
+        protocol_string = "https" if self._https else "http"
+        return f"{protocol_string}://{self._host}{url}"
+
+    def fetch_token(self):
+        """
+        Requests a new token from the token endpoint, called by the token manager off the event loop
+        Returns:
+            dict - the token response (access_token, expires_in, scope, token_type)
+        """
+        post_data = {
+            "grant_type": "client_credentials",
+            "client_id": self._client_id,
+            "client_secret": self._client_secret,
+        }
+        response = requests.post(
+            self.get_full_url("/oa2/token/"), json=post_data, verify=self._https, timeout=self._request_timeout
+        )
+        return freqsignals_token_response(response.status_code, response.text, response.headers.get("Retry-After"))
+
+    async def get_token(self):
+        token = self._token_manager.current()
+        if token is None:
+            # the manager lets one caller fetch while the others wait, which mustn't block the loop
+            token = await asyncio.get_running_loop().run_in_executor(None, self._token_manager.get_token)
+        return token
+
+    async def get_headers(self):
+        return {"Authorization": f"Bearer {await self.get_token()}"}
+
+    async def make_request(self, url, method="get", data=None, headers=None, remaining_attempts=None):
+        """
+        Issues the request to FreqSignals, see FreqSignalsClient.make_request
+        """
+        session = await self._ensure_session()
+        if not self.circuit_breaker.allow():
+            raise FreqSignalsCircuitOpenError(f"FreqSignals API unavailable, not requesting {url}")
+        if remaining_attempts is None:
+            remaining_attempts = self.retry_policy.max_attempts
+        # only add a token (and retry a 401 with a fresh one) when the token is ours to replace
+        own_token = headers is None
+        retry_unauthorized = own_token
+        extra_headers = headers or {}
+        if method == "post":
+            body = freqsignals_dumps(data)
+            extra_headers = {"Content-Type": "application/json", **extra_headers}
+        elif method == "get":
+            body = None
+        else:
+            raise FreqSignalsError(f"bad method: {method}")
+        attempt = 0
+        while remaining_attempts > 0:
+            remaining_attempts -= 1
+            attempt += 1
+            headers = extra_headers
+            if own_token:
+                try:
+                    headers = {**(await self.get_headers()), **extra_headers}
+                except (RequestException, FreqSignalsTokenError) as e:
+                    if await self._token_failed(e, url, method, attempt, remaining_attempts):
+                        continue
+                    if isinstance(e, ConnectTimeout):
+                        raise FreqSignalsTimeoutError() from e
+                    raise
+            try:
+                async with self._semaphore:
+                    async with session.request(method.upper(), self.get_full_url(url), data=body, headers=headers) as response:
+                        text = await response.text()
+            except (asyncio.TimeoutError, aiohttp.ClientError) as e:
+                self.circuit_breaker.record_failure()
+                timed_out = isinstance(e, (asyncio.TimeoutError, aiohttp.ServerTimeoutError))
+                self.log("error", "request.timeout" if timed_out else "request.exception", remaining_attempts=remaining_attempts, method=method, url=url, sent_bytes=len(body or b""), error=str(e))
+                connect_failed = isinstance(e, aiohttp.ClientConnectorError)
+                # a post is only retried when it never reached the server
+                if remaining_attempts and (method == "get" or connect_failed or self.retry_policy.retry_non_idempotent):
+                    if await self._wait_to_retry(attempt):
+                        continue
+                if timed_out:
+                    raise FreqSignalsTimeoutError() from e
+                raise
+            if response.status == 401 and retry_unauthorized:
+                # revoked or expired early: get a new token and try once more, without using up an attempt
+                self.log("info", "request.unauthorized", method=method, url=url)
+                retry_unauthorized = False
+                self._token_manager.invalidate(headers["Authorization"][len("Bearer "):])
+                remaining_attempts += 1
+                attempt -= 1
+                continue
+            if response.status < 200 or response.status >= 300:
+                retry_after = response.headers.get("Retry-After")
+                if response.status >= 500 or response.status == 429:
+                    self.circuit_breaker.record_failure(freqsignals_parse_retry_after(retry_after))
+                else:
+                    self.circuit_breaker.record_success()
+                self.log(
+                    "error",
+                    "make_load_request.error_status_code",
+                    remaining_attempts=remaining_attempts,
+                    method=method,
+                    url=url,
+                    sent_bytes=len(body or b""),
+                    status_code=response.status,
+                    received_bytes=len(text),
+                )
+                if remaining_attempts and self.retry_policy.should_retry(method, status=response.status):
+                    if await self._wait_to_retry(attempt, retry_after):
+                        continue
+                if text:
+                    raise FreqSignalsError(
+                        "bad return status code: {} - {}".format(response.status, text), status_code=response.status
+                    )
+                raise FreqSignalsError("bad return status code: {}".format(response.status), status_code=response.status)
+            self.circuit_breaker.record_success()
+            json_res = json.loads(text)
+            self.log("info", "request.success", remaining_attempts=remaining_attempts, method=method, url=url, sent_bytes=len(body or b""), status_code=response.status, received_bytes=len(text))
+            return json_res
+        raise FreqSignalsTimeoutError()
+
+    async def _token_failed(self, error, url, method, attempt, remaining_attempts):
+        """
+        Records a failure to get a token for a request, see FreqSignalsClient._token_failed
+        Returns:
+            bool - whether to try the request again
+        """
+        status = getattr(error, "status_code", None)
+        if isinstance(error, RequestException) or status is None or status >= 500 or status == 429:
+            self.circuit_breaker.record_failure(freqsignals_parse_retry_after(getattr(error, "retry_after", None)))
+        else:
+            self.circuit_breaker.record_success()
+        self.log("error", "request.token_failed", remaining_attempts=remaining_attempts, method=method, url=url, error=str(error))
+        if isinstance(error, RequestException):
+            retry = self.retry_policy.should_retry("get", exception=error)
+        else:
+            retry = self.retry_policy.should_retry("get", status=status)
+        return bool(remaining_attempts) and retry and await self._wait_to_retry(attempt, getattr(error, "retry_after", None))
+
+    async def _wait_to_retry(self, attempt, retry_after=None):
+        delay = self.retry_policy.delay(attempt, retry_after)
+        if delay is None or not self.circuit_breaker.allow():
+            return False
+        await asyncio.sleep(delay)
+        return True
+
+    async def get(self, url):
+        return await self.make_request(url=url, method="get")
+
+    async def post(self, url, data):
+        return await self.make_request(url=url, method="post", data=data)
+
+    async def post_signal(self, data):
+        return await self.post("/api/async/signals/", data)
+
+    async def post_signals(self, signals):
+        if len(signals) == 1:
+            return await self.post("/api/async/signals/", signals[0])
+        return await self.post("/api/async/signals/", signals)
+
+    async def get_signals(self, filters=None):
+        if filters is None:
+            filters = {}
+        query_params = urlencode({**filters})
+        return await self.get(f"/api/crud/signals/?{query_params}")
+
+    async def get_signal_history(self, symbol, data_set_id, filters=None, multiple_pages=False, page_size=DEFAULT_HISTORY_PAGE_SIZE):
+        """
+        Like FreqSignalsClient.get_signal_history. With multiple_pages, the pages after the first
+        are requested concurrently once the first page's count is known.
+        """
+        filters = dict(filters or {})
+        if not multiple_pages:
+            query_params = urlencode({"symbol": symbol, "data_set_id": data_set_id, **filters})
+            return await self.get(f"/api/crud/signal_history/?{query_params}")
+
+        async def fetch(offset):
+            query_params = urlencode({"symbol": symbol, "data_set_id": data_set_id, **filters, "limit": page_size, "offset": offset})
+            return await self.get(f"/api/crud/signal_history/?{query_params}")
+
+        first = await fetch(0)
+        historical_signals = list(first.get("results") or [])
+        if len(historical_signals) >= page_size:
+            total = first.get("count")
+            if total is not None:
+                pages = await asyncio.gather(*(fetch(offset) for offset in range(page_size, total, page_size)))
+                for page in pages:
+                    historical_signals += page.get("results") or []
+            else:
+                offset = page_size
+                while True:
+                    page = (await fetch(offset)).get("results") or []
+                    historical_signals += page
+                    if len(page) < page_size:
+                        break
+                    offset += page_size
+        return {"count": len(historical_signals), "results": historical_signals}
+
+    async def get_signal_histories(self, symbols_data_sets, **kwargs):
+        """
+        Fetches the history of many (symbol, data_set_id) at once
+        Args:
+            symbols_data_sets: list - (symbol, data_set_id) tuples
+            kwargs: dict - get_signal_history options
+
+        Returns:
+            dict - (symbol, data_set_id) -> history response, or the exception it raised
+        """
+        keys = list(symbols_data_sets)
+        results = await asyncio.gather(
+            *(self.get_signal_history(symbol, data_set_id, **kwargs) for symbol, data_set_id in keys),
+            return_exceptions=True,
+        )
+        return dict(zip(keys, results))
+
+    def log(self, level, msg, **kwargs):
+        """
+        Logging function hook that should be overridden if you want logging, see FreqSignalsClient.log
+        """
+        pass
+
+
+class FreqSignalsAsyncRunner:
+    """
+    Synchronous wrapper around FreqSignalsAsyncClient. Runs the client on its own event loop
+    thread and exposes each coroutine method as a blocking call, e.g.
+    runner.get_signal_histories([(pair, data_set_id), ...]).
+    """
+
+    def __init__(self, async_client=None, **kwargs):
+        self.async_client = async_client or FreqSignalsAsyncClient(**kwargs)
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="freqsignals-async", daemon=True)
+        self._thread.start()
+
+    def run(self, coroutine, timeout=None):
+        """
+        Runs a coroutine on the runner's loop and waits for its result
+        """
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop).result(timeout)
+
+    def __getattr__(self, name):
+        method = getattr(self.async_client, name)
+        if not inspect.iscoroutinefunction(method):
+            return method
+        return lambda *args, **kwargs: self.run(method(*args, **kwargs))
+
+    def close(self):
+        self.run(self.async_client.close())
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(5)
+
+
+class FreqSignalsDeduplicator:
+    """
+    Suppresses signals that repeat the previous one for the same (symbol, data_set_id): the same
+    keys, numbers equal within tolerance / relative_tolerance, everything else exactly equal, and
+    the previous signal still valid. The context is compared key by key too, whether it's sent at
+    the top level or as a "context" dict, so followers never miss a context change; leave out
+    what moves every candle (e.g. a price) with ignore_keys. An unchanged signal is sent again
+    heartbeat_minutes before the previous one expires so consumers never see it lapse.
+    """
+
+    def __init__(
+        self,
+        tolerance=0.0,
+        relative_tolerance=0.0,
+        heartbeat_minutes=DEFAULT_DEDUP_HEARTBEAT_MINUTES,
+        ignore_keys=(),
+    ):
+        """
+        Args:
+            tolerance: float - largest absolute difference of numbers that counts as unchanged
+            relative_tolerance: float - largest relative difference of numbers that counts as unchanged
+            heartbeat_minutes: float - resend unchanged signals this long before they expire
+            ignore_keys: tuple - keys left out of the comparison, at the top level and in the
+                context dict, e.g. a price sent as context
+        """
+        self.tolerance = tolerance
+        self.relative_tolerance = relative_tolerance
+        self.heartbeat_minutes = heartbeat_minutes
+        self.ignore_keys = frozenset(ignore_keys)
+        # (symbol, data_set_id) -> (sent at, ttl minutes, compared keys of the signal)
+        self._last = {}
+        self._lock = threading.Lock()
+        self.counters = {"sent": 0, "suppressed": 0, "heartbeats": 0}
+
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def should_send(self, signal, now=None):
+        """
+        Args:
+            signal: dict - the signal, as for FreqSignalsClient.post_signal
+            now: float - optional - unix time, defaults to the current time
+
+        Returns:
+            bool - True if the signal should be sent, it's then remembered as the latest one
+        """
+        now = time.time() if now is None else now
+        key = (signal.get("symbol"), signal.get("data_set_id"))
+        compared = self._compared(signal)
+        with self._lock:
+            last = self._last.get(key)
+            if last is not None:
+                sent_at, ttl_minutes, previous = last
+                refresh_at = sent_at + (ttl_minutes - self.heartbeat_minutes) * 60
+                if self._unchanged(previous, compared):
+                    if now < refresh_at:
+                        self.counters["suppressed"] += 1
+                        return False
+                    self.counters["heartbeats"] += 1
+            self._last[key] = (now, signal.get("ttl_minutes", 0), compared)
+            self.counters["sent"] += 1
+            return True
+
+    def forget(self, symbol, data_set_id):
+        """
+        Drops the remembered signal, e.g. because sending it failed
+        """
+        with self._lock:
+            self._last.pop((symbol, data_set_id), None)
+
+    def _compared(self, signal):
+        """
+        Returns:
+            dict - the signal's keys to compare, the context dict's keys as ("context", key)
+        """
+        compared = {k: v for k, v in signal.items() if k not in self.ignore_keys and k != "context"}
+        context = signal.get("context")
+        if isinstance(context, dict):
+            compared.update((("context", k), v) for k, v in context.items() if k not in self.ignore_keys)
+        elif context is not None:
+            compared["context"] = context
+        return compared
+
+    def _unchanged(self, previous, compared):
+        if previous.keys() != compared.keys():
+            return False
+        for k, value in compared.items():
+            before = previous[k]
+            if isinstance(value, (int, float, np.integer, np.floating)) and isinstance(before, (int, float, np.integer, np.floating)):
+                if np.isnan(value) or np.isnan(before):
+                    if np.isnan(value) and np.isnan(before):
+                        continue
+                    return False
+                if abs(value - before) > max(self.tolerance, self.relative_tolerance * max(abs(value), abs(before))):
+                    return False
+            elif value != before:
+                return False
+        return True
+
+
+class FreqSignalsPublisher:
+    """
+    Uploads signals from a background thread. publish() only queues the signal; the worker
+    drains the queue through FreqSignalsClient.post_signals, one signal per request unless
+    max_batch_size allows more. A failed upload isn't waited on: its signals are queued again
+    after the retry_policy's backoff (exponential with full jitter), up to its max_attempts per
+    signal, while the worker goes on with the rest. A newer signal for the same (symbol,
+    data_set_id) replaces one waiting to be retried. Rejected signals (a 4xx other than 429)
+    and those out of attempts are dropped.
+
+    The queue holds at most max_queue_size signals. With coalesce, a signal replaces any
+    pending one for the same (symbol, data_set_id), so only the latest is uploaded. When the
+    queue is full, overflow decides whether the oldest pending signal ("drop_oldest") or the
+    incoming one ("drop_newest") is dropped. Queued signals are flushed on close() and at exit.
+    """
+
+    def __init__(
+        self,
+        client,
+        max_queue_size=DEFAULT_PUBLISHER_MAX_QUEUE_SIZE,
+        max_batch_size=DEFAULT_PUBLISHER_MAX_BATCH_SIZE,
+        linger=DEFAULT_PUBLISHER_LINGER,
+        coalesce=True,
+        overflow="drop_oldest",
+        retry_policy=None,
+    ):
+        """
+        Args:
+            retry_policy: FreqSignalsRetryPolicy - optional - attempts per signal and the backoff
+                between them, the client's own policy still applies to each request
+        """
+        if overflow not in ("drop_oldest", "drop_newest"):
+            raise FreqSignalsError(f"bad overflow policy: {overflow}")
+        self._client = client
+        self._max_queue_size = max_queue_size
+        self._max_batch_size = max(1, max_batch_size)
+        self._linger = linger
+        self._coalesce = coalesce
+        self._overflow = overflow
+        # a post the server may have received is sent again: the newest signal wins anyway
+        self.retry_policy = retry_policy or FreqSignalsRetryPolicy(
+            max_attempts=DEFAULT_PUBLISHER_MAX_ATTEMPTS,
+            backoff=DEFAULT_PUBLISHER_BACKOFF,
+            backoff_max=DEFAULT_PUBLISHER_BACKOFF_MAX,
+            retry_non_idempotent=True,
+        )
+        # key -> (signal, attempts made)
+        self._pending = OrderedDict()
+        # key -> (monotonic time it's due, signal, attempts made) of failed signals
+        self._retrying = OrderedDict()
+        self._sequence = 0
+        self._in_flight = 0
+        self._closing = False
+        self._condition = threading.Condition()
+        self.counters = {"queued": 0, "merged": 0, "dropped": 0, "sent": 0, "failed": 0, "batches": 0, "retries": 0}
+        self._thread = threading.Thread(target=self._run, name="freqsignals-publisher", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def publish(self, signal):
+        """
+        Queues a signal for upload
+        Args:
+            signal: dict - the signal, as for FreqSignalsClient.post_signal
+
+        Returns:
+            bool - False if the signal was dropped
+        """
+        with self._condition:
+            if self._closing:
+                self.counters["dropped"] += 1
+                self._forget([signal])
+                return False
+            key = (signal.get("symbol"), signal.get("data_set_id"))
+            if self._coalesce and key in self._pending:
+                self._pending[key] = (signal, 0)
+                self.counters["merged"] += 1
+                return True
+            if self._coalesce and key in self._retrying:
+                # the failed signal is outdated, the new one takes its place in the queue
+                del self._retrying[key]
+                self.counters["merged"] += 1
+            elif len(self._pending) + len(self._retrying) >= self._max_queue_size:
+                self.counters["dropped"] += 1
+                if self._overflow == "drop_newest":
+                    self._forget([signal])
+                    return False
+                oldest = self._retrying.popitem(last=False)[1][1] if self._retrying else self._pending.popitem(last=False)[1][0]
+                self._forget([oldest])
+            if not self._coalesce:
+                self._sequence += 1
+                key = key + (self._sequence,)
+            self._pending[key] = (signal, 0)
+            self.counters["queued"] += 1
+            self._condition.notify_all()
+        return True
+
+    def qsize(self):
+        with self._condition:
+            return len(self._pending) + len(self._retrying) + self._in_flight
+
+    def flush(self, timeout=None):
+        """
+        Blocks until every queued signal was sent (or given up on), retries included
+        Args:
+            timeout: float - optional - seconds to wait
+
+        Returns:
+            bool - True if the queue drained in time
+        """
+        with self._condition:
+            self._condition.notify_all()
+            return self._condition.wait_for(
+                lambda: not self._pending and not self._retrying and not self._in_flight, timeout
+            )
+
+    def close(self, timeout=DEFAULT_PUBLISHER_CLOSE_TIMEOUT):
+        """
+        Sends what is queued and stops the worker. Signals waiting to be retried get one last
+        attempt right away. Returns after timeout even if signals are still being sent; the worker
+        is a daemon thread, so what it hasn't sent by exit is dropped.
+        """
+        with self._condition:
+            if self._closing:
+                return
+            self._closing = True
+            self._condition.notify_all()
+        self._thread.join(timeout)
+        atexit.unregister(self.close)
+
+    def _requeue_due(self):
+        """
+        Moves the retries that are due (all of them when closing) back to the pending queue
+        Returns:
+            float - seconds until the next retry is due, None if none is waiting
+        """
+        now = time.monotonic()
+        for key, (due, signal, attempts) in list(self._retrying.items()):
+            if due > now and not self._closing:
+                continue
+            del self._retrying[key]
+            if key not in self._pending:
+                self._pending[key] = (signal, attempts)
+        if not self._retrying:
+            return None
+        return max(0.0, min(due for due, _, _ in self._retrying.values()) - now)
+
+    def _next_batch(self):
+        with self._condition:
+            while True:
+                wait = self._requeue_due()
+                if self._pending:
+                    break
+                if self._closing:
+                    return None
+                self._condition.wait(wait)
+            # give other pairs a moment to join the batch
+            self._condition.wait_for(
+                lambda: len(self._pending) >= self._max_batch_size or self._closing, self._linger
+            )
+            batch = []
+            while self._pending and len(batch) < self._max_batch_size:
+                key, (signal, attempts) = self._pending.popitem(last=False)
+                batch.append((key, signal, attempts))
+            self._in_flight = len(batch)
+            return batch
+
+    def _send(self, batch):
+        try:
+            self._client.post_signals([signal for _, signal, _ in batch])
+        except Exception as e:
+            self._client.log("error", "publisher.post_failed", size=len(batch), error=str(e))
+            self._retry(batch, e)
+            return
+        self.counters["sent"] += len(batch)
+        self.counters["batches"] += 1
+
+    def _retry(self, batch, error):
+        status = getattr(error, "status_code", None)
+        # no status: a timeout, a connection error or the circuit breaker, worth another try
+        retryable = status is None or self.retry_policy.should_retry("post", status=status)
+        failed = []
+        with self._condition:
+            for key, signal, attempts in batch:
+                attempts += 1
+                delay = self.retry_policy.delay(attempts) if retryable else None
+                if self._closing or attempts >= self.retry_policy.max_attempts or delay is None:
+                    failed.append(signal)
+                elif key in self._pending:
+                    # a newer signal for the pair was queued meanwhile, it replaces this one
+                    self.counters["merged"] += 1
+                else:
+                    self._retrying[key] = (time.monotonic() + delay, signal, attempts)
+                    self.counters["retries"] += 1
+        self.counters["failed"] += len(failed)
+        self._forget(failed)
+
+    def _forget(self, signals):
+        # the deduplicator took them as sent when they were queued; a repeat mustn't be suppressed
+        deduplicator = self._client.deduplicator
+        if deduplicator is not None:
+            for signal in signals:
+                deduplicator.forget(signal.get("symbol"), signal.get("data_set_id"))
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                return
+            try:
+                self._send(batch)
+            finally:
+                with self._condition:
+                    self._in_flight = 0
+                    self._condition.notify_all()
+
+
+class FreqSignalsPoller:
+    """
+    Calls poll on a background thread every interval seconds. The signals each poll returns
+    are added to a pending batch, and take() swaps that batch out in one step, so the bot loop
+    applies complete polls only and never waits on the API longer than it chooses to.
+    """
+
+    def __init__(self, poll, interval=DEFAULT_POLL_INTERVAL):
+        """
+        Args:
+            poll: callable - returns a list of signals
+            interval: float - seconds from the start of one poll to the next
+        """
+        self._poll = poll
+        self._interval = interval
+        self._pending = []
+        # True until the first poll is done, so take() can wait for it
+        self._polling = True
+        self._closing = False
+        self._wake = threading.Event()
+        self._condition = threading.Condition()
+        self.last_poll_at = None
+        self.last_poll_duration = None
+        self.counters = {"polls": 0, "errors": 0, "signals": 0}
+        self._thread = threading.Thread(target=self._run, name="freqsignals-poller", daemon=True)
+        self._thread.start()
+
+    def take(self, timeout=0):
+        """
+        Args:
+            timeout: float - seconds to wait for a poll in progress to finish first
+
+        Returns:
+            list - signals polled since the previous call
+        """
+        with self._condition:
+            if timeout and self._polling:
+                polls = self.counters["polls"]
+                self._condition.wait_for(lambda: self.counters["polls"] != polls or self._closing, timeout)
+            pending, self._pending = self._pending, []
+        return pending
+
+    def poll_now(self):
+        """
+        Starts the next poll without waiting for the interval
+        """
+        self._wake.set()
+
+    def close(self, timeout=None):
+        self._closing = True
+        self._wake.set()
+        self._thread.join(timeout)
+
+    def _run(self):
+        while not self._closing:
+            started = time.monotonic()
+            with self._condition:
+                self._polling = True
+            signals = []
+            try:
+                signals = self._poll()
+            except Exception as e:
+                self.counters["errors"] += 1
+                logger.error(f"FreqSignals poll failed: {e}")
+            self.last_poll_duration = time.monotonic() - started
+            self.last_poll_at = datetime.now(timezone.utc)
+            with self._condition:
+                self._pending.extend(signals)
+                self._polling = False
+                self.counters["polls"] += 1
+                self.counters["signals"] += len(signals)
+                self._condition.notify_all()
+            self._wake.wait(max(0, self._interval - self.last_poll_duration))
+            self._wake.clear()
+
+
+def freqsignals_iter_sse(chunks):
+    """
+    Parses a text/event-stream
+    Args:
+        chunks: iterable - bytes as they arrive
+
+    Returns:
+        generator - (event, id, data) for every event; comments (heartbeats) are skipped
+    """
+    buffer = b""
+    event, event_id, data = None, None, []
+    for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            line = line.rstrip(b"\r").decode("utf-8")
+            if not line:
+                if data:
+                    yield event or "message", event_id, "\n".join(data)
+                # the id carries over to later events, as for Last-Event-ID
+                event, data = None, []
+                continue
+            if line.startswith(":"):
+                continue
+            field, _, value = line.partition(":")
+            if value.startswith(" "):
+                value = value[1:]
+            if field == "event":
+                event = value
+            elif field == "data":
+                data.append(value)
+            elif field == "id":
+                event_id = value
+
+
+class FreqSignalsStream:
+    """
+    Keeps a server-sent events connection to the signal stream open on a background thread.
+    Each "signals" event carries a signal or a list of them. When the connection drops it
+    reconnects after the client's retry policy backoff and resumes from the latest updated_date
+    seen (sent as Last-Event-ID and updated_date__gte), dropping the signals at that date it
+    already received.
+    Signals collect in a pending batch that take() swaps out, as with FreqSignalsPoller. If the
+    API has no stream (404) unsupported is set and the thread stops.
+    """
+
+    def __init__(
+        self,
+        client,
+        data_set_ids=None,
+        since=None,
+        seen=(),
+        path=DEFAULT_STREAM_PATH,
+        read_timeout=DEFAULT_STREAM_READ_TIMEOUT,
+    ):
+        """
+        Args:
+            client: FreqSignalsClient - to connect with
+            data_set_ids: list - optional - only these data sets
+            since: str - optional - updated_date to resume from, otherwise only signals updated
+                after connecting arrive
+            seen: list - optional - (symbol, data_set_id) of the signals at since already received
+            path: str - the stream endpoint
+            read_timeout: float - seconds without an event or heartbeat before reconnecting
+        """
+        self._client = client
+        self._data_set_ids = data_set_ids
+        self._path = path
+        self._read_timeout = read_timeout
+        self.last_updated_date = since
+        self._last_updated_ns = freqsignals_dates_to_ns([since])[0] if since else None
+        # (symbol, data_set_id) of the signals received at last_updated_date
+        self._at_last_updated = set(seen)
+        self.connected = False
+        self.disconnected_since = datetime.now(timezone.utc)
+        self.unsupported = False
+        self._pending = []
+        self._response = None
+        self._closing = False
+        self.counters = {"connects": 0, "errors": 0, "events": 0, "signals": 0}
+        self._start()
+
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        for name in ("_wake", "_lock", "_thread", "_response"):
+            del state[name]
+        return state
+
+    def __setstate__(self, state):
+        # a copy opens its own connection, resuming from the latest updated_date the original saw
+        self.__dict__.update(state)
+        self._response = None
+        self.connected = False
+        self._start()
+
+    def _start(self):
+        self._wake = threading.Event()
+        self._lock = threading.Lock()
+        self._thread = None
+        if not self._closing and not self.unsupported:
+            self._thread = threading.Thread(target=self._run, name="freqsignals-stream", daemon=True)
+            self._thread.start()
+
+    def take(self):
+        """
+        Returns:
+            list - signals received since the previous call
+        """
+        with self._lock:
+            pending, self._pending = self._pending, []
+        return pending
+
+    def close(self, timeout=None):
+        self._closing = True
+        self._wake.set()
+        response = self._response
+        if response is not None:
+            # unblocks the read the thread is waiting in; closing the response would wait for
+            # that read to return first
+            connection = getattr(response.raw, "connection", None) or getattr(response.raw, "_connection", None)
+            sock = getattr(connection, "sock", None)
+            try:
+                if sock is not None:
+                    sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _run(self):
+        attempt = 0
+        while not self._closing:
+            retry_after = None
+            try:
+                retry_after = self._consume()
+                attempt = 0
+            except Exception as e:
+                if self._closing:
+                    break
+                self.counters["errors"] += 1
+                logger.warning(f"FreqSignals signal stream failed: {e}")
+            if self.connected:
+                self.connected = False
+                self.disconnected_since = datetime.now(timezone.utc)
+            if self.unsupported or self._closing:
+                break
+            attempt += 1
+            delay = self._client.retry_policy.delay(attempt, retry_after)
+            self._wake.wait(self._client.retry_policy.backoff_max if delay is None else delay)
+
+    def _consume(self):
+        """
+        Reads one connection until it ends
+        Returns:
+            str - the Retry-After of a refused connection, if any
+        """
+        filters = {}
+        if self._data_set_ids:
+            filters["data_set_id__in"] = ",".join(self._data_set_ids)
+        if self.last_updated_date:
+            filters["updated_date__gte"] = self.last_updated_date
+        response = self._client.open_signal_stream(filters, self.last_updated_date, self._path, self._read_timeout)
+        self._response = response
+        try:
+            if response.status_code == 404:
+                logger.warning(f"FreqSignals has no signal stream at {self._path}, polling instead")
+                self.unsupported = True
+                return None
+            if response.status_code != 200:
+                self.counters["errors"] += 1
+                logger.warning(f"FreqSignals signal stream refused: {response.status_code}")
+                return response.headers.get("Retry-After")
+            self.connected = True
+            self.disconnected_since = None
+            self.counters["connects"] += 1
+            for event, _, data in freqsignals_iter_sse(response.iter_content(chunk_size=None)):
+                if event != "signals":
+                    continue
+                signals = json.loads(data)
+                if isinstance(signals, dict):
+                    signals = [signals]
+                if not signals:
+                    continue
+                received = []
+                dates_ns = freqsignals_dates_to_ns([signal["updated_date"] for signal in signals])
+                for signal, date_ns in zip(signals, dates_ns.tolist()):
+                    key = (signal["symbol"], signal["data_set_id"])
+                    if self._last_updated_ns is None or date_ns > self._last_updated_ns:
+                        self._last_updated_ns = date_ns
+                        self._at_last_updated = {key}
+                        self.last_updated_date = signal["updated_date"]
+                    elif date_ns == self._last_updated_ns:
+                        if key in self._at_last_updated:
+                            # sent again after resuming
+                            continue
+                        self._at_last_updated.add(key)
+                    received.append(signal)
+                with self._lock:
+                    self._pending.extend(received)
+                self.counters["events"] += 1
+                self.counters["signals"] += len(received)
+        finally:
+            self._response = None
+            response.close()
+        return None
+
+
+class FreqSignalsLatencyTracker:
+    """
+    Measures how old signals are (time since their updated_date, when the provider posted them)
+    at two points on their way to a trade, per data set: "received" when a poll returns them
+    and "applied" when freqsignals_add_pair_signals first joins them onto a candle. A signal
+    that expires before any candle reaches it is counted as missed. The latest window
+    latencies of each are kept for percentiles.
+
+    alert is called with a dict (stage, pair, data_set_id, latency, ttl_minutes) when a
+    latency exceeds alert_ttl_fraction of the signal's ttl, at most once per alert_interval
+    seconds for each data set and stage.
+    """
+
+    STAGES = ("received", "applied")
+
+    def __init__(
+        self,
+        window=DEFAULT_LATENCY_WINDOW,
+        alert=None,
+        alert_ttl_fraction=DEFAULT_LATENCY_ALERT_TTL_FRACTION,
+        alert_interval=DEFAULT_LATENCY_ALERT_INTERVAL,
+    ):
+        self._window = window
+        self._alert = alert
+        self._alert_ttl_fraction = alert_ttl_fraction
+        self._alert_interval = alert_interval
+        self._lock = threading.Lock()
+        # (data_set_id, stage) -> recent latencies in seconds
+        self._latencies = {}
+        self._missed = {}
+        self._alerted_at = {}
+        # (pair, data_set_id) -> {start ns: ttl minutes} of received signals not applied yet
+        self._pending = {}
+
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def received(self, signals, now=None):
+        """
+        Records the latency of polled signals and waits for them to be applied
+        Args:
+            signals: list - signal dicts, only ones not seen by an earlier poll
+            now: datetime - optional - defaults to the current UTC time
+        """
+        if not signals:
+            return
+        now_ns = self._now_ns(now)
+        start_ns = freqsignals_dates_to_ns([signal["updated_date"] for signal in signals])
+        with self._lock:
+            for signal, start in zip(signals, start_ns.tolist()):
+                key = (signal["symbol"], signal["data_set_id"])
+                pending = self._pending.setdefault(key, {})
+                pending[start] = signal["ttl_minutes"]
+                if len(pending) > self._window:
+                    # a pair nothing joins (not in the whitelist) mustn't grow without bound
+                    del pending[min(pending)]
+                self._record("received", key[0], key[1], now_ns - start, signal["ttl_minutes"])
+
+    def applied(self, pair, data_set_id, stored_ns, candle_ns, now=None):
+        """
+        Resolves the pending signals of a pair that are stored and that the candles have reached
+        Args:
+            pair: str - the pair
+            data_set_id: str - the data set
+            stored_ns: np.ndarray - int64 ascending starts of the stored signals
+            candle_ns: np.ndarray - int64 ascending candle dates being joined
+            now: datetime - optional - defaults to the current UTC time
+        """
+        pending = self._pending.get((pair, data_set_id))
+        if not pending or not len(candle_ns):
+            return
+        now_ns = self._now_ns(now)
+        with self._lock:
+            for start, ttl_minutes in list(pending.items()):
+                if start > candle_ns[-1]:
+                    continue
+                index = np.searchsorted(stored_ns, start)
+                if index == len(stored_ns) or stored_ns[index] != start:
+                    # polled but not stored yet, the bot loop hasn't taken it from the poller
+                    continue
+                del pending[start]
+                end = start + ttl_minutes * NS_PER_MINUTE
+                if np.searchsorted(candle_ns, start) < np.searchsorted(candle_ns, end):
+                    self._record("applied", pair, data_set_id, now_ns - start, ttl_minutes)
+                else:
+                    self._missed[data_set_id] = self._missed.get(data_set_id, 0) + 1
+
+    def stats(self, percentiles=(50, 95, 99)):
+        """
+        Returns:
+            dict - data_set_id -> {"missed": count, stage: {"count", "max", "p50", ...} in seconds}
+        """
+        with self._lock:
+            latencies = {key: np.array(values) for key, values in self._latencies.items()}
+            missed = dict(self._missed)
+        result = {data_set_id: {"missed": count} for data_set_id, count in missed.items()}
+        for (data_set_id, stage), values in latencies.items():
+            stage_stats = {"count": len(values), "max": float(values.max())}
+            for percentile, value in zip(percentiles, np.percentile(values, percentiles).tolist()):
+                stage_stats[f"p{percentile}"] = value
+            result.setdefault(data_set_id, {"missed": 0})[stage] = stage_stats
+        return result
+
+    @staticmethod
+    def _now_ns(now):
+        return int(freqsignals_dates_to_ns([freqsignals_isoformat(now or datetime.now(timezone.utc))])[0])
+
+    def _record(self, stage, pair, data_set_id, latency_ns, ttl_minutes):
+        # clocks differ a little between the provider, the API and this host
+        latency = max(0, latency_ns) / 1e9
+        key = (data_set_id, stage)
+        latencies = self._latencies.get(key)
+        if latencies is None:
+            latencies = self._latencies[key] = deque(maxlen=self._window)
+        latencies.append(latency)
+        if self._alert is None or not self._alert_ttl_fraction or latency <= self._alert_ttl_fraction * ttl_minutes * 60:
+            return
+        now = time.monotonic()
+        if now - self._alerted_at.get(key, -self._alert_interval) < self._alert_interval:
+            return
+        self._alerted_at[key] = now
+        try:
+            self._alert({"stage": stage, "pair": pair, "data_set_id": data_set_id, "latency": latency, "ttl_minutes": ttl_minutes})
+        except Exception as e:
+            logger.error(f"FreqSignals latency alert failed: {e}")
+
+
+class FreqSignalsBackfill:
+    """
+    Uploads many signals (a data set's history) in chunks of chunk_size, workers chunks at a
+    time. Every uploaded chunk is appended to the state_path file, keyed by a hash of its
+    content, so running the same backfill again after a crash skips what was already sent.
+    """
+
+    def __init__(self, client, state_path=DEFAULT_BACKFILL_STATE, chunk_size=DEFAULT_BACKFILL_CHUNK_SIZE, workers=DEFAULT_BACKFILL_WORKERS):
+        """
+        Args:
+            client: FreqSignalsClient - uploads the chunks
+            state_path: str - file recording the uploaded chunks, None to not record them
+            chunk_size: int - signals per request
+            workers: int - requests in flight
+        """
+        self._client = client
+        self._state_path = state_path
+        self._chunk_size = max(1, chunk_size)
+        self._workers = max(1, workers)
+        self._lock = threading.Lock()
+        self._done = set()
+        if state_path and os.path.exists(state_path):
+            with open(state_path) as f:
+                # a line cut short by a crash doesn't match any chunk, so it's simply sent again
+                self._done = {line.strip() for line in f if line.strip()}
+
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def chunk_key(chunk):
+        return hashlib.sha1(freqsignals_dumps(chunk)).hexdigest()
+
+    def upload(self, signals):
+        """
+        Args:
+            signals: list - signal dicts, as for FreqSignalsClient.post_signal
+
+        Returns:
+            dict - counts of chunks sent, skipped (already uploaded) and failed, and signals sent
+        """
+        result = {"sent": 0, "skipped": 0, "failed": 0, "signals": 0}
+        pending = []
+        for i in range(0, len(signals), self._chunk_size):
+            chunk = signals[i:i + self._chunk_size]
+            key = self.chunk_key(chunk)
+            if key in self._done:
+                result["skipped"] += 1
+            else:
+                pending.append((key, chunk))
+        if not pending:
+            return result
+        with ThreadPoolExecutor(max_workers=self._workers, thread_name_prefix="freqsignals-backfill") as executor:
+            futures = {executor.submit(self._client.post_signals, chunk): (key, chunk) for key, chunk in pending}
+            for future in as_completed(futures):
+                key, chunk = futures[future]
+                try:
+                    future.result()
+                except Exception as e:
+                    result["failed"] += 1
+                    self._client.log("error", "backfill.chunk_failed", size=len(chunk), error=str(e))
+                    continue
+                self._record(key)
+                result["sent"] += 1
+                result["signals"] += len(chunk)
+        return result
+
+    def _record(self, key):
+        with self._lock:
+            self._done.add(key)
+            if self._state_path:
+                with open(self._state_path, "a") as f:
+                    f.write(key + "\n")
+
+
+def freqsignals_signals_from_frame(frame, symbol, data_set_id):
+    """
+    Builds signal dicts from a frame with one row per signal: updated_date, value and
+    ttl_minutes columns, every other column is context. Rows without a value are skipped.
+    Args:
+        frame: DataFrame - the signals
+        symbol: str - pair the signals are for
+        data_set_id: str - data set the signals belong to
+
+    Returns:
+        list - signal dicts, as for FreqSignalsClient.post_signal
+    """
+    frame = frame[frame["value"].notna()]
+    dates = np.datetime_as_string(
+        freqsignals_candles_to_ns(frame["updated_date"]).astype("datetime64[ns]").astype("datetime64[us]")
+    )
+    columns = {
+        name: [None if isinstance(v, float) and v != v else v for v in frame[name].tolist()]
+        for name in frame.columns
+        if name != "updated_date"
+    }
+    signals = [{"symbol": symbol, "data_set_id": data_set_id, "updated_date": f"{date}Z"} for date in dates]
+    for name, values in columns.items():
+        for signal, value in zip(signals, values):
+            signal[name] = value
+    return signals
+
+
+def freqsignals_to_datetime(value):
+    """
+    Normalizes a datetime or ISO 8601 string to a naive UTC datetime
+    """
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def freqsignals_isoformat(value):
+    """
+    Formats a datetime or ISO 8601 string the way FreqSignals dates look, e.g. 2022-11-01T12:00:00Z
+    """
+    return freqsignals_to_datetime(value).isoformat() + "Z"
+
+
+def freqsignals_dates_to_ns(dates):
+    """
+    Converts signal date strings (ISO 8601, optionally "Z" suffixed) to UTC nanoseconds
+    Args:
+        dates: list - date strings as returned by FreqSignals
+
+    Returns:
+        np.ndarray - int64 nanoseconds since epoch
+    """
+    try:
+        return np.array([d.replace("Z", "") for d in dates], dtype="datetime64[ns]").view(np.int64)
+    except ValueError:
+        # offsets other than "Z" - let pandas normalize them to UTC
+        return to_datetime(list(dates), utc=True).tz_convert(None).to_numpy(dtype="datetime64[ns]").view(np.int64)
+
+
+def freqsignals_candles_to_ns(dates):
+    """
+    Converts the dataframe's date column to UTC nanoseconds. Naive dates are treated as UTC.
+    Args:
+        dates: Series - the dataframe's `date` column
+
+    Returns:
+        np.ndarray - int64 nanoseconds since epoch
+    """
+    if getattr(dates.dt, "tz", None) is not None:
+        dates = dates.dt.tz_convert(None)
+    return dates.to_numpy(dtype="datetime64[ns]").view(np.int64)
+
+
+def freqsignals_join_intervals(candle_ns, start_ns, end_ns):
+    """
+    Maps every candle onto the signal whose [start, end) interval covers it. When several
+    signals cover a candle the one with the latest start wins (ties go to the later index),
+    the same result as writing the signals onto the dataframe one after another.
+    Args:
+        candle_ns: np.ndarray - int64 candle dates, ascending
+        start_ns: np.ndarray - int64 signal starts, ascending
+        end_ns: np.ndarray - int64 signal ends (exclusive), aligned with start_ns
+
+    Returns:
+        np.ndarray - index into the signal arrays for each candle, -1 where no signal applies
+    """
+    winner = np.full(len(candle_ns), -1, dtype=np.int64)
+    if not len(candle_ns) or not len(start_ns):
+        return winner
+    if np.all(end_ns[1:] >= end_ns[:-1]):
+        # ends ascend with starts (e.g. constant ttl): if the latest signal started before a candle
+        # has already expired, so has every earlier one, so one searchsorted is enough
+        latest = np.searchsorted(start_ns, candle_ns, side="right") - 1
+        started = latest >= 0
+        covered = np.zeros(len(candle_ns), dtype=bool)
+        covered[started] = candle_ns[started] < end_ns[latest[started]]
+        winner[covered] = latest[covered]
+        return winner
+    # mixed ttls: paint candle ranges in start order so later signals overwrite earlier ones
+    lo = np.searchsorted(candle_ns, start_ns, side="left")
+    hi = np.searchsorted(candle_ns, end_ns, side="left")
+    for i in np.flatnonzero(hi > lo):
+        winner[lo[i]:hi[i]] = i
+    return winner
+
+
+def freqsignals_take(values, winner):
+    """
+    Gathers per-candle values for a join result
+    Args:
+        values: np.ndarray - one value per signal
+        winner: np.ndarray - output of freqsignals_join_intervals
+
+    Returns:
+        np.ndarray - float64 with NaN for numeric values, otherwise object with None, where uncovered
+    """
+    covered = winner >= 0
+    if values.dtype.kind in "iuf":
+        out = np.full(len(winner), np.nan)
+    else:
+        out = np.full(len(winner), None, dtype=object)
+    out[covered] = values[winner[covered]]
+    return out
+
+
+NS_PER_MINUTE = 60_000_000_000
+NS_MAX = np.iinfo(np.int64).max
+
+
+class FreqSignalsSeries:
+    """
+    The signals of one (pair, data_set_id) as parallel arrays sorted by start time: int64 start
+    nanoseconds, int32 ttl minutes, float64 values and one typed column per context key
+    (float64 when the key only ever held numbers, otherwise object) with a mask of which signals
+    carry the key. Signals are unique by start time; the first copy of a start is kept.
+
+    The arrays have spare capacity so signals arriving in order are appended in place. The
+    properties return views, nothing is copied when handing them to the dataframe join.
+    """
+
+    def __init__(self, capacity=64):
+        self._size = 0
+        self._capacity = capacity
+        self._arrays = {
+            "start": np.empty(capacity, dtype=np.int64),
+            "ttl": np.empty(capacity, dtype=np.int32),
+            "value": np.empty(capacity, dtype=np.float64),
+        }
+        self._context_keys = []
+        # bumped on every change so consumers can tell if the series moved on
+        self.version = 0
+        # (version, from_ns, to_ns) of recent changes: the span of candles each one can affect
+        self.changes = deque(maxlen=64)
+        # earliest end of any stored signal, what FreqSignalsStore's expiry index is keyed by
+        self.min_end_ns = NS_MAX
+
+    @classmethod
+    def from_arrays(cls, arrays, context_keys, min_end_ns):
+        """
+        Wraps existing equal length arrays, e.g. read-only memory maps, without copying them.
+        The first change to the series copies them into its own buffers.
+        """
+        series = cls(capacity=0)
+        series._arrays = dict(arrays)
+        series._size = series._capacity = len(arrays["start"])
+        series._context_keys = list(context_keys)
+        series.min_end_ns = min_end_ns
+        return series
+
+    def __len__(self):
+        return self._size
+
+    @property
+    def start_ns(self):
+        return self._arrays["start"][:self._size]
+
+    @property
+    def ttl_minutes(self):
+        return self._arrays["ttl"][:self._size]
+
+    @property
+    def end_ns(self):
+        return self.start_ns + self.ttl_minutes.astype(np.int64) * NS_PER_MINUTE
+
+    @property
+    def values(self):
+        return self._arrays["value"][:self._size]
+
+    @property
+    def context_keys(self):
+        return list(self._context_keys)
+
+    def context(self, key):
+        """
+        Returns:
+            tuple - (values, present) views for the context key
+        """
+        return self._arrays[f"context:{key}"][:self._size], self._arrays[f"present:{key}"][:self._size]
+
+    @property
+    def nbytes(self):
+        return sum(array.nbytes for array in self._arrays.values())
+
+    def extend(self, start_ns, ttl_minutes, values, contexts=None, context_columns=None):
+        """
+        Adds signals, skipping any whose start is already stored
+        Args:
+            start_ns: np.ndarray - int64 start times
+            ttl_minutes: list - ttl per signal
+            values: list - value per signal
+            contexts: list - optional - context dict per signal
+            context_columns: dict - optional - context key -> (values, present) arrays, instead of contexts
+
+        Returns:
+            int - number of signals added
+        """
+        start_ns = np.asarray(start_ns, dtype=np.int64)
+        if not len(start_ns):
+            return 0
+        order = np.argsort(start_ns, kind="stable")
+        start_ns = start_ns[order]
+        keep = np.ones(len(start_ns), dtype=bool)
+        keep[1:] = start_ns[1:] != start_ns[:-1]
+        existing = self.start_ns
+        positions = np.searchsorted(existing, start_ns)
+        if len(existing):
+            keep &= existing[np.minimum(positions, len(existing) - 1)] != start_ns
+        if not keep.any():
+            return 0
+        selected = order[keep]
+        batch = {
+            "start": start_ns[keep],
+            "ttl": np.asarray(ttl_minutes, dtype=np.int32)[selected],
+            "value": freqsignals_to_float_array(values)[selected],
+        }
+        if contexts is not None:
+            selected_contexts = [contexts[i] or {} for i in selected]
+            batch_keys = {}
+            for context in selected_contexts:
+                batch_keys.update(dict.fromkeys(context))
+            for key in batch_keys:
+                self._batch_context(
+                    batch,
+                    key,
+                    freqsignals_context_array([context.get(key) for context in selected_contexts]),
+                    np.array([key in context for context in selected_contexts]),
+                )
+        for key, (column, present) in (context_columns or {}).items():
+            self._batch_context(batch, key, np.asarray(column)[selected], np.asarray(present, dtype=bool)[selected])
+        count = len(batch["start"])
+        for name, array in self._arrays.items():
+            if name not in batch:
+                batch[name] = self._missing(array.dtype, count)
+
+        if not self._size or batch["start"][0] > self._arrays["start"][self._size - 1]:
+            self._reserve(self._size + count)
+            for name, array in self._arrays.items():
+                array[self._size:self._size + count] = batch[name]
+        else:
+            # out of order (e.g. history arriving after live signals): one merged copy per column
+            insert_at = positions[keep]
+            for name, array in list(self._arrays.items()):
+                self._arrays[name] = np.insert(array[:self._size], insert_at, batch[name])
+            self._capacity = self._size + count
+        self._size += count
+        self.version += 1
+        batch_end_ns = batch["start"] + batch["ttl"].astype(np.int64) * NS_PER_MINUTE
+        self.changes.append((self.version, int(batch["start"][0]), int(batch_end_ns.max())))
+        self.min_end_ns = min(self.min_end_ns, int(batch_end_ns.min()))
+        return count
+
+    def evict_ended(self, cutoff_ns):
+        """
+        Drops the signals that ended at or before cutoff_ns
+        Returns:
+            int - number of signals dropped
+        """
+        # only signals that started before the cutoff can have ended by it
+        candidates = int(np.searchsorted(self.start_ns, cutoff_ns, side="left"))
+        if not candidates:
+            return 0
+        keep = np.ones(self._size, dtype=bool)
+        keep[:candidates] = self.end_ns[:candidates] > cutoff_ns
+        kept = int(keep.sum())
+        if kept == self._size:
+            return 0
+        first_start_ns = int(self._arrays["start"][0])
+        for name, array in self._arrays.items():
+            if array.flags.writeable:
+                array[:kept] = array[:self._size][keep]
+            else:
+                self._arrays[name] = array[:self._size][keep]
+                self._capacity = kept
+        evicted = self._size - kept
+        self._size = kept
+        if kept * 4 < self._capacity and self._capacity > 64:
+            # give the memory back once the series has shrunk well below its buffers
+            self._capacity = max(64, kept * 2)
+            for name, array in self._arrays.items():
+                self._arrays[name] = array[:self._capacity].copy()
+        self.version += 1
+        self.changes.append((self.version, first_start_ns, cutoff_ns))
+        self.min_end_ns = int(self.end_ns.min()) if kept else NS_MAX
+        return evicted
+
+    def changed_since(self, version):
+        """
+        Args:
+            version: int - a version of this series seen earlier
+
+        Returns:
+            list - (from_ns, to_ns) spans of candles that changes since then can affect, None if
+            there were more changes than are remembered
+        """
+        if version == self.version:
+            return []
+        if not self.changes or self.changes[0][0] > version + 1:
+            return None
+        return [(from_ns, to_ns) for changed_version, from_ns, to_ns in self.changes if changed_version > version]
+
+    def to_signals(self, symbol, data_set_id):
+        """
+        Rebuilds the signal dicts, as returned by the FreqSignals API
+        """
+        dates = np.datetime_as_string(self.start_ns.astype("datetime64[ns]").astype("datetime64[us]"))
+        contexts = [{} for _ in range(self._size)]
+        for key in self._context_keys:
+            column, present = self.context(key)
+            for i in np.flatnonzero(present):
+                contexts[i][key] = column[i].item() if hasattr(column[i], "item") else column[i]
+        return [
+            {
+                "symbol": symbol,
+                "data_set_id": data_set_id,
+                "updated_date": f"{dates[i]}Z",
+                "ttl_minutes": int(self.ttl_minutes[i]),
+                "value": float(self.values[i]),
+                "context": contexts[i],
+            }
+            for i in range(self._size)
+        ]
+
+    def _batch_context(self, batch, key, column, present):
+        self._add_context_key(key, column.dtype)
+        if column.dtype == object and self._arrays[f"context:{key}"].dtype != object:
+            self._arrays[f"context:{key}"] = self._arrays[f"context:{key}"].astype(object)
+        batch[f"context:{key}"] = column
+        batch[f"present:{key}"] = present
+
+    @staticmethod
+    def _missing(dtype, count):
+        if dtype.kind in "biu":
+            return np.zeros(count, dtype=dtype)
+        if dtype == object:
+            return np.full(count, None, dtype=object)
+        return np.full(count, np.nan, dtype=dtype)
+
+    def _add_context_key(self, key, dtype):
+        if f"present:{key}" in self._arrays:
+            return
+        self._context_keys.append(key)
+        self._arrays[f"context:{key}"] = self._missing(dtype, self._capacity)
+        self._arrays[f"present:{key}"] = np.zeros(self._capacity, dtype=bool)
+
+    def _reserve(self, size):
+        if size <= self._capacity:
+            return
+        capacity = max(size, self._capacity * 2)
+        for name, array in self._arrays.items():
+            grown = self._missing(array.dtype, capacity)
+            grown[:self._size] = array[:self._size]
+            self._arrays[name] = grown
+        self._capacity = capacity
+
+
+class FreqSignalsStore:
+    """
+    All cached signals, a FreqSignalsSeries per (pair, data_set_id)
+    """
+
+    def __init__(self):
+        self._by_pair: Dict[str, Dict[str, FreqSignalsSeries]] = {}
+        # heap of (min_end_ns, pair, data_set_id); entries whose min_end_ns is no longer the
+        # series' own are stale and skipped
+        self._expiry_index = []
+        self.counters = {"evicted": 0, "eviction_runs": 0}
+        # writers may run on several threads (history warm-up); readers take views and don't lock
+        self.lock = threading.RLock()
+        # set while the store only holds what was attached from an exported directory
+        self._shared_path = None
+
+    def __getstate__(self):
+        if self._shared_path is not None:
+            # pickled into worker processes: they attach to the same files instead of receiving a copy
+            return {"shared_path": self._shared_path}
+        state = dict(self.__dict__)
+        del state["lock"]
+        return state
+
+    def __setstate__(self, state):
+        if "shared_path" in state:
+            self.__dict__.update(FreqSignalsStore.attach(state["shared_path"]).__dict__)
+            return
+        self.__dict__.update(state)
+        self.lock = threading.RLock()
+
+    def export(self, path):
+        """
+        Writes every series to a directory of .npy files (one per column, all series concatenated)
+        and a manifest.json that FreqSignalsStore.attach memory maps them from
+        """
+        columns, manifest = self._columns()
+        os.makedirs(path, exist_ok=True)
+        suffix = f".{os.getpid()}.tmp"
+        for name, column in columns.items():
+            if isinstance(column, list):
+                with open(os.path.join(path, f"{name}.json{suffix}"), "w") as f:
+                    json.dump(column, f, cls=NpEncoder)
+                os.replace(os.path.join(path, f"{name}.json{suffix}"), os.path.join(path, f"{name}.json"))
+            else:
+                with open(os.path.join(path, f"{name}.npy{suffix}"), "wb") as f:
+                    np.save(f, column)
+                os.replace(os.path.join(path, f"{name}.npy{suffix}"), os.path.join(path, f"{name}.npy"))
+        # the manifest goes last, readers only trust a directory that has one
+        with open(os.path.join(path, f"manifest.json{suffix}"), "w") as f:
+            json.dump(manifest, f)
+        os.replace(os.path.join(path, f"manifest.json{suffix}"), os.path.join(path, "manifest.json"))
+
+    def save_snapshot(self, path, state=None):
+        """
+        Writes every series to a single .npz file, the columns of export() plus the manifest
+        and object context columns as JSON, see load_snapshot
+        Args:
+            path: str - the file, replaced atomically
+            state: dict - optional - JSON serializable data to keep with the signals, or a callable
+                returning it, called under the store's lock so it matches the signals saved
+        """
+        with self.lock:
+            columns, manifest = self._columns()
+            manifest["state"] = state() if callable(state) else state
+        arrays = {}
+        for name, column in {**columns, "manifest": manifest}.items():
+            if isinstance(column, np.ndarray):
+                arrays[name] = column
+            else:
+                arrays[f"{name}.json"] = np.frombuffer(json.dumps(column, cls=NpEncoder).encode(), dtype=np.uint8)
+        temp_file = f"{path}.{os.getpid()}.tmp"
+        with open(temp_file, "wb") as f:
+            np.savez(f, **arrays)
+        os.replace(temp_file, path)
+
+    @classmethod
+    def load_snapshot(cls, path):
+        """
+        Reads a file written by save_snapshot
+        Returns:
+            tuple - (FreqSignalsStore, created datetime, state), or None if there's no readable snapshot
+        """
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                arrays = {name: data[name] for name in data.files}
+        except (OSError, ValueError, zipfile.BadZipFile) as e:
+            if os.path.exists(path):
+                logger.warning(f"Ignoring unreadable FreqSignals snapshot {path}: {e}")
+            return None
+        columns = {}
+        for name, column in arrays.items():
+            if name.endswith(".json"):
+                column = json.loads(column.tobytes())
+                name = name[:-len(".json")]
+            columns[name] = column
+        manifest = columns.pop("manifest")
+        store = cls._from_columns(manifest, columns)
+        return store, freqsignals_to_datetime(manifest["created"]), manifest.get("state")
+
+    def _columns(self):
+        """
+        Returns:
+            tuple - (columns, manifest): every series concatenated into one array per column
+                (object context columns as lists) and where each series is in them
+        """
+        with self.lock:
+            entries = list(self)
+            keys = {}
+            for _, _, series in entries:
+                for key in series.context_keys:
+                    values, _ = series.context(key)
+                    keys[key] = "json" if values.dtype == object or keys.get(key) == "json" else "float64"
+            total = sum(len(series) for _, _, series in entries)
+            columns = {
+                "start": np.empty(total, dtype=np.int64),
+                "ttl": np.empty(total, dtype=np.int32),
+                "value": np.empty(total, dtype=np.float64),
+            }
+            for i, (key, kind) in enumerate(keys.items()):
+                columns[f"present_{i}"] = np.zeros(total, dtype=bool)
+                if kind == "float64":
+                    columns[f"context_{i}"] = np.full(total, np.nan)
+                else:
+                    columns[f"context_{i}"] = [None] * total
+            manifest = {"created": freqsignals_isoformat(datetime.now(timezone.utc)), "context_keys": keys, "series": []}
+            offset = 0
+            for pair, data_set_id, series in entries:
+                size = len(series)
+                columns["start"][offset:offset + size] = series.start_ns
+                columns["ttl"][offset:offset + size] = series.ttl_minutes
+                columns["value"][offset:offset + size] = series.values
+                for i, key in enumerate(keys):
+                    if key not in series.context_keys:
+                        continue
+                    values, present = series.context(key)
+                    columns[f"present_{i}"][offset:offset + size] = present
+                    if keys[key] == "float64":
+                        columns[f"context_{i}"][offset:offset + size] = values
+                    else:
+                        columns[f"context_{i}"][offset:offset + size] = [v if p else None for v, p in zip(values, present)]
+                manifest["series"].append({
+                    "pair": pair,
+                    "data_set_id": data_set_id,
+                    "offset": offset,
+                    "size": size,
+                    "context_keys": series.context_keys,
+                    "min_end_ns": series.min_end_ns,
+                })
+                offset += size
+        return columns, manifest
+
+    @classmethod
+    def read_manifest(cls, path):
+        """
+        Returns:
+            dict - the manifest of an exported store, or None if the directory doesn't hold one
+        """
+        try:
+            with open(os.path.join(path, "manifest.json")) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    @classmethod
+    def attach(cls, path):
+        """
+        Opens a store written by export(). Numeric columns are read-only memory maps shared with
+        every other process attached to the same files; object context columns are parsed from JSON.
+        """
+        manifest = cls.read_manifest(path)
+        if manifest is None:
+            raise FreqSignalsError(f"no exported signal store at {path}")
+        columns = {name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r") for name in ("start", "ttl", "value")}
+        for i, kind in enumerate(manifest["context_keys"].values()):
+            columns[f"present_{i}"] = np.load(os.path.join(path, f"present_{i}.npy"), mmap_mode="r")
+            if kind == "float64":
+                columns[f"context_{i}"] = np.load(os.path.join(path, f"context_{i}.npy"), mmap_mode="r")
+            else:
+                with open(os.path.join(path, f"context_{i}.json")) as f:
+                    columns[f"context_{i}"] = json.load(f)
+        store = cls._from_columns(manifest, columns)
+        store._shared_path = path
+        return store
+
+    @classmethod
+    def _from_columns(cls, manifest, columns):
+        """
+        Builds a store around the columns of _columns(), without copying the numeric ones
+        """
+        columns = dict(columns)
+        for i, key in enumerate(manifest["context_keys"]):
+            columns[f"present:{key}"] = columns.pop(f"present_{i}")
+            values = columns.pop(f"context_{i}")
+            if isinstance(values, list):
+                columns[f"context:{key}"] = np.empty(len(values), dtype=object)
+                columns[f"context:{key}"][:] = values
+            else:
+                columns[f"context:{key}"] = values
+        store = cls()
+        for entry in manifest["series"]:
+            window = slice(entry["offset"], entry["offset"] + entry["size"])
+            names = ["start", "ttl", "value"]
+            for key in entry["context_keys"]:
+                names += [f"context:{key}", f"present:{key}"]
+            series = FreqSignalsSeries.from_arrays(
+                {name: columns[name][window] for name in names}, entry["context_keys"], entry["min_end_ns"]
+            )
+            store._by_pair.setdefault(entry["pair"], {})[entry["data_set_id"]] = series
+            if len(series):
+                heapq.heappush(store._expiry_index, (series.min_end_ns, entry["pair"], entry["data_set_id"]))
+        return store
+
+    def series(self, pair, data_set_id, create=False):
+        by_data_set = self._by_pair.get(pair)
+        if by_data_set is None:
+            if not create:
+                return None
+            by_data_set = self._by_pair.setdefault(pair, {})
+        series = by_data_set.get(data_set_id)
+        if series is None and create:
+            series = by_data_set.setdefault(data_set_id, FreqSignalsSeries())
+        return series
+
+    def pair_series(self, pair):
+        """
+        Returns:
+            dict - data_set_id -> FreqSignalsSeries for the pair
+        """
+        return self._by_pair.get(pair, {})
+
+    def __iter__(self):
+        for pair, by_data_set in self._by_pair.items():
+            for data_set_id, series in by_data_set.items():
+                yield pair, data_set_id, series
+
+    def __len__(self):
+        return sum(len(series) for _, _, series in self)
+
+    @property
+    def nbytes(self):
+        return sum(series.nbytes for _, _, series in self)
+
+    def add_signals(self, signals):
+        """
+        Adds signal dicts as returned by the FreqSignals API
+        Returns:
+            int - number of signals that were new
+        """
+        grouped = {}
+        for signal in signals:
+            grouped.setdefault((signal["symbol"], signal["data_set_id"]), []).append(signal)
+        added = 0
+        for (pair, data_set_id), group in grouped.items():
+            added += self.extend(
+                pair,
+                data_set_id,
+                freqsignals_dates_to_ns([signal["updated_date"] for signal in group]),
+                [signal["ttl_minutes"] for signal in group],
+                [signal["value"] for signal in group],
+                [signal.get("context") for signal in group],
+            )
+        return added
+
+    def add_history(self, pair, data_set_id, history):
+        """
+        Adds signal history items ({"t", "l", "v", "c"}) without building a dict per signal
+        Returns:
+            int - number of signals that were new
+        """
+        return self.extend(
+            pair,
+            data_set_id,
+            freqsignals_dates_to_ns([item["t"] for item in history]),
+            [item["l"] for item in history],
+            [item["v"] for item in history],
+            [item.get("c") for item in history],
+        )
+
+    def evict_ended(self, cutoff_ns):
+        """
+        Drops every signal that ended at or before cutoff_ns. Only series whose earliest end
+        is due are visited.
+        Returns:
+            int - number of signals dropped
+        """
+        with self.lock:
+            self._shared_path = None
+            return self._evict_ended(cutoff_ns)
+
+    def _evict_ended(self, cutoff_ns):
+        evicted = 0
+        while self._expiry_index and self._expiry_index[0][0] <= cutoff_ns:
+            min_end_ns, pair, data_set_id = heapq.heappop(self._expiry_index)
+            series = self.series(pair, data_set_id)
+            if series is None or series.min_end_ns != min_end_ns:
+                continue
+            evicted += series.evict_ended(cutoff_ns)
+            if len(series):
+                heapq.heappush(self._expiry_index, (series.min_end_ns, pair, data_set_id))
+        self.counters["evicted"] += evicted
+        self.counters["eviction_runs"] += 1
+        return evicted
+
+    def stats(self):
+        """
+        Returns:
+            dict - signals and series held, bytes used and eviction counters
+        """
+        return {
+            "signals": len(self),
+            "series": sum(1 for _ in self),
+            "nbytes": self.nbytes,
+            **self.counters,
+        }
+
+    def extend(self, pair, data_set_id, *args, **kwargs):
+        """
+        FreqSignalsSeries.extend for the (pair, data_set_id) series, creating it if needed
+        """
+        with self.lock:
+            self._shared_path = None
+            series = self.series(pair, data_set_id, create=True)
+            min_end_ns = series.min_end_ns
+            added = series.extend(*args, **kwargs)
+            if series.min_end_ns < min_end_ns:
+                heapq.heappush(self._expiry_index, (series.min_end_ns, pair, data_set_id))
+            return added
+
+
+class FreqSignalsHistoryCache:
+    """
+    Signal history on disk: a Feather file per (symbol, data_set_id) with the series' columns,
+    and a JSON file next to it holding the time range the file covers ("since" is null when it
+    reaches back to the start of the history). Object context columns are stored JSON encoded.
+    Needs pyarrow, which freqtrade installs for its own feather data format.
+    """
+
+    def __init__(self, directory):
+        self._directory = directory
+
+    def _path(self, symbol, data_set_id):
+        return os.path.join(self._directory, re.sub(r"[^\w.-]", "_", str(data_set_id)), re.sub(r"[^\w.-]", "_", symbol))
+
+    def covered(self, symbol, data_set_id):
+        """
+        Returns:
+            dict - {"since": str | None, "until": str} or None if nothing is cached
+        """
+        path = self._path(symbol, data_set_id)
+        if not os.path.exists(f"{path}.json") or not os.path.exists(f"{path}.feather"):
+            return None
+        with open(f"{path}.json") as f:
+            return json.load(f)
+
+    def load(self, symbol, data_set_id, store):
+        """
+        Adds the cached signals to the FreqSignalsStore
+        Returns:
+            dict - the covered range, see covered(), or None if nothing is cached
+        """
+        covered = self.covered(symbol, data_set_id)
+        if covered is None:
+            return None
+        frame = read_feather(f"{self._path(symbol, data_set_id)}.feather")
+        context_columns = {}
+        for column in frame.columns:
+            kind, _, key = column.partition(":")
+            if kind == "context":
+                context_columns[key] = (frame[column].to_numpy(), frame[f"present:{key}"].to_numpy())
+            elif kind == "json":
+                values = np.empty(len(frame), dtype=object)
+                values[:] = [None if v is None else json.loads(v) for v in frame[column]]
+                context_columns[key] = (values, frame[f"present:{key}"].to_numpy())
+        store.extend(
+            symbol,
+            data_set_id,
+            frame["start_ns"].to_numpy(),
+            frame["ttl_minutes"].to_numpy(),
+            frame["value"].to_numpy(),
+            context_columns=context_columns,
+        )
+        return covered
+
+    def save(self, symbol, data_set_id, series, since, until):
+        """
+        Writes the series, recording that it holds every signal from since (None: the beginning) to until
+        """
+        columns = {"start_ns": series.start_ns, "ttl_minutes": series.ttl_minutes, "value": series.values}
+        for key in series.context_keys:
+            values, present = series.context(key)
+            if values.dtype == object:
+                columns[f"json:{key}"] = [json.dumps(v, cls=NpEncoder) if p else None for v, p in zip(values, present)]
+            else:
+                columns[f"context:{key}"] = values
+            columns[f"present:{key}"] = present
+        path = self._path(symbol, data_set_id)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # write to temp files and move them in place so other processes never read half a file
+        DataFrame(columns).to_feather(f"{path}.feather.{os.getpid()}.tmp")
+        os.replace(f"{path}.feather.{os.getpid()}.tmp", f"{path}.feather")
+        with open(f"{path}.json.{os.getpid()}.tmp", "w") as f:
+            json.dump({
+                "since": None if since is None else freqsignals_isoformat(since),
+                "until": freqsignals_isoformat(until),
+            }, f)
+        os.replace(f"{path}.json.{os.getpid()}.tmp", f"{path}.json")
+
+
+class FreqSignalsSharedCache:
+    """
+    Signals shared by every bot on a host through a SQLite database in WAL mode, so readers
+    never block the writer. One process at a time leads: it holds a lease in the database,
+    renewed on every poll, polls the API for the data sets of all the processes and writes what
+    it gets to the database; the others read new signals from there. When the leader stops
+    renewing for lease seconds (it died or hangs) the next process to poll takes over, carrying
+    on from the stored high water mark. Signal history is downloaded by the first process that
+    asks for a pair / data set and read from the database by the rest. The leader deletes the
+    signals that ended before the retention cutoff it's given, so the database doesn't keep growing.
+    """
+
+    _SCHEMA = (
+        """CREATE TABLE IF NOT EXISTS signals (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            symbol TEXT NOT NULL,
+            data_set_id TEXT NOT NULL,
+            start_ns INTEGER NOT NULL,
+            end_ns INTEGER NOT NULL,
+            ttl_minutes INTEGER NOT NULL,
+            value REAL,
+            context TEXT,
+            UNIQUE (symbol, data_set_id, start_ns)
+        )""",
+        "CREATE INDEX IF NOT EXISTS signals_end_ns ON signals (end_ns)",
+        "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)",
+        "CREATE TABLE IF NOT EXISTS subscriptions (owner TEXT PRIMARY KEY, data_set_ids TEXT, seen_at REAL)",
+        """CREATE TABLE IF NOT EXISTS histories (
+            symbol TEXT NOT NULL,
+            data_set_id TEXT NOT NULL,
+            owner TEXT,
+            claimed_until REAL,
+            loaded_at REAL,
+            PRIMARY KEY (symbol, data_set_id)
+        )""",
+    )
+
+    def __init__(self, path, lease=DEFAULT_SHARED_CACHE_LEASE):
+        """
+        Args:
+            path: str - the database file, created if missing
+            lease: float - seconds without a poll before another process takes over leading
+        """
+        self.path = path
+        self.lease = lease
+        self.owner = f"{socket.gethostname()}-{os.getpid()}-{random.getrandbits(32):08x}"
+        self.is_leader = False
+        # set from the leader's last poll, when the API couldn't be reached
+        self.stale_since = None
+        self._local = threading.local()
+        self._last_seq = None
+        self.counters = {
+            "elections": 0, "polls": 0, "reads": 0, "signals_read": 0, "histories_downloaded": 0, "histories_read": 0, "pruned": 0,
+        }
+        with self._transaction() as db:
+            for statement in self._SCHEMA:
+                db.execute(statement)
+        atexit.register(self.close)
+
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        del state["_local"]
+        return state
+
+    def __setstate__(self, state):
+        # a copy in another process connects on its own and has to win the lease itself
+        self.__dict__.update(state)
+        self.owner = f"{socket.gethostname()}-{os.getpid()}-{random.getrandbits(32):08x}"
+        self.is_leader = False
+        self._local = threading.local()
+        atexit.register(self.close)
+
+    @property
+    def _db(self):
+        # sqlite3 connections can't be shared between threads (the poller, the warm-up)
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = sqlite3.connect(self.path, timeout=60, isolation_level=None)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            self._local.db = db
+        return db
+
+    @contextmanager
+    def _transaction(self, immediate=True):
+        """
+        immediate takes the write lock up front, so a read followed by a write can't be raced
+        """
+        db = self._db
+        db.execute("BEGIN IMMEDIATE" if immediate else "BEGIN")
+        try:
+            yield db
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+        db.execute("COMMIT")
+
+    def _meta(self, db, *keys):
+        rows = db.execute(f"SELECT key, value FROM meta WHERE key IN ({','.join('?' * len(keys))})", keys).fetchall()
+        return dict(rows)
+
+    def _set_meta(self, db, **values):
+        db.executemany("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", list(values.items()))
+
+    def lead(self):
+        """
+        Takes or renews the leader lease
+        Returns:
+            bool - whether this process should poll the API
+        """
+        now = time.time()
+        with self._transaction() as db:
+            meta = self._meta(db, "leader", "leader_until")
+            leader = meta.get("leader")
+            if leader not in (None, self.owner) and float(meta.get("leader_until") or 0) > now:
+                self.is_leader = False
+                return False
+            self._set_meta(db, leader=self.owner, leader_until=str(now + self.lease))
+        if leader != self.owner:
+            self.counters["elections"] += 1
+            logger.info(f"Leading the FreqSignals shared cache {self.path}, taking over from {leader}")
+        self.is_leader = True
+        return True
+
+    def poll_state(self):
+        """
+        What the leader polls for: the data sets every process has asked for in the last 10 leases
+        (None for all of them) and where the previous poll got to
+        Returns:
+            tuple - (data_set_ids or None, high water mark or None)
+        """
+        with self._transaction() as db:
+            rows = db.execute(
+                "SELECT data_set_ids FROM subscriptions WHERE seen_at > ?", (time.time() - 10 * self.lease,)
+            ).fetchall()
+            subscribed = [json.loads(row[0]) for row in rows]
+            data_set_ids = None if not subscribed or None in subscribed else sorted({i for ids in subscribed for i in ids})
+            meta = self._meta(db, "poll_filter", "high_water_mark")
+            poll_filter = json.dumps(data_set_ids)
+            if meta.get("poll_filter") != poll_filter:
+                # a data set nobody polled before, start over to fetch its current signals
+                self._set_meta(db, poll_filter=poll_filter, high_water_mark="")
+                return data_set_ids, None
+        return data_set_ids, meta.get("high_water_mark") or None
+
+    def store_poll(self, signals, high_water_mark, stale_since, ended_before=None):
+        """
+        Saves what the leader polled
+        Args:
+            signals: list - signal dicts from the API
+            high_water_mark: str - the leader's updated_date high water mark after the poll
+            stale_since: datetime - optional - when the API became unreachable
+            ended_before: int - optional - ns timestamp, signals that ended before it are deleted
+        """
+        with self._transaction() as db:
+            if ended_before is not None:
+                self.counters["pruned"] += db.execute("DELETE FROM signals WHERE end_ns < ?", (int(ended_before),)).rowcount
+            if signals:
+                self._insert(
+                    db,
+                    [signal["symbol"] for signal in signals],
+                    [signal["data_set_id"] for signal in signals],
+                    freqsignals_dates_to_ns([signal["updated_date"] for signal in signals]),
+                    [signal["ttl_minutes"] for signal in signals],
+                    [signal["value"] for signal in signals],
+                    [signal.get("context") for signal in signals],
+                )
+            self._set_meta(
+                db,
+                high_water_mark=high_water_mark or "",
+                stale_since=stale_since.isoformat() if stale_since else "",
+            )
+        self.counters["polls"] += 1
+
+    def read(self, data_set_ids=None):
+        """
+        Returns the signals stored since the previous read, or the current (unexpired) ones on
+        the first read, and registers the data sets this process wants polled
+        Args:
+            data_set_ids: list - optional - only these data sets
+
+        Returns:
+            list - signal dicts, as the API returns them
+        """
+        now = time.time()
+        with self._transaction() as db:
+            db.execute(
+                "INSERT OR REPLACE INTO subscriptions (owner, data_set_ids, seen_at) VALUES (?, ?, ?)",
+                (self.owner, json.dumps(sorted(data_set_ids) if data_set_ids else None), now),
+            )
+            columns = "seq, symbol, data_set_id, start_ns, ttl_minutes, value, context"
+            if self._last_seq is None:
+                rows = db.execute(f"SELECT {columns} FROM signals WHERE end_ns > ? ORDER BY seq", (int(now * 1e9),)).fetchall()
+                self._last_seq = db.execute("SELECT COALESCE(MAX(seq), 0) FROM signals").fetchone()[0]
+            else:
+                rows = db.execute(f"SELECT {columns} FROM signals WHERE seq > ? ORDER BY seq", (self._last_seq,)).fetchall()
+            stale_since = self._meta(db, "stale_since").get("stale_since")
+        self.stale_since = datetime.fromisoformat(stale_since) if stale_since else None
+        if rows:
+            self._last_seq = max(self._last_seq, rows[-1][0])
+        if data_set_ids:
+            wanted = set(data_set_ids)
+            rows = [row for row in rows if row[2] in wanted]
+        self.counters["reads"] += 1
+        self.counters["signals_read"] += len(rows)
+        if not rows:
+            return []
+        dates = np.datetime_as_string(np.array([row[3] for row in rows], dtype="datetime64[ns]"), unit="us")
+        return [
+            {
+                "symbol": symbol,
+                "data_set_id": data_set_id,
+                "updated_date": f"{date}Z",
+                "ttl_minutes": ttl_minutes,
+                "value": value,
+                "context": json.loads(context) if context else None,
+            }
+            for (_, symbol, data_set_id, _, ttl_minutes, value, context), date in zip(rows, dates)
+        ]
+
+    def load_history(self, symbol, data_set_id, store, download):
+        """
+        Adds the history of a pair / data set to the store. The first process to ask downloads
+        it into the database, processes asking meanwhile wait for it, later ones just read it.
+        If the downloading process dies its claim lapses after a lease and another one takes over.
+        Args:
+            symbol: str - the pair
+            data_set_id: str - the data set
+            store: FreqSignalsStore - to add the signals to
+            download: callable - returns an iterable of signal history pages ({"t", "l", "v", "c"} items)
+
+        Returns:
+            int - number of signals that were new to the store
+        """
+        while True:
+            now = time.time()
+            with self._transaction() as db:
+                row = db.execute(
+                    "SELECT owner, claimed_until, loaded_at FROM histories WHERE symbol = ? AND data_set_id = ?",
+                    (symbol, data_set_id),
+                ).fetchone()
+                loaded = row is not None and row[2] is not None
+                claimed = not loaded and (row is None or row[0] == self.owner or row[1] < now)
+                if claimed:
+                    db.execute(
+                        "INSERT OR REPLACE INTO histories (symbol, data_set_id, owner, claimed_until) VALUES (?, ?, ?, ?)",
+                        (symbol, data_set_id, self.owner, now + self.lease),
+                    )
+            if loaded:
+                self.counters["histories_read"] += 1
+                break
+            if claimed:
+                self._download_history(symbol, data_set_id, download)
+                self.counters["histories_downloaded"] += 1
+                break
+            time.sleep(min(1, self.lease / 10))
+        rows = self._db.execute(
+            "SELECT start_ns, ttl_minutes, value, context FROM signals WHERE symbol = ? AND data_set_id = ? ORDER BY start_ns",
+            (symbol, data_set_id),
+        ).fetchall()
+        if not rows:
+            return 0
+        start_ns, ttl_minutes, values, contexts = zip(*rows)
+        return store.extend(
+            symbol,
+            data_set_id,
+            np.array(start_ns, dtype=np.int64),
+            list(ttl_minutes),
+            list(values),
+            [json.loads(context) if context else None for context in contexts],
+        )
+
+    def close(self):
+        """
+        Gives up the leader lease so another process takes over without waiting for it to lapse
+        """
+        atexit.unregister(self.close)
+        if not self.is_leader:
+            return
+        try:
+            with self._transaction() as db:
+                if self._meta(db, "leader").get("leader") == self.owner:
+                    self._set_meta(db, leader_until="0")
+        except sqlite3.Error as e:
+            logger.warning(f"Couldn't release the FreqSignals shared cache lease: {e}")
+        self.is_leader = False
+
+    def _download_history(self, symbol, data_set_id, download):
+        try:
+            for page in download():
+                if not page:
+                    continue
+                with self._transaction() as db:
+                    self._insert(
+                        db,
+                        [symbol] * len(page),
+                        [data_set_id] * len(page),
+                        freqsignals_dates_to_ns([item["t"] for item in page]),
+                        [item["l"] for item in page],
+                        [item["v"] for item in page],
+                        [item.get("c") for item in page],
+                    )
+                    db.execute(
+                        "UPDATE histories SET claimed_until = ? WHERE symbol = ? AND data_set_id = ?",
+                        (time.time() + self.lease, symbol, data_set_id),
+                    )
+        except BaseException:
+            # let the next process that asks try instead of waiting out the claim
+            with self._transaction() as db:
+                db.execute("DELETE FROM histories WHERE symbol = ? AND data_set_id = ?", (symbol, data_set_id))
+            raise
+        with self._transaction() as db:
+            db.execute(
+                "UPDATE histories SET loaded_at = ? WHERE symbol = ? AND data_set_id = ?",
+                (time.time(), symbol, data_set_id),
+            )
+
+    @staticmethod
+    def _insert(db, symbols, data_set_ids, start_ns, ttl_minutes, values, contexts):
+        # the first copy of a (symbol, data_set_id, start) wins, like in FreqSignalsSeries
+        db.executemany(
+            "INSERT OR IGNORE INTO signals (symbol, data_set_id, start_ns, end_ns, ttl_minutes, value, context) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [
+                (
+                    symbol,
+                    data_set_id,
+                    start,
+                    start + int(ttl) * NS_PER_MINUTE,
+                    int(ttl),
+                    None if value is None else float(value),
+                    freqsignals_dumps(context).decode() if context is not None else None,
+                )
+                for symbol, data_set_id, start, ttl, value, context in zip(
+                    symbols, data_set_ids, start_ns.tolist(), ttl_minutes, values, contexts
+                )
+            ],
+        )
+
+
+def freqsignals_to_float_array(values):
+    """
+    Signal values as float64, None and anything non numeric as NaN
+    """
+    try:
+        return np.array(values, dtype=np.float64)
+    except (TypeError, ValueError):
+        return to_numeric(Series(values, dtype=object), errors="coerce").to_numpy(dtype=np.float64)
+
+
+def freqsignals_context_array(values):
+    """
+    A context column: float64 if every value is a number (bools excluded), otherwise object
+    """
+    if all(isinstance(v, (int, float, np.integer, np.floating)) and not isinstance(v, (bool, np.bool_)) for v in values):
+        return np.array(values, dtype=np.float64)
+    column = np.empty(len(values), dtype=object)
+    column[:] = values
+    return column
+
+
+class FreqSignalsFeatureCache:
+    """
+    Feature columns for FreqAI's populate_any_indicators, kept per key (e.g. (pair, timeframe)).
+    When the informative frame is the previous one plus appended candles, the features are only
+    computed for the new candles, over a tail of warmup earlier candles so rolling and smoothed
+    indicators have settled. The "%" features and their shifted copies are built in a single
+    preallocated array, optionally float32.
+    """
+
+    def __init__(self, float32=False):
+        """
+        Args:
+            float32: bool - store features as float32 instead of float64
+        """
+        self.dtype = np.float32 if float32 else np.float64
+        self._by_key = {}
+        self.counters = {"full": 0, "incremental": 0, "rows_computed": 0}
+
+    def populate(self, key, informative, compute, shifted_candles=0, warmup=100):
+        """
+        Args:
+            key: hashable - what the frame belongs to, e.g. (pair, timeframe)
+            informative: DataFrame - candles with a date column
+            compute: callable - takes a frame of candles, returns a dict of column name -> values
+                aligned with it; names starting with "%" are features and get shifted copies
+            shifted_candles: int - number of shifted copies of each feature, named "_shift-n"
+            warmup: int - candles before the first new one that compute is given
+
+        Returns:
+            DataFrame - informative with the computed and shifted columns added
+        """
+        dates = freqsignals_candles_to_ns(informative["date"])
+        state = self._by_key.get(key)
+        reuse = 0
+        if state is not None and len(dates) and len(state["dates"]):
+            first = int(np.searchsorted(state["dates"], dates[0]))
+            overlap = min(len(state["dates"]) - first, len(dates))
+            if overlap > 0 and np.array_equal(state["dates"][first:first + overlap], dates[:overlap]):
+                reuse = overlap
+        if reuse:
+            tail_from = max(0, reuse - warmup)
+            computed = compute(informative.iloc[tail_from:])
+            names = list(computed)
+            if names != state["names"]:
+                reuse = 0
+        if not reuse:
+            computed = compute(informative)
+            names = list(computed)
+            tail_from = 0
+        block = np.empty((len(dates), len(names)), dtype=self.dtype)
+        if reuse:
+            block[:reuse] = state["block"][first:first + reuse]
+            self.counters["incremental"] += 1
+        else:
+            self.counters["full"] += 1
+        for i, name in enumerate(names):
+            values = np.asarray(computed[name], dtype=self.dtype)
+            block[reuse:, i] = values[reuse - tail_from:]
+        self.counters["rows_computed"] += len(dates) - reuse
+        self._by_key[key] = {"dates": dates, "names": names, "block": block}
+
+        features = [i for i, name in enumerate(names) if name.startswith("%")]
+        count = len(features)
+        out = np.empty((len(dates), len(names) + count * shifted_candles), dtype=self.dtype)
+        out[:, :len(names)] = block
+        columns = list(names)
+        for n in range(1, shifted_candles + 1):
+            at = len(names) + (n - 1) * count
+            out[:n, at:at + count] = np.nan
+            if n < len(dates):
+                out[n:, at:at + count] = block[:len(dates) - n, features]
+            columns += [f"{names[i]}_shift-{n}" for i in features]
+
+        existing = [column for column in columns if column in informative.columns]
+        if existing:
+            informative = informative.drop(columns=existing)
+        return concat((informative, DataFrame(out, index=informative.index, columns=columns)), axis=1)
+
+    def clear(self, key=None):
+        if key is None:
+            self._by_key.clear()
+        else:
+            self._by_key.pop(key, None)
+
+
+class FreqSignalsMixin:
+    freqsignals_data_set_ids = None
     freqsignals_data_set_names = {}
+    # Join signals onto candles with sorted interval lookups instead of a mask per signal
+    freqsignals_vectorized_join = True
+    # Queue post_signal for a background publisher instead of blocking populate_indicators
+    freqsignals_async_publish = False
+    # FreqSignalsPublisher options used with freqsignals_async_publish
+    freqsignals_publisher_options = {}
+    # Skip post_signal when the signal repeats the previous one for the pair, see
+    # FreqSignalsDeduplicator for the options (heartbeat_minutes defaults to two candles)
+    freqsignals_deduplicate = False
+    freqsignals_deduplicate_options = {}
+    # History pages requested concurrently while earlier pages are being stored
+    freqsignals_history_prefetch = 2
+    # Only load history from this long ago (timedelta), in chunks of freqsignals_history_window
+    freqsignals_history_lookback = None
+    freqsignals_history_window = timedelta(days=30)
+    # In live / dry_run, drop cached signals that ended before the oldest candle joined by
+    # freqsignals_add_pair_signals. Symbols not joined for freqsignals_retention_idle_candles
+    # candles (e.g. removed from the whitelist) no longer hold eviction back.
+    freqsignals_evict_expired = True
+    freqsignals_retention_idle_candles = 10
+    # Directory for the on-disk history cache (None disables it) and whether to only read from it
+    freqsignals_history_cache_dir = DEFAULT_HISTORY_CACHE_DIR
+    freqsignals_history_offline = DEFAULT_HISTORY_OFFLINE
+    # Load history for the whole whitelist x data sets concurrently at bot start, for strategies
+    # that join each pair's own history (FreqSignalsFollower)
+    freqsignals_warm_up_history = False
+    freqsignals_warm_up_workers = 8
+    # seconds to wait for the warm-up, pairs still loading after that finish in the background
+    freqsignals_warm_up_timeout = 300
+    # Outside live / dry_run, attach to the store exported here if it's recent enough, otherwise
+    # export the store after the warm-up so other processes (hyperopt workers) can attach to it
+    freqsignals_shared_store_path = DEFAULT_SHARED_STORE_PATH
+    freqsignals_shared_store_max_age = timedelta(hours=12)
+    # SQLite database shared by the bots on this host (None disables it): one of them polls the
+    # API for all and each history is downloaded once, see FreqSignalsSharedCache
+    freqsignals_shared_cache_path = DEFAULT_SHARED_CACHE_PATH
+    freqsignals_shared_cache_lease = DEFAULT_SHARED_CACHE_LEASE
+    # In live / dry_run, save the store, the history loaded flags and the poll high water mark to
+    # this file every freqsignals_snapshot_interval seconds and at exit, and restore them at
+    # start if the snapshot is younger than freqsignals_snapshot_max_age; the first poll then
+    # fetches what changed since instead of every pair's history being downloaded again
+    freqsignals_snapshot_path = DEFAULT_SNAPSHOT_PATH
+    freqsignals_snapshot_interval = DEFAULT_SNAPSHOT_INTERVAL
+    freqsignals_snapshot_max_age = timedelta(days=1)
+    # In live / dry_run, poll the latest signals every freqsignals_poll_interval seconds on a
+    # background thread; the bot loop waits at most freqsignals_bot_loop_budget seconds for
+    # a poll in progress, then applies whatever polls have completed
+    freqsignals_background_poll = False
+    freqsignals_poll_interval = DEFAULT_POLL_INTERVAL
+    freqsignals_bot_loop_budget = 0
+    # In live / dry_run, receive new signals over a server-sent events stream as they're
+    # published instead of polling every bot loop (FreqSignalsStream); the bot loop applies
+    # what arrived. Falls back to polling if the API has no stream.
+    freqsignals_stream = DEFAULT_STREAM
+    # In live / dry_run, remember the columns each freqsignals_add_pair_signals call computed and
+    # only join the candles that are new or that newly stored signals reach on the next call
+    freqsignals_incremental_join = True
+    # In backtesting, providers upload the signal of every candle instead of trading (see
+    # freqsignals_backfill_frame), recording uploaded chunks in freqsignals_backfill_state
+    freqsignals_backfill = DEFAULT_BACKFILL
+    freqsignals_backfill_state = DEFAULT_BACKFILL_STATE
+    freqsignals_backfill_options = {}
+    # Record timings and counters (HTTP requests, bot loop, history loads, joins per pair), see
+    # FreqSignalsClient.start_metrics for the options; freqsignals_metrics_snapshot() reads them
+    freqsignals_collect_metrics = DEFAULT_METRICS
+    freqsignals_metrics_options = {}
+    # In live / dry_run, measure how old signals are when polled and when joined onto a candle
+    # (freqsignals_latency_stats) and call freqsignals_latency_alert when that exceeds this
+    # fraction of the signal's ttl
+    freqsignals_track_latency = DEFAULT_LATENCY_TRACKING
+    freqsignals_latency_alert_ttl_fraction = DEFAULT_LATENCY_ALERT_TTL_FRACTION
+
+    def __getstate__(self):
+        # the strategy is pickled into hyperopt workers; a copy starts its own poller / stream
+        # if it needs one, like a bot loop after freqsignals_init
+        state = dict(self.__dict__)
+        state["freqsignals_poller"] = None
+        state["freqsignals_signal_stream"] = None
+        return state
 
     def freqsignals_init(self):
         """
         Called in __init__ to set up the required strategy instance variables
         """
+        # e.g. [os.environ.get(...)] with the variable unset
+        self.freqsignals_data_set_ids = [i for i in self.freqsignals_data_set_ids or [] if i] or None
         self.freqsignals_client = FreqSignalsClient()
-        self.freqsignals_by_pair_data_set_updated_date: Dict[str, Dict[str, Dict[str, Dict]]] = {}
-        self.freqsignals_loaded_historic_by_pair_data_set: Dict[Tuple[str, str], bool] = {}
+        if self.freqsignals_async_publish:
+            self.freqsignals_client.start_publisher(**self.freqsignals_publisher_options)
+        if self.freqsignals_deduplicate:
+            # resend an unchanged signal on the last candle or two before it would lapse
+            heartbeat_minutes = 2 * timeframe_to_minutes(getattr(self, "timeframe", None) or "1m")
+            self.freqsignals_client.start_deduplication(
+                **{"heartbeat_minutes": heartbeat_minutes, **self.freqsignals_deduplicate_options}
+            )
+        self.freqsignals_metrics = None
+        if self.freqsignals_collect_metrics:
+            self.freqsignals_metrics = self.freqsignals_client.start_metrics(**self.freqsignals_metrics_options)
+        self.freqsignals_store = FreqSignalsStore()
+        if self.freqsignals_shared_store_path and not self.freqsignals_is_live():
+            manifest = FreqSignalsStore.read_manifest(self.freqsignals_shared_store_path)
+            if manifest and freqsignals_to_datetime(manifest["created"]) > (
+                freqsignals_to_datetime(datetime.now(timezone.utc)) - self.freqsignals_shared_store_max_age
+            ):
+                self.freqsignals_store = FreqSignalsStore.attach(self.freqsignals_shared_store_path)
+        self.freqsignals_loaded_historic_by_pair_data_set: Dict[Tuple[str, str], bool] = {
+            (pair, data_set_id): True for pair, data_set_id, _ in self.freqsignals_store
+        }
+        self.freqsignals_shared_cache = None
+        if self.freqsignals_shared_cache_path:
+            self.freqsignals_shared_cache = FreqSignalsSharedCache(
+                self.freqsignals_shared_cache_path, self.freqsignals_shared_cache_lease
+            )
+        self.freqsignals_history_cache = None
+        if self.freqsignals_history_cache_dir:
+            self.freqsignals_history_cache = FreqSignalsHistoryCache(self.freqsignals_history_cache_dir)
+        # latest updated_date seen by the bot loop poll, only newer signals are requested
+        self.freqsignals_poll_high_water_mark = None
+        # latest updated_date of the polled signals in the store, behind the poll's while a
+        # background poller / stream holds signals the bot loop hasn't stored yet
+        self.freqsignals_stored_high_water_mark = None
+        # (pair, data_set_id) -> updated_date the history restored from a snapshot is missing signals since
+        self.freqsignals_history_resume_since = {}
+        # set while the bot loop can't reach FreqSignals and runs on the signals it already has
+        self.freqsignals_stale = False
+        self.freqsignals_stale_since = None
+        # started by the first live bot loop with freqsignals_background_poll / freqsignals_stream
+        self.freqsignals_poller = None
+        self.freqsignals_signal_stream = None
+        # freqsignals_add_pair_signals arguments -> what was joined last time, see freqsignals_incremental_join
+        self.freqsignals_applied_by_pair = {}
+        # symbol -> (first, last) candle ns of the dataframes it was last joined onto, see freqsignals_retention_cutoff
+        self.freqsignals_analyzed_candles = {}
+        self.freqsignals_incremental_stats = {"full": 0, "incremental": 0, "candles_joined": 0}
+        self.freqsignals_latency = None
+        if self.freqsignals_track_latency:
+            self.freqsignals_latency = FreqSignalsLatencyTracker(
+                alert=self.freqsignals_latency_alert, alert_ttl_fraction=self.freqsignals_latency_alert_ttl_fraction
+            )
+        # set after restoring a snapshot until a poll has fetched what changed since it was saved
+        self.freqsignals_poll_catching_up = False
+        self.freqsignals_snapshot_saved_at = time.monotonic()
+        if self.freqsignals_snapshot_path and self.freqsignals_is_live():
+            self.freqsignals_restore_snapshot()
+            atexit.register(self.freqsignals_save_snapshot)
 
     def freqsignals_bot_loop_start(self):
         """
         Called in bot_loop_start to pull the most recent signals and save in the strategy
         """
-        if getattr(getattr(self, "config", {}).get('runmode'), "value", "none") in ('live', 'dry_run'):
-            signal_filters = {}
-            if self.freqsignals_data_set_ids:
-                signal_filters["data_set_id__in"] = ','.join(self.freqsignals_data_set_ids)
-            response = self.freqsignals_client.get_signals()
-            signals = response["results"] 
-            for signal in signals:
-                if signal["symbol"] not in self.freqsignals_by_pair_data_set_updated_date:
-                    self.freqsignals_by_pair_data_set_updated_date[signal["symbol"]] = {}
-                if signal["data_set_id"] not in self.freqsignals_by_pair_data_set_updated_date[signal["symbol"]]:
-                    self.freqsignals_by_pair_data_set_updated_date[signal["symbol"]][signal["data_set_id"]] = {}
-                if signal["updated_date"] not in self.freqsignals_by_pair_data_set_updated_date[signal["symbol"]][signal["data_set_id"]]:
-                    self.freqsignals_by_pair_data_set_updated_date[signal["symbol"]][signal["data_set_id"]][signal["updated_date"]] = signal
-
-    def freqsignals_load_signal_history(self, symbol, data_set_id):
-        if symbol not in self.freqsignals_by_pair_data_set_updated_date:
-                self.freqsignals_by_pair_data_set_updated_date[symbol] = {}
-        if data_set_id not in self.freqsignals_by_pair_data_set_updated_date[symbol]:
-            self.freqsignals_by_pair_data_set_updated_date[symbol][data_set_id] = {}
+        metrics = self.freqsignals_metrics
+        if metrics is not None:
+            started = time.perf_counter()
+        if self.freqsignals_is_live():
+            if self.freqsignals_stream:
+                signals = self.freqsignals_stream_signals()
+            elif self.freqsignals_background_poll:
+                if self.freqsignals_poller is None:
+                    self.freqsignals_poller = FreqSignalsPoller(self.freqsignals_poll_signals, self.freqsignals_poll_interval)
+                signals = self.freqsignals_poller.take(self.freqsignals_bot_loop_budget)
+            else:
+                signals = self.freqsignals_poll_signals()
+            if signals:
+                self.freqsignals_store_signals(signals)
+            if self.freqsignals_evict_expired:
+                self.freqsignals_evict_expired_signals()
+            if (
+                self.freqsignals_snapshot_path
+                and time.monotonic() - self.freqsignals_snapshot_saved_at >= self.freqsignals_snapshot_interval
+            ):
+                self.freqsignals_save_snapshot()
+        if metrics is not None:
+            metrics.observe("bot_loop_seconds", time.perf_counter() - started)
+            metrics.gauge("stale", int(self.freqsignals_stale))
+            metrics.gauge("stored_signals", len(self.freqsignals_store))
+            for data_set_id, stages in self.freqsignals_latency_stats().items():
+                for stage in FreqSignalsLatencyTracker.STAGES:
+                    if stage not in stages:
+                        continue
+                    for quantile in ("p50", "p95", "p99"):
+                        metrics.gauge(
+                            "signal_latency_seconds", stages[stage][quantile],
+                            data_set_id=data_set_id, stage=stage, quantile=f"0.{quantile[1:]}",
+                        )
+                metrics.gauge("signals_missed", stages["missed"], data_set_id=data_set_id)
+
+    def freqsignals_stream_signals(self):
+        """
+        Returns the signals streamed since the previous call. The first call polls for the
+        current signals and starts the stream from the newest of them. freqsignals_stale is set
+        while the stream is disconnected.
+        Returns:
+            list - signals
+        """
+        stream = self.freqsignals_signal_stream
+        if stream is None:
+            signals = self.freqsignals_poll_signals()
+            if not self.freqsignals_stale:
+                high_water_mark = self.freqsignals_poll_high_water_mark
+                self.freqsignals_signal_stream = FreqSignalsStream(
+                    self.freqsignals_client,
+                    self.freqsignals_data_set_ids,
+                    since=high_water_mark,
+                    seen=[
+                        (signal["symbol"], signal["data_set_id"])
+                        for signal in signals
+                        if signal["updated_date"] == high_water_mark
+                    ],
+                )
+            return signals
+        if stream.unsupported:
+            return self.freqsignals_poll_signals()
+        if stream.connected == self.freqsignals_stale:
+            if stream.connected:
+                logger.info(f"FreqSignals signal stream reconnected, it was down since {self.freqsignals_stale_since}")
+            else:
+                logger.warning("FreqSignals signal stream disconnected, using cached signals until it reconnects")
+            self.freqsignals_stale = not stream.connected
+            self.freqsignals_stale_since = stream.disconnected_since
+        self.freqsignals_poll_high_water_mark = stream.last_updated_date
+        signals = stream.take()
+        if self.freqsignals_latency is not None:
+            self.freqsignals_latency.received(signals)
+        return signals
+
+    def freqsignals_poll_signals(self):
+        """
+        Requests the signals updated since the previous poll. While FreqSignals can't be reached
+        freqsignals_stale is set and no signals are returned. With a shared cache only its leader
+        requests them, the other processes read them from the cache.
+        Returns:
+            list - signals
+        """
+        shared = self.freqsignals_shared_cache
+        if shared is None:
+            return self._freqsignals_poll_api(self.freqsignals_data_set_ids)
+        if shared.lead():
+            data_set_ids, self.freqsignals_poll_high_water_mark = shared.poll_state()
+            signals = self._freqsignals_poll_api(data_set_ids)
+            shared.store_poll(
+                signals,
+                self.freqsignals_poll_high_water_mark,
+                self.freqsignals_stale_since,
+                self.freqsignals_retention_cutoff() if self.freqsignals_evict_expired else None,
+            )
+        first_read = not shared.counters["reads"]
+        signals = shared.read(self.freqsignals_data_set_ids)
+        if shared.stale_since and not self.freqsignals_stale:
+            logger.warning(f"FreqSignals unavailable since {shared.stale_since}, using cached signals until it recovers")
+        elif self.freqsignals_stale and not shared.stale_since:
+            logger.info(f"FreqSignals recovered, signals were stale since {self.freqsignals_stale_since}")
+        self.freqsignals_stale = shared.stale_since is not None
+        self.freqsignals_stale_since = shared.stale_since
+        if self.freqsignals_latency is not None and not shared.is_leader and not first_read:
+            # the leader timed them when it polled them
+            self.freqsignals_latency.received(signals)
+        return signals
+
+    def _freqsignals_poll_api(self, data_set_ids):
+        signal_filters = {}
+        if data_set_ids:
+            signal_filters["data_set_id__in"] = ','.join(data_set_ids)
+        if self.freqsignals_poll_high_water_mark:
+            # gte, not gt: signals sharing the mark's timestamp may still be on their way.
+            # They're deduplicated by updated_date when stored.
+            signal_filters["updated_date__gte"] = self.freqsignals_poll_high_water_mark
+        try:
+            response = self.freqsignals_client.get_signals(signal_filters, conditional=True)
+        except (FreqSignalsError, FreqSignalsTimeoutError, RequestException) as e:
+            # keep trading on the cached signals; once the circuit opens this returns without a request
+            if not self.freqsignals_stale:
+                self.freqsignals_stale = True
+                self.freqsignals_stale_since = datetime.now(timezone.utc)
+                logger.warning(f"FreqSignals unavailable, using cached signals until it recovers: {e}")
+            return []
+        if self.freqsignals_stale:
+            logger.info(f"FreqSignals recovered, signals were stale since {self.freqsignals_stale_since}")
+        self.freqsignals_stale = False
+        self.freqsignals_stale_since = None
+        signals = response["results"]
+        if signals:
+            dates = [signal["updated_date"] for signal in signals]
+            if self.freqsignals_poll_high_water_mark:
+                dates.append(self.freqsignals_poll_high_water_mark)
+            dates_ns = freqsignals_dates_to_ns(dates)
+            if self.freqsignals_latency is not None and self.freqsignals_poll_high_water_mark and not self.freqsignals_poll_catching_up:
+                # not on the first poll, it returns the current signals however old they are, nor
+                # on the first after a restart, it returns everything the bot missed while down
+                self.freqsignals_latency.received([
+                    signal for signal, date_ns in zip(signals, dates_ns.tolist()) if date_ns > dates_ns[-1]
+                ])
+            self.freqsignals_poll_high_water_mark = dates[int(dates_ns.argmax())]
+        self.freqsignals_poll_catching_up = False
+        return signals
+
+    def freqsignals_save_snapshot(self, path=None):
+        """
+        Saves the store, the history loaded flags and the high water mark of the polled signals
+        in it, see FreqSignalsStore.save_snapshot
+        Args:
+            path: str - optional - defaults to freqsignals_snapshot_path
+        """
+        path = path or self.freqsignals_snapshot_path
+        started = time.perf_counter()
+        try:
+            self.freqsignals_store.save_snapshot(path, lambda: {
+                "loaded": [list(key) for key, loaded in list(self.freqsignals_loaded_historic_by_pair_data_set.items()) if loaded],
+                "high_water_mark": self.freqsignals_stored_high_water_mark,
+            })
+        except OSError as e:
+            logger.warning(f"Couldn't save the FreqSignals snapshot to {path}: {e}")
+            return
+        finally:
+            self.freqsignals_snapshot_saved_at = time.monotonic()
+        logger.info(f"Saved {len(self.freqsignals_store)} signals to {path} in {time.perf_counter() - started:.2f}s")
+
+    def freqsignals_restore_snapshot(self, path=None):
+        """
+        Replaces the store, the history loaded flags and the poll high water mark with a saved
+        snapshot, unless it's older than freqsignals_snapshot_max_age. The loaded histories are
+        completed with what was updated since by the next freqsignals_load_signal_history / warm-up.
+        Args:
+            path: str - optional - defaults to freqsignals_snapshot_path
+
+        Returns:
+            bool - whether a snapshot was restored
+        """
+        path = path or self.freqsignals_snapshot_path
+        snapshot = FreqSignalsStore.load_snapshot(path)
+        if snapshot is None:
+            return False
+        store, created, state = snapshot
+        age = freqsignals_to_datetime(datetime.now(timezone.utc)) - created
+        if age > self.freqsignals_snapshot_max_age:
+            logger.info(f"Not restoring the FreqSignals snapshot {path}, it's {age} old")
+            return False
+        self.freqsignals_store = store
+        self.freqsignals_loaded_historic_by_pair_data_set = {
+            (pair, data_set_id): True for pair, data_set_id in (state or {}).get("loaded", [])
+        }
+        self.freqsignals_poll_high_water_mark = (state or {}).get("high_water_mark")
+        self.freqsignals_stored_high_water_mark = self.freqsignals_poll_high_water_mark
+        self.freqsignals_poll_catching_up = self.freqsignals_poll_high_water_mark is not None
+        # polls only return the latest signal of each pair, the history of the downtime is downloaded
+        self.freqsignals_history_resume_since = {}
+        for key in self.freqsignals_loaded_historic_by_pair_data_set:
+            series = store.series(*key)
+            since = self.freqsignals_poll_high_water_mark
+            if since is None and series is not None and len(series):
+                since = np.datetime_as_string(np.datetime64(int(series.start_ns.max()), "ns"), unit="us") + "Z"
+            if since is not None:
+                self.freqsignals_history_resume_since[key] = since
+        logger.info(
+            f"Restored {len(store)} signals and {len(self.freqsignals_loaded_historic_by_pair_data_set)} loaded "
+            f"histories from {path}, saved {age} ago"
+        )
+        return True
+
+    def freqsignals_evict_expired_signals(self):
+        """
+        Drops signals whose interval ends before the first candle of the analyzed dataframes
+        Returns:
+            int - number of signals dropped
+        """
+        cutoff_ns = self.freqsignals_retention_cutoff()
+        if cutoff_ns is None:
+            return 0
+        return self.freqsignals_store.evict_ended(cutoff_ns)
+
+    def freqsignals_retention_cutoff(self):
+        """
+        The oldest first candle of the dataframes freqsignals_add_pair_signals joined onto lately.
+        Freqtrade analyzes ohlcv_candle_limit + startup_candle_count candles per pair, so no fixed
+        number of candles would do.
+        Returns:
+            int - ns timestamp, signals that ended at or before it can't reach an analyzed candle,
+                None until a dataframe has been joined
+        """
+        if not self.freqsignals_analyzed_candles:
+            return None
+        newest_ns = max(last_ns for _, last_ns in self.freqsignals_analyzed_candles.values())
+        timeframe_minutes = timeframe_to_minutes(getattr(self, "timeframe", None) or "1m")
+        idle_ns = newest_ns - (self.freqsignals_retention_idle_candles or 0) * timeframe_minutes * NS_PER_MINUTE
+        return int(min(
+            first_ns for first_ns, last_ns in self.freqsignals_analyzed_candles.values() if last_ns >= idle_ns
+        ))
+
+    def _freqsignals_record_analyzed(self, pair, first_ns, last_ns):
+        # a symbol joined onto several dataframes (an informative pair) keeps the oldest first
+        # candle of the latest ones
+        previous = self.freqsignals_analyzed_candles.get(pair)
+        if previous is not None and last_ns <= previous[1]:
+            first_ns, last_ns = min(first_ns, previous[0]), previous[1]
+        self.freqsignals_analyzed_candles[pair] = (first_ns, last_ns)
+
+    def freqsignals_latency_stats(self):
+        """
+        Returns:
+            dict - per data set, percentiles of how old signals were when polled ("received") and
+                when joined onto a candle ("applied"), in seconds, see FreqSignalsLatencyTracker
+        """
+        if self.freqsignals_latency is None:
+            return {}
+        return self.freqsignals_latency.stats()
+
+    def freqsignals_latency_alert(self, alert):
+        """
+        Called when signals are older than freqsignals_latency_alert_ttl_fraction of their ttl by
+        the time they're polled or applied. Override to notify, e.g. with self.dp.send_msg.
+        Args:
+            alert: dict - stage, pair, data_set_id, latency (seconds) and ttl_minutes
+        """
+        logger.warning(
+            f"FreqSignals {alert['data_set_id']} signal for {alert['pair']} was {alert['latency']:.0f}s old when "
+            f"{alert['stage']}, its ttl is {alert['ttl_minutes']} minutes"
+        )
+
+    def freqsignals_cache_stats(self):
+        """
+        Returns:
+            dict - size of the signal cache and eviction counters
+        """
+        return self.freqsignals_store.stats()
+
+    def freqsignals_store_signals(self, signals):
+        """
+        Adds polled signals to the store, keeping the first copy of each (symbol, data_set_id,
+        updated_date), and advances freqsignals_stored_high_water_mark
+        """
+        if not signals:
+            return 0
+        dates = [signal["updated_date"] for signal in signals]
+        with self.freqsignals_store.lock:
+            added = self.freqsignals_store.add_signals(signals)
+            if self.freqsignals_stored_high_water_mark:
+                dates.append(self.freqsignals_stored_high_water_mark)
+            self.freqsignals_stored_high_water_mark = dates[int(freqsignals_dates_to_ns(dates).argmax())]
+        return added
+
+    def freqsignals_is_live(self):
+        return getattr(getattr(self, "config", {}).get('runmode'), "value", "none") in ('live', 'dry_run')
+
+    def freqsignals_is_backfilling(self):
+        """
+        Whether providers should upload their whole history, see freqsignals_backfill
+        """
+        return self.freqsignals_backfill and getattr(getattr(self, "config", {}).get('runmode'), "value", "none") == 'backtest'
+
+    def freqsignals_backfill_frame(self, pair, data_set_id, frame):
+        """
+        Uploads the signals of every candle. Each signal is dated when its candle closed, which
+        is when the provider would have posted it live.
+        Args:
+            pair: str - the pair
+            data_set_id: str - data set to upload to
+            frame: DataFrame - one row per candle: date (candle open), value, ttl_minutes and
+                context columns; rows without a value are skipped
+
+        Returns:
+            dict - FreqSignalsBackfill.upload counts
+        """
+        timeframe_minutes = timeframe_to_minutes(getattr(self, "timeframe", None) or "1m")
+        frame = frame.rename(columns={"date": "updated_date"})
+        frame["updated_date"] = frame["updated_date"] + timedelta(minutes=timeframe_minutes)
+        signals = freqsignals_signals_from_frame(frame, pair, data_set_id)
+        if getattr(self, "freqsignals_backfiller", None) is None:
+            self.freqsignals_backfiller = FreqSignalsBackfill(
+                self.freqsignals_client, self.freqsignals_backfill_state, **self.freqsignals_backfill_options
+            )
+        result = self.freqsignals_backfiller.upload(signals)
+        logger.info(
+            f"backfilled {pair}: {result['signals']} signals in {result['sent']} chunks, "
+            f"{result['skipped']} chunks already uploaded, {result['failed']} failed"
+        )
+        return result
+
+    def freqsignals_bot_start(self):
+        """
+        Called in bot_start to warm up the signal history of every whitelisted pair
+        """
+        if self.freqsignals_warm_up_history:
+            results = self.freqsignals_warm_up()
+            if results and self.freqsignals_shared_store_path and not self.freqsignals_is_live():
+                self.freqsignals_store.export(self.freqsignals_shared_store_path)
+                logger.info(f"Exported {len(self.freqsignals_store)} signals to {self.freqsignals_shared_store_path}")
+
+    def freqsignals_whitelist(self):
+        """
+        Returns:
+            list - the pairs the bot trades, from the pairlist if available, else the config
+        """
+        dp = getattr(self, "dp", None)
+        if dp is not None:
+            try:
+                return list(dp.current_whitelist())
+            except Exception:
+                pass
+        return list(getattr(self, "config", {}).get("exchange", {}).get("pair_whitelist", []))
+
+    def freqsignals_warm_up(self, pairs=None, data_set_ids=None):
+        """
+        Loads the signal history of every pair x data set concurrently, so the first
+        populate_indicators of each pair finds it already loaded
+        Args:
+            pairs: list - optional - defaults to the whitelist
+            data_set_ids: list - optional - defaults to freqsignals_data_set_ids, else the keys of
+                freqsignals_data_set_names
+
+        Returns:
+            dict - (pair, data_set_id) -> seconds taken, or the exception raised
+        """
+        pairs = self.freqsignals_whitelist() if pairs is None else pairs
+        if data_set_ids is None:
+            data_set_ids = self.freqsignals_data_set_ids or [
+                data_set_id for data_set_id in self.freqsignals_data_set_names if data_set_id
+            ]
+        jobs = [
+            (pair, data_set_id)
+            for pair in pairs
+            for data_set_id in data_set_ids
+            if not self.freqsignals_loaded_historic_by_pair_data_set.get((pair, data_set_id))
+            or (pair, data_set_id) in self.freqsignals_history_resume_since
+        ]
+        if not jobs:
+            return {}
+
+        def load(pair, data_set_id):
+            started = time.perf_counter()
+            # the pairs already run in parallel, no page prefetching on top of that
+            self.freqsignals_load_signal_history(pair, data_set_id, prefetch=0)
+            return time.perf_counter() - started
+
+        logger.info(f"Warming up signal history for {len(jobs)} pair / data set combinations")
+        started = time.perf_counter()
+        results = {}
+        executor = ThreadPoolExecutor(max_workers=self.freqsignals_warm_up_workers, thread_name_prefix="freqsignals-warm-up")
+        futures = {executor.submit(load, *job): job for job in jobs}
+        try:
+            for future in as_completed(futures, timeout=self.freqsignals_warm_up_timeout):
+                pair, data_set_id = futures[future]
+                try:
+                    results[(pair, data_set_id)] = future.result()
+                    logger.info(
+                        f"Warm-up {len(results)}/{len(jobs)}: {pair} in {data_set_id} took "
+                        f"{results[(pair, data_set_id)]:.2f}s, "
+                        f"{len(self.freqsignals_store.series(pair, data_set_id))} signals"
+                    )
+                except Exception as e:
+                    results[(pair, data_set_id)] = e
+                    logger.warning(f"Warm-up {len(results)}/{len(jobs)}: {pair} in {data_set_id} failed: {e}")
+        except FuturesTimeoutError:
+            logger.warning(
+                f"Warm-up timed out after {self.freqsignals_warm_up_timeout}s with {len(jobs) - len(results)} pending, "
+                "those pairs load in the background or on first use"
+            )
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+        latencies = sorted(v for v in results.values() if isinstance(v, float))
+        if latencies:
+            logger.info(
+                f"Warm-up loaded {len(latencies)}/{len(jobs)} in {time.perf_counter() - started:.2f}s "
+                f"(per pair p50 {latencies[len(latencies) // 2]:.2f}s, max {latencies[-1]:.2f}s)"
+            )
+        return results
+
+    def freqsignals_load_signal_history(self, symbol, data_set_id, prefetch=None):
+        series = self.freqsignals_store.series(symbol, data_set_id, create=True)
+
+        resume_since = self.freqsignals_history_resume_since.get((symbol, data_set_id))
+        if resume_since is not None:
+            # restored from a snapshot: only what was updated while the bot was down is missing
+            added = 0
+            for page in self.freqsignals_client.iter_signal_history(symbol, data_set_id, since=resume_since):
+                added += self.freqsignals_store.add_history(symbol, data_set_id, page)
+            self.freqsignals_history_resume_since.pop((symbol, data_set_id), None)
+            logger.info(f"Loaded {added} historical signals for {symbol} in {data_set_id} updated since {resume_since}")
 
         # check if there is none or one datapoint - indicates that we haven't loaded historic yet
         if not self.freqsignals_loaded_historic_by_pair_data_set.get((symbol, data_set_id)):
-            print(f"Loading historical signals for {symbol} in {data_set_id}")
-            historic_signals = self.freqsignals_client.get_signal_history(symbol=symbol, data_set_id=data_set_id)
+            started = time.perf_counter()
+            until = freqsignals_to_datetime(datetime.now(timezone.utc)) + timedelta(minutes=1)
+            since = until - self.freqsignals_history_lookback if self.freqsignals_history_lookback else None
+            cache = self.freqsignals_history_cache
+            covered = cache.load(symbol, data_set_id, self.freqsignals_store) if cache else None
+            if self.freqsignals_shared_cache is not None and not self.freqsignals_history_offline:
+                # downloaded by whichever bot on the host asked first
+                added = self.freqsignals_shared_cache.load_history(
+                    symbol,
+                    data_set_id,
+                    self.freqsignals_store,
+                    partial(
+                        self.freqsignals_client.iter_signal_history,
+                        symbol,
+                        data_set_id,
+                        prefetch=self.freqsignals_history_prefetch if prefetch is None else prefetch,
+                        since=since,
+                        until=until,
+                        window=self.freqsignals_history_window if since is not None else None,
+                    ),
+                )
+                logger.info(f"Loaded {added} historical signals for {symbol} in {data_set_id} through the shared cache")
+            elif self.freqsignals_history_offline:
+                logger.info(f"Loaded {len(series)} cached historical signals for {symbol} in {data_set_id}")
+            else:
+                missing = [(since, until)]
+                if covered is not None:
+                    missing = [(freqsignals_to_datetime(covered["until"]) - DEFAULT_HISTORY_CACHE_OVERLAP, until)]
+                    if covered["since"] is not None and (since is None or since < freqsignals_to_datetime(covered["since"])):
+                        missing.insert(0, (since, covered["since"]))
+                    else:
+                        since = covered["since"]
+                logger.info(f"Loading historical signals for {symbol} in {data_set_id}, {len(series)} cached")
+                for fetch_since, fetch_until in missing:
+                    pages = self.freqsignals_client.iter_signal_history(
+                        symbol,
+                        data_set_id,
+                        prefetch=self.freqsignals_history_prefetch if prefetch is None else prefetch,
+                        since=fetch_since,
+                        until=fetch_until,
+                        window=self.freqsignals_history_window if fetch_since is not None else None,
+                    )
+                    for page in pages:
+                        self.freqsignals_store.add_history(symbol, data_set_id, page)
+                if cache:
+                    cache.save(symbol, data_set_id, series, since, until)
             self.freqsignals_loaded_historic_by_pair_data_set[(symbol, data_set_id)] = True
-            for historic_signal in historic_signals["results"]:
-                signal = {
-                    "symbol": symbol,
-                    "data_set_id": data_set_id,
-                    "created_at": historic_signal["t"],
-                    "updated_date": historic_signal["t"],
-                    "ttl_minutes": historic_signal["l"],
-                    "value": historic_signal["v"],
-                    "context": historic_signal["c"],
-                }
-                if signal["updated_date"] not in self.freqsignals_by_pair_data_set_updated_date[symbol][data_set_id]:
-                    self.freqsignals_by_pair_data_set_updated_date[symbol][data_set_id][signal["updated_date"]] = signal
+            if self.freqsignals_metrics is not None:
+                self.freqsignals_metrics.observe(
+                    "history_load_seconds", time.perf_counter() - started, pair=symbol, data_set_id=data_set_id
+                )
 
     def freqsignals_add_pair_signals(self, dataframe: DataFrame, pair: str, signal_name=None, data_set_id=None, include_context=False) -> DataFrame:
         """
         Called in populate_indicators to set the signals on the dataframe
         """
+        metrics = self.freqsignals_metrics
+        if metrics is None:
+            return self._freqsignals_add_pair_signals(dataframe, pair, signal_name, data_set_id, include_context)
+        started = time.perf_counter()
+        try:
+            return self._freqsignals_add_pair_signals(dataframe, pair, signal_name, data_set_id, include_context)
+        finally:
+            metrics.observe("add_pair_signals_seconds", time.perf_counter() - started, pair=pair)
 
-        signals_by_dataset = self.freqsignals_by_pair_data_set_updated_date.get(pair, {})
-        for data_set_id, signals in signals_by_dataset.items():
-            for updated_date, signal in signals.items():
-                if data_set_id:
-                    if signal["data_set_id"] != data_set_id:
-                        continue
-                if signal_name is None:
-                    signal_name = signal["data_set_id"]
-                    if signal["data_set_id"] in self.freqsignals_data_set_names:
-                        signal_name = self.freqsignals_data_set_names[signal["data_set_id"]]
+    def _freqsignals_add_pair_signals(self, dataframe, pair, signal_name, data_set_id, include_context):
+        if not self.freqsignals_vectorized_join:
+            if len(dataframe):
+                dates = freqsignals_candles_to_ns(dataframe["date"])
+                self._freqsignals_record_analyzed(pair, int(dates.min()), int(dates.max()))
+            return self._freqsignals_add_pair_signals_loop(dataframe, pair, signal_name, data_set_id, include_context)
+
+        candle_ns = freqsignals_candles_to_ns(dataframe["date"])
+        candle_order = None
+        if np.any(candle_ns[1:] < candle_ns[:-1]):
+            candle_order = np.argsort(candle_ns, kind="stable")
+            candle_ns = candle_ns[candle_order]
+        if len(candle_ns):
+            self._freqsignals_record_analyzed(pair, int(candle_ns[0]), int(candle_ns[-1]))
+
+        selected = []
+        for series_data_set_id, series in self.freqsignals_store.pair_series(pair).items():
+            if data_set_id and series_data_set_id != data_set_id:
+                continue
+            if not len(series):
+                continue
+            column_name = signal_name
+            if column_name is None:
+                column_name = self.freqsignals_data_set_names.get(series_data_set_id, series_data_set_id)
+            selected.append((series_data_set_id, column_name, series, series.version))
+
+        live = self.freqsignals_is_live()
+        if self.freqsignals_latency is not None and live:
+            for series_data_set_id, _, series, _ in selected:
+                self.freqsignals_latency.applied(pair, series_data_set_id, series.start_ns, candle_ns)
+
+        if self.freqsignals_incremental_join and live:
+            columns = self._freqsignals_incremental_columns(
+                (pair, signal_name, data_set_id, include_context), candle_ns, selected, include_context
+            )
+        else:
+            columns = self._freqsignals_join_columns(candle_ns, selected, include_context)
+        if not columns:
+            return dataframe
+
+        merged = {}
+        for column_name, (values, covered) in columns.items():
+            if candle_order is not None:
+                unsorted_values, unsorted_covered = np.empty_like(values), np.empty_like(covered)
+                unsorted_values[candle_order] = values
+                unsorted_covered[candle_order] = covered
+                values, covered = unsorted_values, unsorted_covered
+            if column_name in dataframe.columns:
+                # candles no signal covers keep what the dataframe already holds
+                values = np.where(covered, values, dataframe[column_name].to_numpy())
+            merged[column_name] = values
+        block = DataFrame(merged, index=dataframe.index).infer_objects()
+        new_columns = [column for column in block.columns if column not in dataframe.columns]
+        for column in block.columns:
+            if column not in new_columns:
+                dataframe[column] = block[column]
+        if new_columns:
+            dataframe[new_columns] = block[new_columns]
+        return dataframe
+
+    @staticmethod
+    def _freqsignals_join_columns(candle_ns, selected, include_context):
+        """
+        Joins the selected series onto ascending candle dates. Data sets sharing a column name
+        are layered in order, later ones winning where they have a signal.
+        Returns:
+            dict - column name -> (values, covered) arrays aligned with candle_ns
+        """
+        columns = {}
+
+        def merge(column_name, values, winner):
+            joined = freqsignals_take(values, winner)
+            covered = winner >= 0
+            if column_name in columns:
+                base, base_covered = columns[column_name]
+                joined = np.where(covered, joined, base)
+                covered = covered | base_covered
+            columns[column_name] = (joined, covered)
+
+        for _, column_name, series, _ in selected:
+            lo, hi = 0, len(series)
+            if len(candle_ns):
+                # only signals that can reach the candles: started by the last one, at most the longest ttl before the first
+                longest_ns = int(series.ttl_minutes.max()) * NS_PER_MINUTE
+                lo = int(np.searchsorted(series.start_ns, candle_ns[0] - longest_ns, side="left"))
+                hi = int(np.searchsorted(series.start_ns, candle_ns[-1], side="right"))
+            start_ns = series.start_ns[lo:hi]
+            end_ns = start_ns + series.ttl_minutes[lo:hi].astype(np.int64) * NS_PER_MINUTE
+            winner = freqsignals_join_intervals(candle_ns, start_ns, end_ns)
+            merge(column_name, series.values[lo:hi], winner)
+
+            if include_context:
+                for k in series.context_keys:
+                    values, present = series.context(k)
+                    values, present = values[lo:hi], present[lo:hi]
+                    if present.all():
+                        key_winner = winner
+                    else:
+                        # signals without the key must not hide older signals that have it
+                        present_idx = np.flatnonzero(present)
+                        key_winner = freqsignals_join_intervals(candle_ns, start_ns[present_idx], end_ns[present_idx])
+                        values = values[present_idx]
+                    merge(f"{column_name}_{k}", values, key_winner)
+        return columns
+
+    def _freqsignals_incremental_columns(self, key, candle_ns, selected, include_context):
+        """
+        Like _freqsignals_join_columns, but reuses what the previous call with the same arguments
+        computed: only candles that are new, or that signals stored since then can reach, are joined
+        """
+        layout = [
+            (series_data_set_id, column_name, tuple(series.context_keys) if include_context else ())
+            for series_data_set_id, column_name, series, _ in selected
+        ]
+        state = self.freqsignals_applied_by_pair.get(key)
+        dirty = None
+        if state is not None and state["layout"] == layout and len(state["candle_ns"]):
+            previous_ns = state["candle_ns"]
+            positions = np.minimum(np.searchsorted(previous_ns, candle_ns), len(previous_ns) - 1)
+            known = previous_ns[positions] == candle_ns
+            dirty = ~known
+            for (_, _, series, _), (previous_series, previous_version) in zip(selected, state["series"]):
+                spans = series.changed_since(previous_version) if series is previous_series else None
+                if spans is None:
+                    dirty = None
+                    break
+                for from_ns, to_ns in spans:
+                    dirty |= (candle_ns >= from_ns) & (candle_ns < to_ns)
+
+        if dirty is None:
+            columns = self._freqsignals_join_columns(candle_ns, selected, include_context)
+            self.freqsignals_incremental_stats["full"] += 1
+        else:
+            dirty_idx = np.flatnonzero(dirty)
+            known_idx = np.flatnonzero(~dirty)
+            fresh = self._freqsignals_join_columns(candle_ns[dirty_idx], selected, include_context)
+            columns = {}
+            for column_name, (previous_values, previous_covered) in state["columns"].items():
+                fresh_values, fresh_covered = fresh[column_name]
+                values = np.empty(len(candle_ns), dtype=np.result_type(previous_values, fresh_values))
+                covered = np.empty(len(candle_ns), dtype=bool)
+                values[known_idx] = previous_values[positions[known_idx]]
+                covered[known_idx] = previous_covered[positions[known_idx]]
+                values[dirty_idx] = fresh_values
+                covered[dirty_idx] = fresh_covered
+                columns[column_name] = (values, covered)
+            self.freqsignals_incremental_stats["incremental"] += 1
+            self.freqsignals_incremental_stats["candles_joined"] += len(dirty_idx)
+
+        self.freqsignals_applied_by_pair[key] = {
+            "layout": layout,
+            "candle_ns": candle_ns,
+            "series": [(series, version) for _, _, series, version in selected],
+            "columns": columns,
+        }
+        return columns
+
+    def _freqsignals_add_pair_signals_loop(self, dataframe: DataFrame, pair: str, signal_name=None, data_set_id=None, include_context=False) -> DataFrame:
+        """
+        Original signal by signal join, kept as a reference for freqsignals_vectorized_join = False
+        """
+
+        for series_data_set_id, series in self.freqsignals_store.pair_series(pair).items():
+            if data_set_id and series_data_set_id != data_set_id:
+                continue
+            # per data set, so the first data set's name doesn't stick to the others
+            column_name = signal_name
+            if column_name is None:
+                column_name = self.freqsignals_data_set_names.get(series_data_set_id, series_data_set_id)
+            for signal in series.to_signals(pair, series_data_set_id):
                 signal_start = datetime.fromisoformat(signal["updated_date"].replace("Z", ""))
                 signal_end = signal_start + timedelta(minutes=signal["ttl_minutes"])
                 dataframe.loc[(
                     (dataframe['date'] >= signal_start.isoformat()) &
                     (dataframe['date'] < signal_end.isoformat())
                 ),
-                signal_name] = signal["value"]
+                column_name] = signal["value"]
 
-                if include_context and "context" in signal:
+                if include_context and signal.get("context"):
                     for k, v in signal["context"].items():
                         dataframe.loc[(
                             (dataframe['date'] >= signal_start.isoformat()) &
                             (dataframe['date'] < signal_end.isoformat())
                         ),
-                        f"{signal_name}_{k}"] = v
+                        f"{column_name}_{k}"] = v
 
         return dataframe
 
@@ -357,6 +4590,9 @@ class FreqSignalsStrategy(IStrategy, FreqSignalsMixin):
         super().__init__(*args, **kwargs)
         self.freqsignals_init()
 
+    def bot_start(self, **kwargs) -> None:
+        self.freqsignals_bot_start()
+
     def bot_loop_start(self, **kwargs) -> None:
         self.freqsignals_bot_loop_start()
 
@@ -0,0 +1,69 @@
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [os.path.join(ROOT, "strategies"), os.path.join(ROOT, "benchmarks")]
+
+from freqtrade.enums import RunMode  # noqa: E402
+
+from freqsignals import FreqSignalsClient, FreqSignalsMixin, FreqSignalsRetryPolicy  # noqa: E402
+from stub_server import serve_mock  # noqa: E402
+
+
+class MixinStrategy(FreqSignalsMixin):
+    """
+    The mixin without IStrategy, configured through class attributes set by make_strategy
+    """
+    timeframe = "5m"
+    freqsignals_warm_up_history = False
+    freqsignals_evict_expired = False
+
+    def __init__(self, runmode=RunMode.DRY_RUN, client=None):
+        self.config = {"runmode": runmode}
+        self.freqsignals_init()
+        if client is not None:
+            self.freqsignals_client = client
+
+
+@pytest.fixture
+def mock_api(request):
+    # MockApi options can be overridden with indirect parametrization
+    server = serve_mock(**{"pairs": 3, "history_size": 200, "seed": 1, **getattr(request, "param", {})})
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def make_client(mock_api):
+    clients = []
+
+    def make(**kwargs):
+        options = {
+            "client_id": "test",
+            "client_secret": "test",
+            "host": "{}:{}".format(*mock_api.server_address),
+            "https": False,
+            "background_token_refresh": False,
+            "retry_policy": FreqSignalsRetryPolicy(max_attempts=2, backoff=0.01),
+        }
+        client = FreqSignalsClient(**{**options, **kwargs})
+        clients.append(client)
+        return client
+
+    yield make
+    for client in clients:
+        client.stop_publisher(timeout=1)
+        client.close()
+
+
+@pytest.fixture
+def make_strategy(make_client):
+    def make(runmode=RunMode.DRY_RUN, client=None, cls=MixinStrategy, **attributes):
+        if attributes:
+            cls = type("TestStrategy", (cls,), attributes)
+        return cls(runmode, client or make_client())
+
+    return make
@@ -0,0 +1,46 @@
+from freqsignals import FreqSignalsBackfill, FreqSignalsError
+
+
+def history(mock_api, count=23):
+    return [
+        {"symbol": "PAIR0/USDT", "data_set_id": mock_api.api.data_sets[0], "updated_date": f"2023-01-01T00:{i:02d}:00Z", "value": i}
+        for i in range(count)
+    ]
+
+
+def test_rerun_after_failures_sends_only_failed_chunks(make_client, mock_api, tmp_path):
+    signals = history(mock_api)
+    state_path = str(tmp_path / "backfill.done")
+    client = make_client()
+    post_signals = client.post_signals
+
+    def flaky_post_signals(chunk):
+        if chunk[0]["value"] in (5, 15):
+            raise FreqSignalsError("bad return status code: 503", status_code=503)
+        return post_signals(chunk)
+
+    client.post_signals = flaky_post_signals
+
+    first = FreqSignalsBackfill(client, state_path, chunk_size=5, workers=2).upload(signals)
+
+    assert first == {"sent": 3, "skipped": 0, "failed": 2, "signals": 13}
+    # a new process, as after a crash, reads what was uploaded from the state file
+    second = FreqSignalsBackfill(make_client(), state_path, chunk_size=5, workers=2).upload(signals)
+
+    assert second == {"sent": 2, "skipped": 3, "failed": 0, "signals": 10}
+    assert sorted(signal["value"] for signal in mock_api.api.published) == list(range(len(signals)))
+    assert FreqSignalsBackfill(make_client(), state_path, chunk_size=5).upload(signals) == {
+        "sent": 0, "skipped": 5, "failed": 0, "signals": 0,
+    }
+
+
+def test_chunks_are_posted_as_arrays(make_client, mock_api):
+    signals = history(mock_api)
+    client = make_client()
+
+    assert FreqSignalsBackfill(client, None).upload(signals)["sent"] == len(signals)
+    requests = mock_api.api.counters["requests"]
+    assert FreqSignalsBackfill(client, None, chunk_size=10).upload(signals)["sent"] == 3
+
+    assert mock_api.api.counters["requests"] - requests == 3
+    assert mock_api.api.counters["signals_received"] == 2 * len(signals)
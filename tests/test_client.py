@@ -0,0 +1,139 @@
+import time
+
+import pytest
+
+from freqsignals import (
+    FreqSignalsAsyncRunner,
+    FreqSignalsCircuitBreaker,
+    FreqSignalsCircuitOpenError,
+    FreqSignalsError,
+    FreqSignalsTokenError,
+    freqsignals_dumps,
+)
+
+
+def test_circuit_breaker_transitions():
+    breaker = FreqSignalsCircuitBreaker(failure_threshold=2, reset_timeout=0.05)
+    assert breaker.state == "closed"
+
+    breaker.record_failure()
+    assert breaker.state == "closed" and breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert not breaker.allow()
+    assert breaker.counters == {"opened": 1, "rejected": 1}
+
+    time.sleep(0.06)
+    assert breaker.allow()
+    assert breaker.state == "half_open"
+    # only one trial until it reports back
+    assert not breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open"
+
+    time.sleep(0.06)
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed" and breaker.failures == 0
+    assert breaker.counters["opened"] == 1
+
+
+@pytest.mark.parametrize("mock_api", [{"error_rate": 1.0}], indirect=True)
+def test_token_outage_opens_the_circuit(make_client, mock_api):
+    client = make_client(circuit_breaker=FreqSignalsCircuitBreaker(failure_threshold=2, reset_timeout=60))
+
+    with pytest.raises(FreqSignalsTokenError) as error:
+        client.get_signals()
+    assert error.value.status_code == 503
+    assert mock_api.api.counters["tokens"] == 0
+    assert mock_api.api.counters["requests"] == 2
+    assert client.circuit_breaker.state == "open"
+
+    with pytest.raises(FreqSignalsCircuitOpenError):
+        client.post_signal({"symbol": "PAIR0/USDT", "data_set_id": mock_api.api.data_sets[0], "value": 1})
+    assert mock_api.api.counters["requests"] == 2
+
+
+@pytest.mark.parametrize("mock_api", [{"error_rate": 1.0}], indirect=True)
+def test_token_outage_is_a_freqsignals_error_for_posts(make_client, mock_api):
+    client = make_client()
+
+    with pytest.raises(FreqSignalsError):
+        client.post_signal({"symbol": "PAIR0/USDT", "data_set_id": mock_api.api.data_sets[0], "value": 1})
+    # the post never went out, so getting the token was retried
+    assert mock_api.api.counters["requests"] == 2
+
+
+@pytest.mark.parametrize("mock_api", [{"error_rate": 1.0}], indirect=True)
+def test_bot_loop_survives_a_token_outage(make_strategy, mock_api):
+    strategy = make_strategy()
+
+    strategy.freqsignals_bot_loop_start()
+
+    assert strategy.freqsignals_stale
+
+
+def test_token_is_fetched_once_and_refreshed_on_401(make_client, mock_api):
+    client = make_client()
+    client.get_signals()
+    client.get_signals()
+    assert mock_api.api.counters["tokens"] == 1
+
+    mock_api.api.tokens.clear()
+    client.get_signals()
+    assert mock_api.api.counters["tokens"] == 2
+    assert mock_api.api.counters["unauthorized"] == 1
+
+
+def test_async_client_shares_the_token_and_refreshes_on_401(make_client, mock_api):
+    client = make_client()
+    client.get_signals()
+    runner = FreqSignalsAsyncRunner(
+        host="{}:{}".format(*mock_api.server_address),
+        https=False,
+        retry_policy=client.retry_policy,
+        token_manager=client._token_manager,
+    )
+    try:
+        runner.get_signals()
+        assert mock_api.api.counters["tokens"] == 1
+
+        mock_api.api.tokens.clear()
+        histories = runner.get_signal_histories([(f"PAIR{i}/USDT", mock_api.api.data_sets[0]) for i in range(3)])
+        assert not any(isinstance(history, Exception) for history in histories.values())
+        # the concurrent 401s wait for one new token
+        assert mock_api.api.counters["tokens"] == 2
+        client.get_signals()
+        assert mock_api.api.counters["tokens"] == 2
+    finally:
+        runner.close()
+
+
+def test_log_hook_gets_sizes_not_bodies(make_client, mock_api):
+    client = make_client()
+    logged = []
+    client.log = lambda level, msg, **kwargs: logged.append((msg, kwargs))
+    signal = {"symbol": "PAIR0/USDT", "data_set_id": mock_api.api.data_sets[0], "value": 1, "context": {"secret": "x"}}
+
+    client.post_signal(signal)
+    client.get_signals()
+    with pytest.raises(FreqSignalsError):
+        client.get("/api/crud/missing/")
+
+    assert [msg for msg, _ in logged] == ["request.success", "request.success", "make_load_request.error_status_code"]
+    for _, kwargs in logged:
+        assert not {"data", "response"} & set(kwargs)
+        assert kwargs["received_bytes"] > 0
+    assert logged[0][1]["sent_bytes"] == len(freqsignals_dumps(signal))
+    assert logged[1][1]["sent_bytes"] == 0
+    assert logged[2][1]["status_code"] == 404
+
+
+def test_async_runner_wraps_only_coroutine_methods(mock_api):
+    runner = FreqSignalsAsyncRunner(host="{}:{}".format(*mock_api.server_address), https=False)
+    try:
+        # a plain method is returned as is, a coroutine method runs on the runner's loop
+        assert runner.get_full_url("/api/crud/signals/") == "http://{}:{}/api/crud/signals/".format(*mock_api.server_address)
+        assert runner.get_signals()["count"] == len(mock_api.api.pairs)
+    finally:
+        runner.close()
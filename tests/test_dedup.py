@@ -0,0 +1,76 @@
+from freqsignals import FreqSignalsDeduplicator, FreqSignalsRetryPolicy
+
+
+def provider_signal(value, price):
+    # as FreqSignalsDataProvider posts them: context at the top level, changing every candle
+    return {"symbol": "BTC/USDT", "data_set_id": "ds", "value": value, "ttl_minutes": 60, "price": price, "rsi": price / 1000}
+
+
+def test_repeat_with_a_new_price_is_suppressed():
+    deduplicator = FreqSignalsDeduplicator(heartbeat_minutes=10, ignore_keys=("price",), tolerance=0.5)
+
+    assert deduplicator.should_send(provider_signal(1, 30000), now=0)
+    # rsi 30.0 -> 30.1 is within the tolerance
+    assert not deduplicator.should_send(provider_signal(1, 30100), now=300)
+    assert deduplicator.should_send(provider_signal(-1, 30200), now=600)
+    # resent 10 minutes before the previous one (sent at 600) expires
+    assert not deduplicator.should_send(provider_signal(-1, 30300), now=600 + 49 * 60)
+    assert deduplicator.should_send(provider_signal(-1, 30400), now=600 + 50 * 60)
+    assert deduplicator.counters == {"sent": 3, "suppressed": 2, "heartbeats": 1}
+
+
+def test_context_changes_are_sent():
+    deduplicator = FreqSignalsDeduplicator(ignore_keys=("price",))
+
+    assert deduplicator.should_send(provider_signal(1, 30000), now=0)
+    repeat = provider_signal(1, 30000)
+    repeat["price"] = 30500
+    assert not deduplicator.should_send(repeat, now=1)
+    assert deduplicator.should_send(provider_signal(1, 31000), now=2)
+    signal = provider_signal(1, 31000)
+    signal["signal"] = "sell"
+    assert deduplicator.should_send(signal, now=3)
+
+
+def test_context_dict_is_compared_per_key():
+    deduplicator = FreqSignalsDeduplicator(tolerance=0.5, ignore_keys=("price",))
+
+    def signal(context):
+        return {"symbol": "BTC/USDT", "data_set_id": "ds", "value": 1, "ttl_minutes": 60, "context": context}
+
+    assert deduplicator.should_send(signal({"rsi": 50.0, "price": 30000}), now=0)
+    assert not deduplicator.should_send(signal({"rsi": 50.01, "price": 30100}), now=1)
+    assert deduplicator.should_send(signal({"signal": "sell", "rsi": 90, "price": 30100}), now=2)
+    assert deduplicator.should_send(signal({"signal": "sell"}), now=3)
+    assert not deduplicator.should_send(signal({"signal": "sell"}), now=4)
+
+
+def test_forgotten_signal_is_sent_again():
+    deduplicator = FreqSignalsDeduplicator()
+    assert deduplicator.should_send(provider_signal(1, 30000), now=0)
+
+    deduplicator.forget("BTC/USDT", "ds")
+
+    assert deduplicator.should_send(provider_signal(1, 30000), now=1)
+
+
+def test_publisher_forgets_signals_it_couldnt_send(make_client, mock_api):
+    client = make_client()
+    client.get_token()
+    client.start_deduplication()
+    publisher = client.start_publisher(linger=0, retry_policy=FreqSignalsRetryPolicy(max_attempts=1))
+    signal = {"symbol": "PAIR0/USDT", "data_set_id": mock_api.api.data_sets[0], "value": 1, "ttl_minutes": 60}
+    mock_api.api.error_rate = 1.0
+    client.post_signal(dict(signal))
+    assert publisher.flush(5)
+    assert publisher.counters["failed"] == 1
+
+    mock_api.api.error_rate = 0.0
+    client.post_signal(dict(signal))
+    assert publisher.flush(5)
+
+    assert publisher.counters["sent"] == 1
+    assert mock_api.api.counters["signals_received"] == 1
+    # sent now, so the next repeat is suppressed
+    client.post_signal(dict(signal))
+    assert client.deduplicator.counters["suppressed"] == 1
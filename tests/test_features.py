@@ -0,0 +1,117 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from freqsignals import FreqSignalsFeatureCache
+
+WARMUP = 100
+
+
+def candles(count=400, start="2023-01-01", seed=1):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "date": pd.date_range(start, periods=count, freq="5min", tz="UTC"),
+        "close": 100 + np.cumsum(rng.normal(0, 1, count)),
+    })
+
+
+def compute(frame):
+    return {
+        "%sma": frame["close"].rolling(10).mean().to_numpy(),
+        "%ema": frame["close"].ewm(span=10, adjust=False).mean().to_numpy(),
+        "close_diff": frame["close"].diff().to_numpy(),
+    }
+
+
+def assert_matches_full(cache_result, frame, shifted_candles=0):
+    full = FreqSignalsFeatureCache().populate("full", frame, compute, shifted_candles=shifted_candles, warmup=WARMUP)
+    # the head was computed from candles that aren't in this frame (or before it had settled)
+    pd.testing.assert_frame_equal(cache_result.iloc[WARMUP:], full.iloc[WARMUP:], rtol=1e-6)
+
+
+def test_appended_candles_are_computed_incrementally():
+    frame = candles()
+    cache = FreqSignalsFeatureCache()
+    cache.populate("pair", frame.iloc[:300], compute, warmup=WARMUP)
+
+    result = cache.populate("pair", frame, compute, warmup=WARMUP)
+
+    assert cache.counters == {"full": 1, "incremental": 1, "rows_computed": 400}
+    assert_matches_full(result, frame)
+
+
+def test_sliding_frames_match_full_recompute():
+    frame = candles(600)
+    cache = FreqSignalsFeatureCache()
+    for start in range(0, 200, 20):
+        window = frame.iloc[start:start + 400].reset_index(drop=True)
+        result = cache.populate("pair", window, compute, shifted_candles=2, warmup=WARMUP)
+        assert_matches_full(result, window, shifted_candles=2)
+
+    assert cache.counters["full"] == 1 and cache.counters["incremental"] == 9
+    assert cache.counters["rows_computed"] == 400 + 9 * 20
+
+
+def test_shifted_columns():
+    frame = candles(50)
+    result = FreqSignalsFeatureCache().populate("pair", frame, compute, shifted_candles=2)
+
+    assert list(result.columns) == [
+        "date", "close", "%sma", "%ema", "close_diff", "%sma_shift-1", "%ema_shift-1", "%sma_shift-2", "%ema_shift-2",
+    ]
+    for n in (1, 2):
+        for name in ("%sma", "%ema"):
+            pd.testing.assert_series_equal(result[f"{name}_shift-{n}"], result[name].shift(n), check_names=False)
+
+
+def test_repopulating_replaces_columns():
+    frame = candles(50)
+    cache = FreqSignalsFeatureCache()
+    once = cache.populate("pair", frame, compute, shifted_candles=1)
+
+    twice = cache.populate("pair", once, compute, shifted_candles=1)
+
+    pd.testing.assert_frame_equal(twice, once)
+
+
+@pytest.mark.parametrize("float32, dtype", [(False, np.float64), (True, np.float32)])
+def test_dtype(float32, dtype):
+    frame = candles(300)
+    cache = FreqSignalsFeatureCache(float32=float32)
+    cache.populate("pair", frame.iloc[:250], compute, shifted_candles=1, warmup=WARMUP)
+
+    result = cache.populate("pair", frame, compute, shifted_candles=1, warmup=WARMUP)
+
+    assert cache.counters["incremental"] == 1
+    assert all(result[column].dtype == dtype for column in result.columns[2:])
+    np.testing.assert_allclose(result["%sma"].iloc[WARMUP:], frame["close"].rolling(10).mean().iloc[WARMUP:], rtol=1e-5)
+
+
+def test_full_recompute_when_columns_change():
+    frame = candles(300)
+    cache = FreqSignalsFeatureCache()
+    cache.populate("pair", frame.iloc[:250], compute, warmup=WARMUP)
+
+    def more(frame):
+        return {**compute(frame), "%roc": frame["close"].pct_change(5).to_numpy()}
+
+    result = cache.populate("pair", frame, more, warmup=WARMUP)
+
+    assert cache.counters == {"full": 2, "incremental": 0, "rows_computed": 550}
+    pd.testing.assert_frame_equal(result, FreqSignalsFeatureCache().populate("full", frame, more))
+
+
+@pytest.mark.parametrize("later", [
+    # candles that fall between the cached ones
+    candles(300, start="2023-01-01 00:02"),
+    # a gap in the middle of what was cached
+    candles(300).drop(index=100).reset_index(drop=True),
+])
+def test_full_recompute_when_dates_dont_line_up(later):
+    cache = FreqSignalsFeatureCache()
+    cache.populate("pair", candles(250), compute, warmup=WARMUP)
+
+    result = cache.populate("pair", later, compute, warmup=WARMUP)
+
+    assert cache.counters["full"] == 2 and cache.counters["incremental"] == 0
+    pd.testing.assert_frame_equal(result, FreqSignalsFeatureCache().populate("full", later, compute))
@@ -0,0 +1,64 @@
+from datetime import timedelta
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+PAIR = "PAIR0/USDT"
+
+
+@pytest.fixture
+def history_client(make_client, mock_api):
+    """
+    A client whose history requests are recorded as their query parameters
+    """
+    client = make_client()
+    client.requested = []
+    get = client.get
+
+    def recording_get(path, *args, **kwargs):
+        url = urlparse(path)
+        if url.path == "/api/crud/signal_history/":
+            client.requested.append({k: v[0] for k, v in parse_qs(url.query).items()})
+        return get(path, *args, **kwargs)
+
+    client.get = recording_get
+    client.data_set_id = mock_api.api.data_sets[0]
+    return client
+
+
+@pytest.mark.parametrize("prefetch", [0, 2])
+@pytest.mark.parametrize("page_size, pages", [(30, 7), (40, 5)])
+def test_pages_cover_history_in_order(history_client, mock_api, prefetch, page_size, pages):
+    expected = mock_api.api.history(PAIR, history_client.data_set_id)
+
+    results = list(history_client.iter_signal_history(PAIR, history_client.data_set_id, page_size=page_size, prefetch=prefetch))
+
+    assert [item for page in results for item in page] == expected
+    assert len(results) == pages
+    # nothing past the count, not even an empty page when it divides evenly
+    assert sorted(int(query["offset"]) for query in history_client.requested) == [page_size * i for i in range(pages)]
+
+
+@pytest.mark.parametrize("prefetch", [0, 2])
+def test_short_last_page_ends_iteration(history_client, mock_api, prefetch):
+    results = list(history_client.iter_signal_history(PAIR, history_client.data_set_id, page_size=64, prefetch=prefetch))
+
+    assert [len(page) for page in results] == [64, 64, 64, 8]
+    assert len(history_client.requested) == 4
+
+
+@pytest.mark.parametrize("prefetch", [0, 2])
+def test_window_split_matches_range(history_client, mock_api, prefetch):
+    history = mock_api.api.history(PAIR, history_client.data_set_id)
+    since, until = history[17]["t"], history[163]["t"]
+
+    results = list(history_client.iter_signal_history(
+        PAIR, history_client.data_set_id, page_size=10, prefetch=prefetch, since=since, until=until, window=timedelta(minutes=5 * 25),
+    ))
+
+    assert [item for page in results for item in page] == history[17:163]
+    # each window holds 25 signals, so no request goes deeper than its third page
+    assert max(int(query["offset"]) for query in history_client.requested) == 20
+    windows = sorted({(query["updated_date__gte"], query["updated_date__lt"]) for query in history_client.requested})
+    assert windows[0][0] == since and windows[-1][1] == until
+    assert all(previous[1] == current[0] for previous, current in zip(windows, windows[1:]))
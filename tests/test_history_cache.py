@@ -0,0 +1,69 @@
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+import pytest
+
+from freqsignals import DEFAULT_HISTORY_CACHE_OVERLAP, freqsignals_isoformat, freqsignals_to_datetime
+
+PAIR = "PAIR0/USDT"
+
+
+@pytest.fixture
+def cached_strategy(make_strategy, make_client, tmp_path):
+    """
+    Strategies sharing a history cache directory, their history requests recorded as query parameters
+    """
+    def make(**attributes):
+        client = make_client()
+        client.requested = []
+        get = client.get
+
+        def recording_get(path, *args, **kwargs):
+            if urlparse(path).path == "/api/crud/signal_history/":
+                client.requested.append({k: v[0] for k, v in parse_qs(urlparse(path).query).items()})
+            return get(path, *args, **kwargs)
+
+        client.get = recording_get
+        return make_strategy(client=client, freqsignals_history_cache_dir=str(tmp_path), **attributes)
+
+    return make
+
+
+def test_cached_history_only_fetches_the_tail(cached_strategy, mock_api):
+    data_set_id = mock_api.api.data_sets[0]
+    first = cached_strategy()
+    first.freqsignals_load_signal_history(PAIR, data_set_id)
+    covered = first.freqsignals_history_cache.covered(PAIR, data_set_id)
+    assert covered["since"] is None
+    mock_api.api.publish([{"symbol": PAIR, "data_set_id": data_set_id, "value": 0.5}])
+
+    second = cached_strategy()
+    second.freqsignals_load_signal_history(PAIR, data_set_id)
+
+    tail_since = freqsignals_isoformat(freqsignals_to_datetime(covered["until"]) - DEFAULT_HISTORY_CACHE_OVERLAP)
+    assert [query.get("updated_date__gte") for query in second.freqsignals_client.requested] == [tail_since]
+    loaded = second.freqsignals_store.series(PAIR, data_set_id)
+    assert len(loaded) == len(mock_api.api.history(PAIR, data_set_id)) == 201
+    cached = first.freqsignals_store.series(PAIR, data_set_id)
+    np.testing.assert_array_equal(loaded.start_ns[:200], cached.start_ns)
+    assert loaded.values[-1] == 0.5
+    # the cache now covers the published signal as well
+    third = cached_strategy(freqsignals_history_offline=True)
+    third.freqsignals_load_signal_history(PAIR, data_set_id)
+    assert len(third.freqsignals_store.series(PAIR, data_set_id)) == 201
+
+
+def test_offline_never_requests(cached_strategy, mock_api):
+    data_set_id = mock_api.api.data_sets[0]
+    cached_strategy().freqsignals_load_signal_history(PAIR, data_set_id)
+    requests = mock_api.api.counters["requests"]
+
+    offline = cached_strategy(freqsignals_history_offline=True)
+    offline.freqsignals_load_signal_history(PAIR, data_set_id)
+    # not cached: nothing loaded rather than downloaded
+    offline.freqsignals_load_signal_history("PAIR1/USDT", data_set_id)
+
+    assert mock_api.api.counters["requests"] == requests
+    assert len(offline.freqsignals_store.series(PAIR, data_set_id)) == 200
+    assert len(offline.freqsignals_store.series("PAIR1/USDT", data_set_id)) == 0
+    assert offline.freqsignals_loaded_historic_by_pair_data_set[("PAIR1/USDT", data_set_id)]
@@ -0,0 +1,124 @@
+import numpy as np
+from freqtrade.enums import RunMode
+from pandas import DataFrame, Timedelta, Timestamp, date_range
+from pandas.testing import assert_frame_equal
+
+
+def test_loop_join_matches_vectorized_with_several_data_sets(make_strategy):
+    strategy = make_strategy(
+        RunMode.BACKTEST, freqsignals_data_set_names={"ds-a": "signal_a", "ds-b": "signal_b"}
+    )
+    start = date_range("2024-01-01", periods=40, freq="5min", tz="UTC")
+    start_ns = start.tz_convert(None).to_numpy(dtype="datetime64[ns]").view(np.int64)
+    rng = np.random.default_rng(0)
+    for data_set_id in ("ds-a", "ds-b"):
+        strategy.freqsignals_store.extend(
+            "PAIR/USDT", data_set_id, start_ns[::4], [15] * 10, rng.random(10),
+            contexts=[{"rsi": float(i)} for i in range(10)],
+        )
+    candles = DataFrame({"date": date_range("2024-01-01", periods=60, freq="5min", tz="UTC")})
+
+    strategy.freqsignals_vectorized_join = True
+    vectorized = strategy.freqsignals_add_pair_signals(candles.copy(), "PAIR/USDT", include_context=True)
+    strategy.freqsignals_vectorized_join = False
+    loop = strategy.freqsignals_add_pair_signals(candles.copy(), "PAIR/USDT", include_context=True)
+
+    assert set(loop.columns) == set(vectorized.columns) == {"date", "signal_a", "signal_a_rsi", "signal_b", "signal_b_rsi"}
+    for column in ("signal_a", "signal_a_rsi", "signal_b", "signal_b_rsi"):
+        np.testing.assert_allclose(loop[column].astype(float), vectorized[column].astype(float), equal_nan=True)
+
+
+def candle_frame(start, periods, freq="1min"):
+    return DataFrame({"date": date_range(start, periods=periods, freq=freq, tz="UTC")})
+
+
+def store_signals(strategy, dates, values, ttl):
+    start_ns = dates.tz_convert(None).to_numpy(dtype="datetime64[ns]").view(np.int64)
+    strategy.freqsignals_store.extend("PAIR/USDT", "ds", start_ns, [ttl] * len(start_ns), values)
+
+
+def test_eviction_never_changes_a_live_join(make_strategy):
+    # 1m candles with startup_candle_count=800 and a 499 candle exchange limit: 1299 candles analyzed
+    options = {"timeframe": "1m", "startup_candle_count": 800, "freqsignals_data_set_names": {"ds": "signal"}}
+    strategy = make_strategy(freqsignals_evict_expired=True, **options)
+    reference = make_strategy(freqsignals_incremental_join=False, **options)
+    signal_dates = date_range("2024-01-01", periods=400, freq="5min", tz="UTC")
+    values = np.arange(len(signal_dates), dtype=float)
+    for target in (strategy, reference):
+        store_signals(target, signal_dates, values, 5)
+
+    for step in range(0, 300, 60):
+        # the bot loop evicts before the candles are analyzed
+        strategy.freqsignals_evict_expired_signals()
+        candles = candle_frame(signal_dates[0] + Timedelta(minutes=100 + step), 1299)
+        joined = strategy.freqsignals_add_pair_signals(candles.copy(), "PAIR/USDT")
+        expected = reference.freqsignals_add_pair_signals(candles.copy(), "PAIR/USDT")
+        assert joined["signal"].notna().all()
+        np.testing.assert_array_equal(joined["signal"].to_numpy(), expected["signal"].to_numpy())
+
+    assert strategy.freqsignals_cache_stats()["evicted"] > 0
+    first_ns = strategy.freqsignals_analyzed_candles["PAIR/USDT"][0]
+    assert strategy.freqsignals_retention_cutoff() == first_ns
+    strategy.freqsignals_evict_expired_signals()
+    series = strategy.freqsignals_store.series("PAIR/USDT", "ds")
+    assert (series.start_ns + 5 * 60 * 10**9 > first_ns).all()
+
+
+def test_incremental_join_matches_a_full_join(make_strategy):
+    names = {"ds-a": "signal_a", "ds-b": "signal_b"}
+    strategy = make_strategy(freqsignals_data_set_names=names)
+    reference = make_strategy(RunMode.BACKTEST, freqsignals_data_set_names=names)
+    reference.freqsignals_store = strategy.freqsignals_store
+    store = strategy.freqsignals_store
+    rng = np.random.default_rng(7)
+    candle_minutes = 5
+    origin_ns = int(Timestamp("2024-01-01").value)
+    first_candle = 0
+
+    def add(data_set_id, candle_indexes):
+        starts = origin_ns + np.asarray(candle_indexes, dtype=np.int64) * candle_minutes * 60 * 10**9
+        # offsets within the candle, so signals start between candles too
+        starts = starts + rng.integers(0, candle_minutes * 60, len(starts)) * 10**9
+        contexts = []
+        for _ in starts:
+            context = {}
+            if rng.random() < 0.8:
+                context["rsi"] = float(rng.integers(0, 100))
+            if rng.random() < 0.3:
+                context["side"] = str(rng.choice(["buy", "sell"]))
+            contexts.append(context)
+        store.extend("PAIR/USDT", data_set_id, np.sort(starts), rng.integers(5, 60, len(starts)).tolist(),
+                     rng.random(len(starts)).tolist(), contexts=contexts)
+
+    add("ds-a", range(0, 150, 3))
+    add("ds-b", range(0, 150, 7))
+    latest = {"ds-a": 150, "ds-b": 150}
+    for step in range(60):
+        first_candle += int(rng.integers(0, 4))
+        length = int(rng.integers(100, 121))
+        for data_set_id in names:
+            # new signals in order, plus some reaching back into candles already joined
+            count = int(rng.integers(0, 4))
+            add(data_set_id, range(latest[data_set_id], latest[data_set_id] + count))
+            latest[data_set_id] += count
+            if rng.random() < 0.3:
+                add(data_set_id, rng.integers(first_candle, first_candle + length, 2))
+        if step == 30:
+            # more changes than a series remembers: the next join can't be incremental
+            for i in range(70):
+                add("ds-a", [latest["ds-a"] + i])
+            latest["ds-a"] += 70
+        if rng.random() < 0.5:
+            store.evict_ended(origin_ns + (first_candle - int(rng.integers(0, 20))) * candle_minutes * 60 * 10**9)
+        candles = DataFrame({
+            "date": date_range(Timestamp(origin_ns + first_candle * candle_minutes * 60 * 10**9, tz="UTC"),
+                               periods=length, freq=f"{candle_minutes}min")
+        })
+
+        joined = strategy.freqsignals_add_pair_signals(candles.copy(), "PAIR/USDT", include_context=True)
+        expected = reference.freqsignals_add_pair_signals(candles.copy(), "PAIR/USDT", include_context=True)
+
+        assert_frame_equal(joined, expected, check_like=True)
+
+    stats = strategy.freqsignals_incremental_stats
+    assert stats["incremental"] > 40 and stats["full"] >= 2
@@ -0,0 +1,49 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import freqsignals
+from freqsignals import freqsignals_dumps
+
+BODY = {
+    "value": np.float64(1.5),
+    "missing": np.nan,
+    "count": np.int32(3),
+    "enabled": np.bool_(True),
+    "day": np.datetime64("2023-01-01"),
+    "moment": np.datetime64("2023-01-01T10:20:30.123456789"),
+    "moments": np.array(["2023-01-01", "2023-01-02T12:00"], dtype="datetime64[ns]"),
+    "timestamp": pd.Timestamp("2023-01-01 10:00"),
+}
+
+
+def test_fallback_encodes_like_orjson(monkeypatch):
+    with_orjson = freqsignals_dumps(BODY) if freqsignals.orjson is not None else None
+    monkeypatch.setattr(freqsignals, "orjson", None)
+
+    encoded = freqsignals_dumps(BODY)
+
+    assert json.loads(encoded) == {
+        "value": 1.5,
+        "missing": None,
+        "count": 3,
+        "enabled": True,
+        "day": "2023-01-01T00:00:00",
+        "moment": "2023-01-01T10:20:30.123456",
+        "moments": ["2023-01-01T00:00:00", "2023-01-02T12:00:00"],
+        "timestamp": "2023-01-01T10:00:00",
+    }
+    if with_orjson is not None:
+        assert json.loads(with_orjson) == json.loads(encoded)
+
+
+def test_fallback_encodes_nat_as_null(monkeypatch):
+    monkeypatch.setattr(freqsignals, "orjson", None)
+    assert freqsignals_dumps({"day": np.datetime64("NaT")}) == b'{"day":null}'
+
+
+@pytest.mark.skipif(freqsignals.orjson is None, reason="orjson isn't installed")
+def test_orjson_encodes_datetime64():
+    assert freqsignals_dumps({"day": np.datetime64("2023-01-01")}) == b'{"day":"2023-01-01T00:00:00"}'
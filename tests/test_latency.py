@@ -0,0 +1,112 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+from freqsignals import FreqSignalsLatencyTracker, freqsignals_dates_to_ns, freqsignals_isoformat
+
+NOW = datetime(2023, 1, 1, 12)
+DATA_SET_ID = "00000000-0000-0000-0000-000000000000"
+
+
+def signal(seconds_ago, pair="PAIR0/USDT", ttl_minutes=60):
+    return {
+        "symbol": pair,
+        "data_set_id": DATA_SET_ID,
+        "updated_date": freqsignals_isoformat(NOW - timedelta(seconds=seconds_ago)),
+        "ttl_minutes": ttl_minutes,
+    }
+
+
+def test_percentiles():
+    tracker = FreqSignalsLatencyTracker()
+    tracker.received([signal(seconds, pair=f"PAIR{seconds}/USDT") for seconds in range(1, 101)], now=NOW)
+    # a provider clock ahead of this host's doesn't make a negative latency
+    tracker.received([signal(-5)], now=NOW)
+
+    stats = tracker.stats()[DATA_SET_ID]
+
+    assert stats["missed"] == 0
+    assert stats["received"] == {"count": 101, "max": 100.0, "p50": 50.0, "p95": 95.0, "p99": 99.0}
+    assert tracker.stats(percentiles=(90,))[DATA_SET_ID]["received"]["p90"] == 90.0
+
+
+def test_window_keeps_the_latest_latencies():
+    tracker = FreqSignalsLatencyTracker(window=10)
+    for seconds in range(100, 0, -1):
+        tracker.received([signal(seconds, pair=f"PAIR{seconds}/USDT")], now=NOW)
+
+    assert tracker.stats()[DATA_SET_ID]["received"]["count"] == 10
+    assert tracker.stats()[DATA_SET_ID]["received"]["max"] == 10.0
+
+
+def test_applied_and_missed():
+    tracker = FreqSignalsLatencyTracker()
+    applied, expired, later = signal(600, ttl_minutes=60), signal(3600, ttl_minutes=5), signal(-600)
+    tracker.received([applied, expired, later], now=NOW)
+    stored_ns = freqsignals_dates_to_ns([expired["updated_date"], applied["updated_date"], later["updated_date"]])
+    # the candles start after the expired signal ended and end before the later one starts
+    candle_ns = freqsignals_dates_to_ns([freqsignals_isoformat(NOW - timedelta(minutes=minutes)) for minutes in (15, 5, 0)])
+
+    tracker.applied("PAIR0/USDT", DATA_SET_ID, stored_ns, candle_ns, now=NOW + timedelta(seconds=30))
+
+    stats = tracker.stats()[DATA_SET_ID]
+    assert stats["missed"] == 1
+    assert stats["applied"]["count"] == 1 and stats["applied"]["max"] == 630.0
+    # the later signal is resolved once a candle reaches it
+    tracker.applied("PAIR0/USDT", DATA_SET_ID, stored_ns, np.append(candle_ns, stored_ns[-1]), now=NOW + timedelta(minutes=11))
+    assert tracker.stats()[DATA_SET_ID]["applied"]["count"] == 2
+
+
+def test_alert_fires_past_the_ttl_fraction():
+    alerts = []
+    tracker = FreqSignalsLatencyTracker(alert=alerts.append, alert_ttl_fraction=0.5)
+
+    # half of a 10 minute ttl is 300 seconds
+    tracker.received([signal(300, ttl_minutes=10)], now=NOW)
+    assert alerts == []
+    tracker.received([signal(301, ttl_minutes=10)], now=NOW)
+    assert alerts == [{"stage": "received", "pair": "PAIR0/USDT", "data_set_id": DATA_SET_ID, "latency": 301.0, "ttl_minutes": 10}]
+
+    # at most once per interval for a data set and stage
+    tracker.received([signal(500, pair="PAIR1/USDT", ttl_minutes=10)], now=NOW)
+    assert len(alerts) == 1
+
+
+@pytest.mark.parametrize("alert_ttl_fraction", [0, None])
+def test_alert_disabled(alert_ttl_fraction):
+    alerts = []
+    tracker = FreqSignalsLatencyTracker(alert=alerts.append, alert_ttl_fraction=alert_ttl_fraction)
+
+    tracker.received([signal(3600, ttl_minutes=1)], now=NOW)
+
+    assert alerts == []
+
+
+def test_failing_alert_doesnt_stop_tracking():
+    def alert(alert):
+        raise RuntimeError("notification failed")
+
+    tracker = FreqSignalsLatencyTracker(alert=alert, alert_interval=0)
+    tracker.received([signal(3600, ttl_minutes=1), signal(3600, pair="PAIR1/USDT", ttl_minutes=1)], now=NOW)
+
+    assert tracker.stats()[DATA_SET_ID]["received"]["count"] == 2
+
+
+def test_strategy_alerts_on_late_polled_signals(make_strategy, mock_api):
+    alerts = []
+    strategy = make_strategy(
+        freqsignals_track_latency=True,
+        # any latency at all is late
+        freqsignals_latency_alert_ttl_fraction=1e-9,
+        freqsignals_latency_alert=lambda self, alert: alerts.append(alert),
+    )
+    # the first poll returns the current signals however old they are
+    strategy.freqsignals_bot_loop_start()
+    assert alerts == [] and strategy.freqsignals_latency_stats() == {}
+
+    mock_api.api.publish([{"symbol": "PAIR1/USDT", "data_set_id": mock_api.api.data_sets[0], "value": 0.5}])
+    strategy.freqsignals_bot_loop_start()
+
+    assert [(alert["stage"], alert["pair"]) for alert in alerts] == [("received", "PAIR1/USDT")]
+    assert strategy.freqsignals_latency_stats()[mock_api.api.data_sets[0]]["received"]["count"] == 1
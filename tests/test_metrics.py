@@ -0,0 +1,136 @@
+import socket
+
+import pytest
+
+from freqsignals import FreqSignalsMetrics, FreqSignalsPrometheusSink, FreqSignalsStatsdSink
+
+
+def recorded(sinks=()):
+    metrics = FreqSignalsMetrics(sinks, flush_interval=0, buckets=(0.1, 1))
+    metrics.increment("requests_total", method="get", status=200)
+    metrics.increment("requests_total", 2, status=200, method="get")
+    metrics.increment("requests_total", method="post", status=503)
+    metrics.gauge("stale", 1)
+    for seconds in (0.05, 0.5, 0.5, 3):
+        metrics.observe("request_seconds", seconds, endpoint="/api/crud/signals/")
+    return metrics
+
+
+def test_snapshot():
+    snapshot = recorded().snapshot()
+
+    assert snapshot["counters"] == [
+        {"name": "requests_total", "labels": {"method": "get", "status": 200}, "value": 3},
+        {"name": "requests_total", "labels": {"method": "post", "status": 503}, "value": 1},
+    ]
+    assert snapshot["gauges"] == [{"name": "stale", "labels": {}, "value": 1}]
+    assert snapshot["timers"] == [{
+        "name": "request_seconds",
+        "labels": {"endpoint": "/api/crud/signals/"},
+        "count": 4,
+        "sum": 4.05,
+        "max": 3,
+        "buckets": [(0.1, 1), (1, 3), (float("inf"), 4)],
+    }]
+
+
+def test_prometheus_sink(tmp_path):
+    path = tmp_path / "freqsignals.prom"
+    metrics = recorded([FreqSignalsPrometheusSink(str(path))])
+    metrics.gauge("label", 1, tag='say "hi"\\')
+
+    metrics.flush()
+
+    assert path.read_text() == "\n".join([
+        "# TYPE freqsignals_requests_total counter",
+        'freqsignals_requests_total{method="get",status="200"} 3',
+        'freqsignals_requests_total{method="post",status="503"} 1',
+        "# TYPE freqsignals_label gauge",
+        'freqsignals_label{tag="say \\"hi\\"\\\\"} 1',
+        "# TYPE freqsignals_stale gauge",
+        "freqsignals_stale 1",
+        "# TYPE freqsignals_request_seconds histogram",
+        'freqsignals_request_seconds_bucket{endpoint="/api/crud/signals/",le="0.1"} 1',
+        'freqsignals_request_seconds_bucket{endpoint="/api/crud/signals/",le="1.0"} 3',
+        'freqsignals_request_seconds_bucket{endpoint="/api/crud/signals/",le="+Inf"} 4',
+        'freqsignals_request_seconds_sum{endpoint="/api/crud/signals/"} 4.05',
+        'freqsignals_request_seconds_count{endpoint="/api/crud/signals/"} 4',
+    ]) + "\n"
+    assert [p.name for p in tmp_path.iterdir()] == ["freqsignals.prom"]
+
+
+@pytest.fixture
+def statsd():
+    server = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    server.bind(("127.0.0.1", 0))
+    server.settimeout(0.2)
+    yield server
+    server.close()
+
+
+def receive(server):
+    """
+    Returns:
+        list - the datagrams received until none arrives for a moment
+    """
+    packets = []
+    try:
+        while True:
+            packets.append(server.recv(65535))
+    except socket.timeout:
+        return packets
+
+
+def received_lines(server):
+    return [line for packet in receive(server) for line in packet.decode().split("\n")]
+
+
+def test_statsd_sink_sends_what_grew(statsd):
+    sink = FreqSignalsStatsdSink.from_address("127.0.0.1:{}".format(statsd.getsockname()[1]))
+    metrics = recorded([sink])
+
+    metrics.flush()
+
+    assert received_lines(statsd) == [
+        "freqsignals.requests_total.get.200:3|c",
+        "freqsignals.requests_total.post.503:1|c",
+        "freqsignals.stale:1|g",
+        "freqsignals.request_seconds.api_crud_signals.count:4|c",
+        "freqsignals.request_seconds.api_crud_signals:1012.500|ms",
+    ]
+
+    metrics.increment("requests_total", method="get", status=200)
+    metrics.observe("request_seconds", 0.2, endpoint="/api/crud/signals/")
+    metrics.flush()
+
+    # unchanged counters aren't sent, the timing is the mean of the new durations
+    assert received_lines(statsd) == [
+        "freqsignals.requests_total.get.200:1|c",
+        "freqsignals.stale:1|g",
+        "freqsignals.request_seconds.api_crud_signals.count:1|c",
+        "freqsignals.request_seconds.api_crud_signals:200.000|ms",
+    ]
+
+
+def test_statsd_sink_splits_packets(statsd):
+    sink = FreqSignalsStatsdSink("127.0.0.1", statsd.getsockname()[1])
+    metrics = FreqSignalsMetrics([sink], flush_interval=0)
+    for i in range(200):
+        metrics.gauge("pair", i, pair=f"PAIR{i}/USDT")
+
+    metrics.flush()
+
+    packets = receive(statsd)
+    assert len(packets) > 1 and all(len(packet) <= 1400 for packet in packets)
+    assert sum(packet.count(b"|g") for packet in packets) == 200
+
+
+def test_client_records_requests(make_client, mock_api):
+    client = make_client()
+    metrics = client.start_metrics(prometheus_file=None, statsd=None)
+
+    client.get_signals()
+
+    counters = {(entry["name"], tuple(sorted(entry["labels"].items()))): entry["value"] for entry in metrics.snapshot()["counters"]}
+    assert counters[("http_requests_total", (("endpoint", "/api/crud/signals/"), ("method", "get"), ("status", 200)))] == 1
+    assert counters[("http_received_bytes_total", (("endpoint", "/api/crud/signals/"), ("method", "get")))] > 0
@@ -0,0 +1,142 @@
+import pickle
+import time
+
+from conftest import MixinStrategy
+from freqtrade.enums import RunMode
+
+from freqsignals import (
+    FreqSignalsBackfill,
+    FreqSignalsCircuitBreaker,
+    FreqSignalsDeduplicator,
+    FreqSignalsLatencyTracker,
+    FreqSignalsMetrics,
+    FreqSignalsStrategy,
+    FreqSignalsStream,
+    FreqSignalsTokenManager,
+)
+
+
+class HyperoptStrategy(FreqSignalsStrategy):
+    freqsignals_deduplicate = True
+    freqsignals_collect_metrics = True
+    freqsignals_track_latency = True
+
+
+class PollingStrategy(MixinStrategy):
+    freqsignals_background_poll = True
+    freqsignals_poll_interval = 0.05
+
+
+def wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def test_strategy_pickles_for_hyperopt():
+    strategy = HyperoptStrategy({"runmode": RunMode.HYPEROPT, "stake_currency": "USDT", "dry_run": True})
+    strategy.freqsignals_client.deduplicator.should_send({"symbol": "BTC/USDT", "data_set_id": "ds", "value": 1, "ttl_minutes": 60})
+
+    copy = pickle.loads(pickle.dumps(strategy))
+
+    client = copy.freqsignals_client
+    assert client.session is client.session
+    assert not client.deduplicator.should_send({"symbol": "BTC/USDT", "data_set_id": "ds", "value": 1, "ttl_minutes": 60})
+    assert copy.freqsignals_metrics.sinks == []
+    copy.freqsignals_metrics.increment("requests_total")
+    assert copy.freqsignals_store is not strategy.freqsignals_store
+
+
+def test_live_strategy_pickles_without_its_threads(make_strategy, mock_api):
+    strategy = make_strategy(cls=PollingStrategy)
+    strategy.freqsignals_bot_loop_start()
+    assert strategy.freqsignals_poller is not None
+
+    copy = pickle.loads(pickle.dumps(strategy))
+
+    assert copy.freqsignals_poller is None
+    strategy.freqsignals_poller.close()
+    copy.freqsignals_bot_loop_start()
+    wait_for(lambda: copy.freqsignals_poller.counters["polls"] > 0)
+    copy.freqsignals_poller.close()
+
+
+def fetch_token():
+    return {"access_token": "token", "expires_in": 3600, "scope": "read write", "token_type": "Bearer"}
+
+
+def test_token_manager_pickles():
+    token_manager = FreqSignalsTokenManager(fetch_token, background_refresh=True)
+    assert token_manager.get_token() == "token"
+
+    copy = pickle.loads(pickle.dumps(token_manager))
+
+    assert copy.get_token() == "token"
+    assert copy._timer is None
+    token_manager.close()
+
+
+def test_circuit_breaker_pickles():
+    breaker = pickle.loads(pickle.dumps(FreqSignalsCircuitBreaker()))
+
+    breaker.record_failure()
+    assert breaker.allow()
+
+
+def test_deduplicator_pickles():
+    deduplicator = FreqSignalsDeduplicator()
+    signal = {"symbol": "BTC/USDT", "data_set_id": "ds", "value": 1, "ttl_minutes": 60}
+    assert deduplicator.should_send(signal)
+
+    copy = pickle.loads(pickle.dumps(deduplicator))
+
+    assert not copy.should_send(signal)
+
+
+def test_backfill_pickles(make_client, tmp_path):
+    backfill = FreqSignalsBackfill(make_client(), state_path=str(tmp_path / "backfill"))
+
+    copy = pickle.loads(pickle.dumps(backfill))
+
+    assert type(copy) is FreqSignalsBackfill
+
+
+class ListSink:
+    def __init__(self):
+        self.snapshots = []
+
+    def export(self, snapshot):
+        self.snapshots.append(snapshot)
+
+
+def test_metrics_copy_records_without_sinks():
+    metrics = FreqSignalsMetrics(sinks=[ListSink()], flush_interval=0)
+    metrics.increment("requests_total")
+
+    copy = pickle.loads(pickle.dumps(metrics))
+
+    assert copy.sinks == []
+    copy.increment("requests_total")
+    assert copy.snapshot()["counters"] == [{"name": "requests_total", "labels": {}, "value": 2}]
+    copy.close()
+    metrics.close()
+    assert len(metrics.sinks[0].snapshots) == 1
+
+
+def test_latency_tracker_pickles():
+    tracker = pickle.loads(pickle.dumps(FreqSignalsLatencyTracker()))
+
+    assert type(tracker) is FreqSignalsLatencyTracker
+
+
+def test_stream_copy_reconnects(make_client, mock_api):
+    stream = FreqSignalsStream(make_client())
+    wait_for(lambda: stream.connected)
+
+    copy = pickle.loads(pickle.dumps(stream))
+
+    wait_for(lambda: copy.connected)
+    assert mock_api.api.counters["streams"] == 2
+    stream.close(timeout=1)
+    copy.close(timeout=1)
@@ -0,0 +1,87 @@
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+
+@pytest.fixture
+def polling_strategy(make_strategy, make_client):
+    """
+    A strategy whose signal requests are recorded as their query parameters
+    """
+    client = make_client()
+    client.requested = []
+    make_request = client.make_request
+
+    def recording_make_request(url, *args, **kwargs):
+        if urlparse(url).path == "/api/crud/signals/":
+            client.requested.append({k: v[0] for k, v in parse_qs(urlparse(url).query).items()})
+        return make_request(url, *args, **kwargs)
+
+    client.make_request = recording_make_request
+
+    def make(**attributes):
+        return make_strategy(client=client, **attributes)
+
+    return make
+
+
+@pytest.mark.parametrize("mock_api", [{"data_sets": 3}], indirect=True)
+def test_poll_only_requests_the_strategy_data_sets(polling_strategy, mock_api):
+    data_set_ids = mock_api.api.data_sets[::2]
+    strategy = polling_strategy(freqsignals_data_set_ids=data_set_ids)
+
+    signals = strategy.freqsignals_poll_signals()
+
+    assert strategy.freqsignals_client.requested == [{"data_set_id__in": ",".join(data_set_ids)}]
+    assert sorted((signal["data_set_id"], signal["symbol"]) for signal in signals) == [
+        (data_set_id, pair) for data_set_id in data_set_ids for pair in mock_api.api.pairs
+    ]
+
+
+def test_poll_advances_the_high_water_mark(polling_strategy, mock_api):
+    strategy = polling_strategy()
+    first = strategy.freqsignals_poll_signals()
+    mark = max(signal["updated_date"] for signal in first)
+    assert strategy.freqsignals_poll_high_water_mark == mark
+
+    mock_api.api.publish([{"symbol": "PAIR1/USDT", "data_set_id": mock_api.api.data_sets[0], "value": 0.5}])
+    signals = strategy.freqsignals_poll_signals()
+
+    assert strategy.freqsignals_client.requested[-1] == {"updated_date__gte": mark}
+    # the signals sharing the mark come again, they're deduplicated when stored
+    published = [signal for signal in signals if signal["updated_date"] > mark]
+    assert {signal["updated_date"] for signal in signals if signal not in published} == {mark}
+    assert [(signal["symbol"], signal["value"]) for signal in published] == [("PAIR1/USDT", 0.5)]
+    assert strategy.freqsignals_poll_high_water_mark == published[0]["updated_date"]
+
+    signals = strategy.freqsignals_poll_signals()
+
+    assert strategy.freqsignals_client.requested[-1] == {"updated_date__gte": published[0]["updated_date"]}
+    assert signals == published
+
+
+def test_unchanged_poll_is_not_modified(polling_strategy, mock_api):
+    strategy = polling_strategy()
+    strategy.freqsignals_poll_signals()
+    mark = strategy.freqsignals_poll_high_water_mark
+    # the next poll asks for updated_date__gte the mark, a different query than the first
+    assert strategy.freqsignals_poll_signals()
+    assert mock_api.api.counters["not_modified"] == 0
+
+    assert strategy.freqsignals_poll_signals() == []
+
+    assert mock_api.api.counters["not_modified"] == 1
+    assert strategy.freqsignals_poll_high_water_mark == mark
+    assert not strategy.freqsignals_stale
+
+
+def test_get_signals_revalidates_the_same_query(make_client, mock_api):
+    client = make_client()
+    filters = {"data_set_id__in": mock_api.api.data_sets[0]}
+    first = client.get_signals(filters, conditional=True)
+    assert first["count"] == len(mock_api.api.pairs)
+
+    assert client.get_signals(filters, conditional=True) == {"count": 0, "results": [], "not_modified": True}
+    # without conditional the body comes back
+    assert client.get_signals(filters) == {"count": first["count"], "results": first["results"]}
+    assert mock_api.api.counters["not_modified"] == 1
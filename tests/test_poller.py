@@ -0,0 +1,110 @@
+import threading
+import time
+
+import pytest
+
+from freqsignals import FreqSignalsPoller
+
+
+class GatedPoll:
+    """
+    A poll that returns the next batch once it's released
+    """
+
+    def __init__(self, *batches):
+        self.batches = list(batches)
+        self.started = threading.Semaphore(0)
+        self.release = threading.Semaphore(0)
+
+    def __call__(self):
+        self.started.release()
+        self.release.acquire()
+        batch = self.batches.pop(0)
+        if isinstance(batch, Exception):
+            raise batch
+        return batch
+
+
+@pytest.fixture
+def poller():
+    pollers = []
+
+    def make(poll):
+        pollers.append((FreqSignalsPoller(poll, interval=60), poll))
+        return pollers[-1][0]
+
+    yield make
+    for poller, poll in pollers:
+        poller._closing = True
+        for _ in poll.batches:
+            poll.release.release()
+        poller.close(timeout=1)
+
+
+@pytest.mark.parametrize("budget", [0, 0.1])
+def test_take_returns_within_budget_while_a_poll_hangs(poller, budget):
+    poll = GatedPoll([{"value": 1}])
+    background = poller(poll)
+    assert poll.started.acquire(timeout=1)
+
+    started = time.monotonic()
+    assert background.take(budget) == []
+    assert budget <= time.monotonic() - started < budget + 0.1
+
+
+def test_take_swaps_in_completed_polls_only(poller):
+    poll = GatedPoll([{"value": 1}], [{"value": 2}, {"value": 3}], [{"value": 4}])
+    background = poller(poll)
+    poll.release.release()
+    # a budget waits for the poll in progress to finish
+    assert background.take(1) == [{"value": 1}]
+
+    background.poll_now()
+    assert poll.started.acquire(timeout=1) and poll.started.acquire(timeout=1)
+    assert background.take(0.05) == []
+    poll.release.release()
+    background.poll_now()
+    assert poll.started.acquire(timeout=1)
+    # the next poll has started but not finished, only the one before it is taken
+    assert background.take(0.05) == [{"value": 2}, {"value": 3}]
+    assert background.take() == []
+
+    poll.release.release()
+    assert background.take(1) == [{"value": 4}]
+    assert background.counters == {"polls": 3, "errors": 0, "signals": 4}
+
+
+def test_failed_poll_keeps_what_is_pending(poller):
+    poll = GatedPoll([{"value": 1}], RuntimeError("unavailable"), [{"value": 2}])
+    background = poller(poll)
+    poll.release.release()
+    assert poll.started.acquire(timeout=1)
+    background.poll_now()
+    assert poll.started.acquire(timeout=1)
+    poll.release.release()
+    background.poll_now()
+    assert poll.started.acquire(timeout=1)
+    poll.release.release()
+
+    deadline = time.monotonic() + 1
+    while background.counters["polls"] < 3 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert background.take() == [{"value": 1}, {"value": 2}]
+    assert background.counters["errors"] == 1
+
+
+@pytest.mark.parametrize("mock_api", [{"latency": 0.3}], indirect=True)
+def test_bot_loop_waits_at_most_its_budget(make_strategy, mock_api):
+    strategy = make_strategy(freqsignals_background_poll=True, freqsignals_bot_loop_budget=0.05, freqsignals_poll_interval=60)
+    try:
+        started = time.monotonic()
+        strategy.freqsignals_bot_loop_start()
+        # the first poll needs a token and the signals, 0.6s
+        assert time.monotonic() - started < 0.3
+        assert len(strategy.freqsignals_store) == 0
+
+        time.sleep(0.8)
+        strategy.freqsignals_bot_loop_start()
+        assert len(strategy.freqsignals_store) == len(mock_api.api.pairs)
+    finally:
+        strategy.freqsignals_poller.close(timeout=1)
@@ -0,0 +1,127 @@
+import time
+
+from freqsignals import FreqSignalsError, FreqSignalsPublisher, FreqSignalsRetryPolicy
+
+
+def signal(mock_api, pair, value=1.0):
+    return {"symbol": pair, "data_set_id": mock_api.api.data_sets[0], "value": value}
+
+
+def test_publisher_posts_one_signal_per_request_by_default(make_client, mock_api):
+    client = make_client()
+    client.get_token()
+    publisher = client.start_publisher(linger=0)
+    for pair in mock_api.api.pairs:
+        client.post_signal(signal(mock_api, pair))
+
+    assert publisher.flush(5)
+
+    assert publisher.counters["sent"] == publisher.counters["batches"] == 3
+    assert mock_api.api.counters["signals_received"] == 3
+    assert mock_api.api.counters["requests"] == 1 + 3
+
+
+def test_publisher_batches_when_asked(make_client, mock_api):
+    client = make_client()
+    client.get_token()
+    publisher = client.start_publisher(max_batch_size=10, linger=1)
+    for pair in mock_api.api.pairs:
+        client.post_signal(signal(mock_api, pair))
+
+    assert publisher.flush(5)
+
+    assert publisher.counters["batches"] == 1
+    assert mock_api.api.counters["signals_received"] == 3
+    assert mock_api.api.counters["requests"] == 1 + 1
+
+
+class FixedBackoff(FreqSignalsRetryPolicy):
+    def delay(self, attempt, retry_after=None):
+        return self.backoff
+
+
+def retry_policy(max_attempts=3, backoff=0.05):
+    return FixedBackoff(max_attempts=max_attempts, backoff=backoff, retry_non_idempotent=True)
+
+
+def wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def test_publisher_gives_up_after_max_attempts(make_client, mock_api):
+    client = make_client()
+    client.get_token()
+    publisher = client.start_publisher(linger=0, retry_policy=retry_policy())
+    mock_api.api.error_rate = 1.0
+
+    client.post_signal(signal(mock_api, "PAIR0/USDT"))
+    assert publisher.flush(5)
+
+    assert publisher.counters["retries"] == 2
+    assert publisher.counters["failed"] == 1
+    assert mock_api.api.counters["requests"] == 1 + 3
+
+
+def test_publisher_retries_while_sending_the_rest(make_client, mock_api):
+    client = make_client()
+    client.get_token()
+    publisher = client.start_publisher(linger=0, retry_policy=retry_policy(backoff=0.5))
+    mock_api.api.error_rate = 1.0
+    client.post_signal(signal(mock_api, "PAIR0/USDT"))
+    wait_for(lambda: publisher.counters["retries"] == 1)
+
+    mock_api.api.error_rate = 0.0
+    client.post_signal(signal(mock_api, "PAIR1/USDT"))
+    wait_for(lambda: publisher.counters["sent"] == 1)
+    # the second signal didn't wait for the first one's backoff
+    assert [published["symbol"] for published in mock_api.api.published] == ["PAIR1/USDT"]
+    assert publisher.flush(5)
+
+    assert [published["symbol"] for published in mock_api.api.published] == ["PAIR1/USDT", "PAIR0/USDT"]
+    assert publisher.counters["failed"] == 0
+
+
+def test_newer_signal_replaces_a_failed_one(make_client, mock_api):
+    client = make_client()
+    client.get_token()
+    publisher = client.start_publisher(linger=0, retry_policy=retry_policy(backoff=0.5))
+    mock_api.api.error_rate = 1.0
+    client.post_signal(signal(mock_api, "PAIR0/USDT", 1.0))
+    wait_for(lambda: publisher.counters["retries"] == 1)
+
+    mock_api.api.error_rate = 0.0
+    client.post_signal(signal(mock_api, "PAIR0/USDT", 2.0))
+    assert publisher.flush(5)
+
+    assert [published["value"] for published in mock_api.api.published] == [2.0]
+    assert publisher.counters["merged"] == 1
+
+
+class RejectingClient:
+    deduplicator = None
+
+    def __init__(self):
+        self.posts = 0
+
+    def post_signals(self, signals):
+        self.posts += 1
+        raise FreqSignalsError("bad return status code: 400", status_code=400)
+
+    def log(self, level, msg, **kwargs):
+        pass
+
+
+def test_rejected_signal_isnt_retried():
+    client = RejectingClient()
+    publisher = FreqSignalsPublisher(client, linger=0, retry_policy=retry_policy())
+
+    publisher.publish({"symbol": "PAIR0/USDT", "data_set_id": "ds", "value": 1})
+    assert publisher.flush(5)
+    publisher.close()
+
+    assert client.posts == 1
+    assert publisher.counters["retries"] == 0
+    assert publisher.counters["failed"] == 1
@@ -0,0 +1,64 @@
+import pickle
+
+from freqsignals import FreqSignalsSharedCache, freqsignals_dates_to_ns
+
+
+def test_shared_cache_pickles_as_a_new_owner(tmp_path):
+    cache = FreqSignalsSharedCache(str(tmp_path / "shared.db"))
+    assert cache.lead()
+
+    copy = pickle.loads(pickle.dumps(cache))
+
+    assert copy.path == cache.path
+    assert copy.owner != cache.owner
+    assert not copy.is_leader
+    # the leader still holds the lease, the copy reads through its own connection
+    assert not copy.lead()
+    assert copy.read() == []
+    cache.close()
+    assert copy.lead()
+    copy.close()
+
+
+def test_leader_prunes_ended_signals(tmp_path):
+    cache = FreqSignalsSharedCache(str(tmp_path / "shared.db"))
+    assert cache.lead()
+    signals = [
+        {"symbol": "A/USDT", "data_set_id": "ds", "updated_date": f"2024-01-01T0{hour}:00:00Z", "ttl_minutes": 60, "value": hour}
+        for hour in range(5)
+    ]
+    cache.store_poll(signals, "2024-01-01T04:00:00Z", None)
+
+    # keeps the signals still valid at 03:30: those from 03:00 and 04:00
+    cache.store_poll([], "2024-01-01T04:00:00Z", None, ended_before=freqsignals_dates_to_ns(["2024-01-01T03:30:00Z"])[0])
+
+    assert cache.counters["pruned"] == 3
+    assert [row[0] for row in cache._db.execute("SELECT value FROM signals ORDER BY start_ns")] == [3, 4]
+    cache.close()
+
+
+def test_only_the_leader_polls_and_history_downloads_once(make_strategy, mock_api, tmp_path):
+    path = str(tmp_path / "shared.db")
+    leader = make_strategy(freqsignals_shared_cache_path=path)
+    follower = make_strategy(freqsignals_shared_cache_path=path)
+    api = mock_api.api
+    data_set_id = api.data_sets[0]
+
+    for _ in range(3):
+        leader.freqsignals_bot_loop_start()
+        follower.freqsignals_bot_loop_start()
+    # a token and three polls
+    assert api.counters["requests"] == 4
+    assert leader.freqsignals_shared_cache.is_leader and not follower.freqsignals_shared_cache.is_leader
+    assert len(follower.freqsignals_store) == len(leader.freqsignals_store) == len(api.pairs)
+
+    leader.freqsignals_load_signal_history("PAIR1/USDT", data_set_id)
+    downloaded = api.counters["requests"]
+    assert downloaded > 4
+    follower.freqsignals_load_signal_history("PAIR1/USDT", data_set_id)
+
+    assert api.counters["requests"] == downloaded
+    assert len(follower.freqsignals_store.series("PAIR1/USDT", data_set_id)) == api.history_size
+    assert follower.freqsignals_shared_cache.counters["histories_read"] == 1
+    leader.freqsignals_shared_cache.close()
+    follower.freqsignals_shared_cache.close()
@@ -0,0 +1,81 @@
+import atexit
+import time
+
+import numpy as np
+
+from freqsignals import FreqSignalsStore
+
+
+def make_live_strategy(make_strategy, path):
+    strategy = make_strategy(freqsignals_snapshot_path=path)
+    atexit.unregister(strategy.freqsignals_save_snapshot)
+    return strategy
+
+
+def publish(client, mock_api, pair, values):
+    for value in values:
+        client.post_signal({"symbol": pair, "data_set_id": mock_api.api.data_sets[0], "value": value})
+        # distinct updated_dates
+        time.sleep(0.002)
+
+
+def test_snapshot_round_trip(make_strategy, mock_api, tmp_path):
+    path = str(tmp_path / "snapshot.npz")
+    data_set_id = mock_api.api.data_sets[0]
+    strategy = make_live_strategy(make_strategy, path)
+    strategy.freqsignals_load_signal_history("PAIR1/USDT", data_set_id)
+    strategy.freqsignals_bot_loop_start()
+    strategy.freqsignals_save_snapshot()
+
+    restored = make_live_strategy(make_strategy, path)
+
+    assert len(restored.freqsignals_store) == len(strategy.freqsignals_store)
+    np.testing.assert_array_equal(
+        restored.freqsignals_store.series("PAIR1/USDT", data_set_id).values,
+        strategy.freqsignals_store.series("PAIR1/USDT", data_set_id).values,
+    )
+    assert restored.freqsignals_loaded_historic_by_pair_data_set == strategy.freqsignals_loaded_historic_by_pair_data_set
+    assert restored.freqsignals_poll_high_water_mark == strategy.freqsignals_poll_high_water_mark
+    assert restored.freqsignals_poll_catching_up
+
+
+def test_resume_downloads_the_history_missed_while_down(make_strategy, make_client, mock_api, tmp_path):
+    path = str(tmp_path / "snapshot.npz")
+    data_set_id = mock_api.api.data_sets[0]
+    strategy = make_live_strategy(make_strategy, path)
+    strategy.freqsignals_load_signal_history("PAIR1/USDT", data_set_id)
+    strategy.freqsignals_bot_loop_start()
+    strategy.freqsignals_save_snapshot()
+    # published while the bot is down: a poll would only return the last of them
+    publish(make_client(), mock_api, "PAIR1/USDT", [0.1, 0.2, 0.3])
+
+    restored = make_live_strategy(make_strategy, path)
+    restored.freqsignals_bot_loop_start()
+    values = restored.freqsignals_store.series("PAIR1/USDT", data_set_id).values
+    assert values[-1] == 0.3 and 0.1 not in values and 0.2 not in values
+    requests = mock_api.api.counters["requests"]
+    restored.freqsignals_load_signal_history("PAIR1/USDT", data_set_id)
+
+    assert list(restored.freqsignals_store.series("PAIR1/USDT", data_set_id).values[-3:]) == [0.1, 0.2, 0.3]
+    assert len(restored.freqsignals_store.series("PAIR1/USDT", data_set_id)) == mock_api.api.history_size + 3
+    assert restored.freqsignals_history_resume_since == {}
+    # the downtime only, not the whole history again
+    assert mock_api.api.counters["requests"] == requests + 1
+
+
+def test_snapshot_high_water_mark_covers_only_stored_signals(make_strategy, make_client, mock_api, tmp_path):
+    path = str(tmp_path / "snapshot.npz")
+    strategy = make_live_strategy(make_strategy, path)
+    strategy.freqsignals_bot_loop_start()
+    stored = strategy.freqsignals_stored_high_water_mark
+    publish(make_client(), mock_api, "PAIR1/USDT", [0.5])
+    # as a background poller does: the poll's high water mark moves before the bot loop stores its signals
+    pending = strategy.freqsignals_poll_signals()
+    assert pending and strategy.freqsignals_poll_high_water_mark > stored
+
+    strategy.freqsignals_save_snapshot()
+
+    _, _, state = FreqSignalsStore.load_snapshot(path)
+    assert state["high_water_mark"] == stored
+    strategy.freqsignals_store_signals(pending)
+    assert strategy.freqsignals_stored_high_water_mark == strategy.freqsignals_poll_high_water_mark
@@ -0,0 +1,58 @@
+import multiprocessing
+import pickle
+
+import numpy as np
+import pytest
+from conftest import MixinStrategy
+from freqtrade.enums import RunMode
+from pandas import DataFrame, date_range
+
+from freqsignals import FreqSignalsStore
+
+START_NS = date_range("2024-01-01", periods=50, freq="5min").to_numpy(dtype="datetime64[ns]").view(np.int64)
+
+
+@pytest.fixture(scope="module")
+def worker():
+    # spawned like hyperopt's workers: everything they get is pickled
+    with multiprocessing.get_context("spawn").Pool(1) as pool:
+        yield pool
+
+
+def make_store():
+    store = FreqSignalsStore()
+    for i, pair in enumerate(("A/USDT", "B/USDT")):
+        store.extend(pair, "ds", START_NS, [15] * len(START_NS), np.arange(len(START_NS)) + i * 100,
+                     contexts=[{"rsi": float(j)} for j in range(len(START_NS))])
+    return store
+
+
+def summarize(store):
+    return len(store), store._shared_path, float(np.sum(store.series("B/USDT", "ds").values))
+
+
+def join_signals(strategy):
+    candles = DataFrame({"date": date_range("2024-01-01", periods=60, freq="5min", tz="UTC")})
+    return strategy.freqsignals_add_pair_signals(candles, "A/USDT").iloc[:, 1].tolist()
+
+
+def test_attached_store_pickles_as_its_path(tmp_path, worker):
+    make_store().export(str(tmp_path))
+    store = FreqSignalsStore.attach(str(tmp_path))
+
+    payload = pickle.dumps(store)
+
+    assert len(payload) < 500
+    assert worker.apply(summarize, (store,)) == (100, str(tmp_path), float(np.sum(np.arange(50) + 100)))
+
+
+def test_strategy_with_attached_store_crosses_processes(tmp_path, worker):
+    make_store().export(str(tmp_path))
+    strategy = MixinStrategy(RunMode.HYPEROPT)
+    strategy.freqsignals_store = FreqSignalsStore.attach(str(tmp_path))
+    expected = join_signals(strategy)
+
+    joined = worker.apply(join_signals, (strategy,))
+
+    np.testing.assert_array_equal(joined, expected)
+    assert expected[0] == 0 and np.isnan(expected[-1])
@@ -0,0 +1,52 @@
+import time
+
+import pytest
+
+from freqsignals import FreqSignalsStream
+
+
+def wait_until_connected(stream):
+    deadline = time.monotonic() + 5
+    while not stream.connected:
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+@pytest.mark.parametrize("mock_api", [{"stream_drop_after": 1, "stream_heartbeat": 0.2}], indirect=True)
+def test_stream_resumes_from_last_event_id(make_client, mock_api):
+    stream = FreqSignalsStream(make_client())
+    # a fresh stream only gets what's published after it connects
+    wait_until_connected(stream)
+    publisher = make_client()
+    data_set_id = mock_api.api.data_sets[0]
+    received = []
+    for i in range(5):
+        publisher.post_signal({"symbol": "PAIR1/USDT", "data_set_id": data_set_id, "value": i})
+        deadline = time.monotonic() + 5
+        while len(received) <= i:
+            assert time.monotonic() < deadline, "timed out"
+            received += stream.take()
+            time.sleep(0.01)
+        # let the server's drop after the event and the reconnect happen
+        time.sleep(0.1)
+    stream.close(timeout=1)
+
+    assert [signal["value"] for signal in received] == [0, 1, 2, 3, 4]
+    # every reconnect resumed from the latest signal received before it (and got it again, dropped)
+    last_event_ids = mock_api.api.stream_last_event_ids
+    assert last_event_ids[0] is None
+    assert len(last_event_ids) >= 5
+    for signal in received[:4]:
+        assert signal["updated_date"] in last_event_ids
+    assert stream.counters["connects"] == len(last_event_ids)
+
+
+def test_close_interrupts_a_waiting_read(make_client, mock_api):
+    stream = FreqSignalsStream(make_client())
+    wait_until_connected(stream)
+
+    started = time.monotonic()
+    stream.close(timeout=5)
+
+    assert time.monotonic() - started < 1
+    assert not stream._thread.is_alive()
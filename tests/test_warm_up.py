@@ -0,0 +1,60 @@
+import time
+
+import pytest
+
+
+def history_requests(mock_api):
+    return mock_api.api.counters["requests"] - mock_api.api.counters["tokens"]
+
+
+@pytest.mark.parametrize("mock_api", [{"data_sets": 2}], indirect=True)
+def test_warm_up_loads_whitelist_once(make_strategy, mock_api):
+    strategy = make_strategy(freqsignals_warm_up_history=True, freqsignals_data_set_ids=mock_api.api.data_sets)
+    strategy.config["exchange"] = {"pair_whitelist": mock_api.api.pairs}
+
+    strategy.freqsignals_bot_start()
+
+    jobs = {(pair, data_set_id) for pair in mock_api.api.pairs for data_set_id in mock_api.api.data_sets}
+    assert all(strategy.freqsignals_loaded_historic_by_pair_data_set.get(job) for job in jobs)
+    assert all(len(strategy.freqsignals_store.series(*job)) == 200 for job in jobs)
+    assert history_requests(mock_api) == len(jobs)
+
+    # already loaded pairs aren't downloaded again
+    assert strategy.freqsignals_warm_up() == {}
+    strategy.freqsignals_load_signal_history(*next(iter(jobs)))
+    assert history_requests(mock_api) == len(jobs)
+
+
+def test_warm_up_is_off_by_default(make_strategy, mock_api):
+    strategy = make_strategy(freqsignals_warm_up_history=False)
+    strategy.config["exchange"] = {"pair_whitelist": mock_api.api.pairs}
+
+    strategy.freqsignals_bot_start()
+
+    assert history_requests(mock_api) == 0
+
+
+@pytest.mark.parametrize("mock_api", [{"latency": 0.3}], indirect=True)
+def test_warm_up_timeout(make_strategy, mock_api):
+    strategy = make_strategy(freqsignals_warm_up_workers=1, freqsignals_warm_up_timeout=0.1)
+    data_set_id = mock_api.api.data_sets[0]
+
+    started = time.perf_counter()
+    results = strategy.freqsignals_warm_up(mock_api.api.pairs, [data_set_id])
+
+    assert results == {}
+    assert time.perf_counter() - started < 0.3
+    # the download in progress finishes in the background, the queued ones were cancelled
+    time.sleep(1)
+    loaded = [pair for pair in mock_api.api.pairs if strategy.freqsignals_loaded_historic_by_pair_data_set.get((pair, data_set_id))]
+    assert loaded == mock_api.api.pairs[:1]
+
+
+def test_unset_data_set_id_is_dropped(make_strategy, mock_api):
+    # FreqSignalsFollower with FREQSIGNALS_DATA_SET_ID unset
+    strategy = make_strategy(freqsignals_data_set_ids=[None])
+    assert strategy.freqsignals_data_set_ids is None
+
+    strategy.freqsignals_bot_loop_start()
+
+    assert len(strategy.freqsignals_store) == len(mock_api.api.pairs) * len(mock_api.api.data_sets)